@@ -0,0 +1,35 @@
+# Weather columns median-imputed in TrafficLAG.ipynb
+WEATHER_FILL_COLUMNS = [
+    'temperature_c', 'humidity_percent', 'wind_speed_ms', 'rain_1h_mm', 'rain_3h_mm',
+    'visibility_meters', 'pressure_hpa', 'wind_direction_degrees', 'cloud_coverage_percent'
+]
+OUTLIER_COLUMNS = ['traffic_ratio', 'duration_in_traffic_mins']
+
+
+def iqr_bounds(df, columns=OUTLIER_COLUMNS, k=1.5):
+    """Lower and upper Tukey fences (Q1 - k*IQR, Q3 + k*IQR) per column"""
+    q1 = df[columns].quantile(0.25)
+    q3 = df[columns].quantile(0.75)
+    iqr = q3 - q1
+    return q1 - k * iqr, q3 + k * iqr
+
+
+def clean_traffic_data(df, fill_columns=WEATHER_FILL_COLUMNS, outlier_columns=OUTLIER_COLUMNS,
+                       iqr_k=1.5, drop_columns=('distance_km',)):
+    """
+    The TrafficLAG.ipynb cleaning steps: median-impute weather columns,
+    drop rows outside the IQR fences of any outlier column, then drop
+    unused columns.
+    """
+    df = df.copy()
+    fill_columns = list(fill_columns)
+    df[fill_columns] = df[fill_columns].fillna(df[fill_columns].median())
+
+    if outlier_columns:
+        outlier_columns = list(outlier_columns)
+        lower, upper = iqr_bounds(df, outlier_columns, iqr_k)
+        values = df[outlier_columns]
+        keep = ((values >= lower) & (values <= upper)).all(axis=1)
+        df = df[keep]
+
+    return df.drop(columns=[c for c in drop_columns if c in df.columns]).reset_index(drop=True)
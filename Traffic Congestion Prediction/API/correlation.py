@@ -0,0 +1,196 @@
+import json
+import threading
+import numpy as np
+import pandas as pd
+from lag_features import ROUTE_COLUMNS
+from schema import normalize_record
+
+
+class CorrelationMatrix:
+    def __init__(self, columns, by=None):
+        """
+        Pearson correlations of `columns` from running co-moment sums, kept
+        per group of `by` (None for a single group, 'route' for
+        city/origin/destination, or any column such as 'time_period').
+
+        For each column pair the accumulator holds the pairwise-complete row
+        count and the sums of x, x^2 and x*y, so corr() matches
+        DataFrame.corr() (pairwise NaN handling) and adding a row costs
+        O(k^2) with no rescan. Values are shifted by the first batch's
+        column means before summing, as in density.OLSStats. Groups share
+        the shift, so summing them gives the unsliced matrix.
+        """
+        self.columns = list(columns)
+        self.by = by
+        self.groups = []
+        self._group_index = {}
+        self.shift = None
+        k = len(self.columns)
+        self.count = np.zeros((0, k, k))
+        self.total = np.zeros((0, k, k))
+        self.total_sq = np.zeros((0, k, k))
+        self.cross = np.zeros((0, k, k))
+        self._lock = threading.Lock()
+
+    def _group_code(self, key):
+        code = self._group_index.get(key)
+        if code is None:
+            code = self._group_index[key] = len(self.groups)
+            self.groups.append(key)
+        return code
+
+    def _grow(self):
+        pad = [(0, len(self.groups) - self.count.shape[0]), (0, 0), (0, 0)]
+        if pad[0][1]:
+            self.count, self.total, self.total_sq, self.cross = (
+                np.pad(a, pad) for a in (self.count, self.total, self.total_sq, self.cross)
+            )
+
+    def _keys(self, df):
+        if self.by is None:
+            return np.zeros(len(df), dtype=np.int64), [None]
+        if self.by == 'route':
+            codes, labels = pd.factorize(pd.MultiIndex.from_frame(df[ROUTE_COLUMNS].astype(str)), sort=True)
+            return codes, [tuple(label) for label in labels]
+        codes, labels = pd.factorize(df[self.by], sort=True)
+        return codes, labels.tolist()
+
+    def _row_key(self, data):
+        if self.by is None:
+            return None
+        if self.by == 'route':
+            return tuple(str(data[c]) for c in ROUTE_COLUMNS)
+        return data.get(self.by)
+
+    def _accumulate(self, code, values):
+        """Add the moments of a (rows, k) block to one group"""
+        valid = ~np.isnan(values)
+        mask = valid.astype(np.float64)
+        values = np.where(valid, values - self.shift, 0.0)
+        self.count[code] += mask.T @ mask
+        self.total[code] += values.T @ mask
+        self.total_sq[code] += (values * values).T @ mask
+        self.cross[code] += values.T @ values
+
+    def update_frame(self, df):
+        """Add a batch of rows, every group in one sorted pass"""
+        values = df.reindex(columns=self.columns).to_numpy(dtype=np.float64, na_value=np.nan)
+        codes, labels = self._keys(df)
+        with self._lock:
+            if self.shift is None:
+                with np.errstate(invalid='ignore'):
+                    shift = np.nanmean(values, axis=0) if len(values) else np.zeros(len(self.columns))
+                self.shift = np.nan_to_num(shift)
+            group_map = np.array([self._group_code(label) for label in labels], dtype=np.int64)
+            self._grow()
+
+            # Rows with a missing group key (code -1) are left out, like groupby
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(labels) + 1))
+            for local, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:])):
+                if hi > lo:
+                    self._accumulate(group_map[local], values[order[lo:hi]])
+        return self
+
+    def update(self, data):
+        """
+        Add a saved scraper row to its group's co-moment sums; the row is
+        typed like the CSV loader first, and rows without a group key are
+        skipped when grouping
+        """
+        key = self._row_key(data)
+        if key is None and self.by is not None:
+            return
+        # Typed as the CSV loader reads it ("28.8 km" -> 28.8); non-numeric values count as missing
+        record = {**data, **normalize_record(data)}
+        values = np.array([[_as_float(record.get(c)) for c in self.columns]], dtype=np.float64)
+        with self._lock:
+            if self.shift is None:
+                self.shift = np.nan_to_num(values[0])
+            code = self._group_code(key)
+            self._grow()
+            self._accumulate(code, values)
+
+    def corr(self, group=None):
+        """
+        Correlation matrix as a DataFrame, for one group or (group=None)
+        across every group
+        """
+        with self._lock:
+            if group is None or self.by is None:
+                moments = [a.sum(axis=0) for a in (self.count, self.total, self.total_sq, self.cross)]
+            else:
+                code = self._group_index[group]
+                moments = [a[code] for a in (self.count, self.total, self.total_sq, self.cross)]
+        return pd.DataFrame(_pearson(*moments), index=self.columns, columns=self.columns)
+
+    def column(self, name):
+        """Correlation of `name` with every column, one row per group"""
+        i = self.columns.index(name)
+        with self._lock:
+            groups = list(self.groups)
+            moments = [a.copy() for a in (self.count, self.total, self.total_sq, self.cross)]
+        rows = [_pearson(*(a[g] for a in moments))[i] for g in range(len(groups))]
+        index = pd.MultiIndex.from_tuples(groups, names=ROUTE_COLUMNS) if self.by == 'route' else pd.Index(
+            groups, name=self.by)
+        return pd.DataFrame(np.array(rows).reshape(len(groups), len(self.columns)), index=index,
+                            columns=self.columns)
+
+    def save(self, path):
+        """
+        Write the per-group pairwise counts, shifted sums and cross products
+        with the shift and group labels to an .npz file; the shift must be
+        kept so rows added after load() are summed around the same origin
+        """
+        np.savez(path, count=self.count, total=self.total, total_sq=self.total_sq, cross=self.cross,
+                 shift=self.shift if self.shift is not None else np.array([]),
+                 labels=json.dumps({'columns': self.columns, 'by': self.by, 'groups': self.groups}))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            labels = json.loads(str(data['labels']))
+            matrix = cls(labels['columns'], labels['by'])
+            matrix.groups = [tuple(g) if isinstance(g, list) else g for g in labels['groups']]
+            matrix._group_index = {g: i for i, g in enumerate(matrix.groups)}
+            matrix.shift = data['shift'] if len(data['shift']) else None
+            matrix.count, matrix.total, matrix.total_sq, matrix.cross = (
+                data['count'], data['total'], data['total_sq'], data['cross'])
+        return matrix
+
+
+def _as_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _pearson(count, total, total_sq, cross):
+    """Pairwise-complete Pearson r from the co-moment sums of one group"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # total[i, j] is the sum of column i over rows where i and j are both present
+        cov = cross - total * total.T / count
+        var = total_sq - total * total / count
+        r = cov / np.sqrt(var * var.T)
+    # A column constant within a group still leaves round-off when the shared
+    # shift is not that constant; treat relative variance at that level as zero
+    constant = var <= 1e-10 * total_sq
+    r[(count < 2) | constant | constant.T] = np.nan
+    return np.clip(r, -1, 1)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from loader import load_traffic_csv
+
+    path = sys.argv[1] if len(sys.argv) > 1 else '../Data/traffic_weather_data_lagos.csv'
+    df = load_traffic_csv(path)
+    numeric = df.select_dtypes(include=[np.number]).columns
+    start = time.perf_counter()
+    matrix = CorrelationMatrix(numeric, by='time_period').update_frame(df)
+    elapsed = time.perf_counter() - start
+    print(f"{len(df):,} rows, {len(numeric)} columns, {len(matrix.groups)} time periods "
+          f"in {elapsed * 1000:.0f} ms")
+    print(matrix.column('traffic_ratio').round(2).T)
@@ -0,0 +1,238 @@
+import json
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from lag_features import ROUTE_COLUMNS
+from schema import DAY_ORDER, TIME_PERIOD_ORDER
+from time_features import PEAK_HOURS, TIME_PERIOD_CODES
+
+CUBE_METRICS = ['traffic_ratio', 'duration_in_traffic_mins']
+
+# Rollup dimension -> cube axis it derives from
+DIMENSIONS = {
+    'route': 0, 'city': 0, 'origin': 0, 'destination': 0,
+    'hour': 1, 'time_period': 1, 'peak_hour': 1,
+    'day_of_week': 2, 'is_weekend': 2,
+    'weather_condition': 3
+}
+
+
+class AggregateCube:
+    def __init__(self, metrics=CUBE_METRICS):
+        """
+        count / sum / sum-of-squares of each metric over
+        (route, hour, day_of_week, weather_condition).
+
+        time_period and peak_hour are functions of the hour (see
+        time_features), and city/origin/destination of the route, so they
+        are derived when rolling up instead of multiplying the cube size.
+        Any rollup over these dimensions gives mean, std (ddof=1, as pandas)
+        and count without touching raw rows.
+
+        Rows with a missing weather_condition are kept (weather slot 0) but,
+        like pandas groupby, left out of rollups by weather_condition. Rows
+        without a valid hour_of_day (0-23) or day_of_week name have no cell;
+        they are skipped and counted in skipped_rows.
+        """
+        self.metrics = list(metrics)
+        self.routes = []
+        self.weather = [None]
+        self._route_index = {}
+        self._weather_index = {None: 0}
+        shape = (0, 24, 7, 1, len(self.metrics))
+        self.count = np.zeros(shape)
+        self.total = np.zeros(shape)
+        self.total_sq = np.zeros(shape)
+        self.skipped_rows = 0
+        self._lock = threading.Lock()
+
+    def _grow(self):
+        shape = (len(self.routes), 24, 7, len(self.weather), len(self.metrics))
+        if shape == self.count.shape:
+            return
+        pad = [(0, new - old) for new, old in zip(shape, self.count.shape)]
+        self.count = np.pad(self.count, pad)
+        self.total = np.pad(self.total, pad)
+        self.total_sq = np.pad(self.total_sq, pad)
+
+    def _route_code(self, route):
+        code = self._route_index.get(route)
+        if code is None:
+            code = self._route_index[route] = len(self.routes)
+            self.routes.append(route)
+        return code
+
+    def _weather_code(self, condition):
+        if condition is None or condition != condition or condition == '':
+            return 0
+        code = self._weather_index.get(condition)
+        if code is None:
+            code = self._weather_index[condition] = len(self.weather)
+            self.weather.append(condition)
+        return code
+
+    def update_frame(self, df):
+        """Add a batch of rows (e.g. a whole city CSV) in one vectorized pass"""
+        hour = pd.to_numeric(df['hour_of_day'], errors='coerce').to_numpy(dtype=np.float64)
+        # -1 for a missing or unknown day name
+        day = pd.Index(DAY_ORDER).get_indexer(df['day_of_week'].astype(object))
+        usable = (hour >= 0) & (hour < 24) & (day >= 0)
+        if not usable.all():
+            skipped = int((~usable).sum())
+            logging.warning(f"Aggregate cube skipped {skipped} row(s) without a valid hour_of_day/day_of_week")
+            df, hour, day = df[usable], hour[usable], day[usable]
+
+        routes = df[ROUTE_COLUMNS].astype(str)
+        keys, route_labels = pd.factorize(pd.MultiIndex.from_frame(routes))
+        weather = df['weather_condition'].astype(object)
+        weather_keys, weather_labels = pd.factorize(weather)
+
+        with self._lock:
+            self.skipped_rows += len(usable) - len(df)
+            route_map = np.array([self._route_code(tuple(r)) for r in route_labels], dtype=np.int64)
+            weather_map = np.array([self._weather_code(w) for w in weather_labels] + [0], dtype=np.int64)
+            self._grow()
+            index = np.ravel_multi_index(
+                (route_map[keys], hour.astype(np.int64), day, weather_map[weather_keys]),
+                self.count.shape[:4]
+            )
+            size = int(np.prod(self.count.shape[:4]))
+            for m, metric in enumerate(self.metrics):
+                values = df[metric].to_numpy(dtype=np.float64)
+                valid = ~np.isnan(values)
+                cells, values = index[valid], values[valid]
+                self.count[..., m] += np.bincount(cells, minlength=size).reshape(self.count.shape[:4])
+                self.total[..., m] += np.bincount(cells, values, minlength=size).reshape(self.count.shape[:4])
+                self.total_sq[..., m] += np.bincount(cells, values * values, minlength=size).reshape(
+                    self.count.shape[:4])
+        return self
+
+    def update(self, data):
+        """
+        Add a saved scraper row to its (route, hour, day_of_week, weather)
+        cell: count, sum and sum of squares of each non-missing metric
+        """
+        hour, day = data.get('hour_of_day'), data.get('day_of_week')
+        with self._lock:
+            if day not in DAY_ORDER or pd.isna(hour) or not 0 <= hour < 24:
+                self.skipped_rows += 1
+                return
+            route = self._route_code(tuple(str(data[c]) for c in ROUTE_COLUMNS))
+            weather = self._weather_code(data.get('weather_condition'))
+            self._grow()
+            cell = (route, int(hour), DAY_ORDER.index(day), weather)
+            for m, metric in enumerate(self.metrics):
+                value = data.get(metric)
+                if value is None or value != value:
+                    continue
+                self.count[cell + (m,)] += 1
+                self.total[cell + (m,)] += value
+                self.total_sq[cell + (m,)] += value * value
+
+    def _dimension_codes(self, dimension):
+        """(code per value of the source axis, label per code)"""
+        if dimension == 'route':
+            return np.arange(len(self.routes)), list(self.routes)
+        if dimension in ('city', 'origin', 'destination'):
+            part = ROUTE_COLUMNS.index(dimension)
+            codes, labels = pd.factorize(np.array([r[part] for r in self.routes], dtype=object), sort=True)
+            return codes, list(labels)
+        if dimension == 'hour':
+            return np.arange(24), list(range(24))
+        if dimension == 'time_period':
+            return TIME_PERIOD_CODES.astype(np.int64), TIME_PERIOD_ORDER
+        if dimension == 'peak_hour':
+            return PEAK_HOURS.astype(np.int64), [False, True]
+        if dimension == 'day_of_week':
+            return np.arange(7), DAY_ORDER
+        if dimension == 'is_weekend':
+            return (np.arange(7) >= 5).astype(np.int64), [False, True]
+        if dimension == 'weather_condition':
+            return np.arange(len(self.weather)), list(self.weather)
+        raise ValueError(f"Unknown dimension: {dimension}")
+
+    def labels(self, dimension):
+        """Values of a dimension in the order rollups list them"""
+        codes, labels = self._dimension_codes(dimension)
+        return [labels[code] for code in sorted(set(codes.tolist())) if labels[code] is not None]
+
+    def rollup(self, by, metric='traffic_ratio', stats=('mean', 'std', 'count')):
+        """
+        Aggregate over every dimension not in `by`, e.g.
+        rollup(['hour', 'day_of_week']) for the hour x weekday heatmap.
+        Returns a DataFrame indexed by `by` with one column per stat.
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        for d in by:
+            if d not in DIMENSIONS:
+                raise ValueError(f"Unknown dimension: {d}")
+        m = self.metrics.index(metric)
+        with self._lock:
+            cube = np.stack([self.count[..., m], self.total[..., m], self.total_sq[..., m]])
+
+        levels = {}
+        for axis in range(4):
+            dims = [d for d in by if DIMENSIONS.get(d, -1) == axis]
+            codes = [self._dimension_codes(d) for d in dims]
+            size = cube.shape[axis + 1]
+            if dims:
+                combined = np.ravel_multi_index([c for c, _ in codes], [len(l) for _, l in codes])
+                groups, uniques = pd.factorize(combined, sort=True)
+                combos = np.unravel_index(uniques, [len(l) for _, l in codes])
+                for d, (_, labels), combo in zip(dims, codes, combos):
+                    levels[d] = (axis, [labels[i] for i in combo], combo)
+            else:
+                groups, uniques = np.zeros(size, dtype=np.int64), [0]
+            onehot = np.zeros((size, len(uniques)))
+            onehot[np.arange(size), groups] = 1
+            cube = np.moveaxis(np.moveaxis(cube, axis + 1, -1) @ onehot, -1, axis + 1)
+
+        count, total, total_sq = (a.reshape(-1) for a in cube)
+        grid = np.indices(cube.shape[1:]).reshape(4, -1)
+        index = pd.MultiIndex.from_arrays(
+            [np.array(levels[d][1], dtype=object)[grid[levels[d][0]]] for d in by], names=by
+        ) if by else pd.RangeIndex(1)
+
+        # Rows nested in `by` order, each level in its natural (code) order
+        order = np.lexsort([levels[d][2][grid[levels[d][0]]] for d in reversed(by)]) if by else [0]
+        count, total, total_sq, index = count[order], total[order], total_sq[order], index[order]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = total / count
+            variance = np.maximum(total_sq - count * mean * mean, 0) / (count - 1)
+        result = pd.DataFrame({
+            'mean': mean,
+            'std': np.where(count > 1, np.sqrt(variance), np.nan),
+            'count': count.astype(np.int64),
+            'sum': total
+        }, index=index)[list(stats)]
+
+        keep = count > 0
+        if 'weather_condition' in by:
+            keep &= result.index.get_level_values('weather_condition').notna()
+        result = result[keep]
+        if len(by) == 1:
+            result.index = result.index.get_level_values(0)
+        return result
+
+    def save(self, path):
+        """
+        Write the per-cell count/sum/sum-of-squares arrays and the route and
+        weather labels to an .npz file; load() restores the cube and new
+        rows are added to the loaded cells
+        """
+        np.savez(path, count=self.count, total=self.total, total_sq=self.total_sq,
+                 labels=json.dumps({'metrics': self.metrics, 'routes': self.routes, 'weather': self.weather}))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            labels = json.loads(str(data['labels']))
+            cube = cls(labels['metrics'])
+            cube.routes = [tuple(r) for r in labels['routes']]
+            cube.weather = labels['weather']
+            cube._route_index = {r: i for i, r in enumerate(cube.routes)}
+            cube._weather_index = {w: i for i, w in enumerate(cube.weather)}
+            cube.count, cube.total, cube.total_sq = data['count'], data['total'], data['total_sq']
+        return cube
@@ -0,0 +1,178 @@
+import numpy as np
+
+PAIR_COLUMNS = ['traffic_ratio', 'temperature_c', 'humidity_percent', 'wind_speed_ms']
+
+
+class OLSStats:
+    def __init__(self):
+        """
+        Running sums for a simple y = a + b*x least-squares fit: n, sum x,
+        sum y, sum xy, sum x^2 and sum y^2. Values are shifted by the first
+        batch's means before summing, which keeps the variance terms from
+        cancelling out when the data sits far from zero (e.g. pressure in hPa).
+        """
+        self.n = 0
+        self.shift = None
+        self.sx = self.sy = self.sxy = self.sxx = self.syy = 0.0
+
+    def update(self, x, y):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        valid = ~(np.isnan(x) | np.isnan(y))
+        x, y = x[valid], y[valid]
+        if not len(x):
+            return self
+        if self.shift is None:
+            self.shift = (x.mean(), y.mean())
+        x, y = x - self.shift[0], y - self.shift[1]
+        self.n += len(x)
+        self.sx += x.sum()
+        self.sy += y.sum()
+        self.sxy += x @ y
+        self.sxx += x @ x
+        self.syy += y @ y
+        return self
+
+    def fit(self):
+        """(slope, intercept, r2) in the original units; NaN when x is constant"""
+        nan = float('nan')
+        if self.n < 2:
+            return nan, nan, nan
+        sxx = self.sxx - self.sx * self.sx / self.n
+        syy = self.syy - self.sy * self.sy / self.n
+        sxy = self.sxy - self.sx * self.sy / self.n
+        if sxx <= 0:
+            return nan, nan, nan
+        slope = sxy / sxx
+        intercept = (self.sy - slope * self.sx) / self.n
+        r2 = sxy * sxy / (sxx * syy) if syy > 0 else nan
+        # Undo the shift: y - y0 = intercept + slope * (x - x0)
+        x0, y0 = self.shift
+        return slope, intercept + y0 - slope * x0, r2
+
+
+class BinnedScatter:
+    def __init__(self, x_edges, y_edges, x_name='x', y_name='y'):
+        """
+        Fixed-grid 2D histogram of (x, y) plus OLSStats, so a scatter with a
+        trendline can be drawn from len(x_edges) * len(y_edges) cells
+        whatever the row count. Points outside the edges are counted in the
+        outermost bins; the fit always uses the exact values.
+        """
+        self.x_edges = np.asarray(x_edges, dtype=np.float64)
+        self.y_edges = np.asarray(y_edges, dtype=np.float64)
+        self.x_name, self.y_name = x_name, y_name
+        self.counts = np.zeros((len(self.x_edges) - 1, len(self.y_edges) - 1), dtype=np.int64)
+        self.ols = OLSStats()
+
+    @classmethod
+    def from_frame(cls, df, x, y, bins=80):
+        """Edges spanning each column's range, then one pass over the rows"""
+        x_values = df[x].to_numpy(dtype=np.float64)
+        y_values = df[y].to_numpy(dtype=np.float64)
+        binned = cls(_edges(x_values, bins), _edges(y_values, bins), x, y)
+        return binned.update(x_values, y_values)
+
+    def update(self, x, y):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        self.ols.update(x, y)
+        valid = ~(np.isnan(x) | np.isnan(y))
+        nx, ny = self.counts.shape
+        i = np.clip(np.searchsorted(self.x_edges, x[valid], side='right') - 1, 0, nx - 1)
+        j = np.clip(np.searchsorted(self.y_edges, y[valid], side='right') - 1, 0, ny - 1)
+        self.counts += np.bincount(i * ny + j, minlength=nx * ny).reshape(nx, ny)
+        return self
+
+    def fit(self):
+        return self.ols.fit()
+
+    def plot(self, ax, cmap='viridis'):
+        """Draw onto a matplotlib axis: log-scaled cell counts plus the OLS line"""
+        from matplotlib.colors import LogNorm
+
+        counts = np.ma.masked_equal(self.counts.T, 0)
+        mesh = ax.pcolormesh(self.x_edges, self.y_edges, counts, cmap=cmap,
+                             norm=LogNorm(vmin=1, vmax=max(1, counts.max() or 1)))
+        slope, intercept, r2 = self.fit()
+        if slope == slope:
+            xs = self.x_edges[[0, -1]]
+            ax.plot(xs, intercept + slope * xs, color='red',
+                    label=f"OLS: y = {slope:.4f}x + {intercept:.3f} (R² = {r2:.3f})")
+            ax.legend(fontsize=8)
+        ax.set_xlabel(self.x_name)
+        ax.set_ylabel(self.y_name)
+        return mesh
+
+    def figure(self, title=None):
+        """plotly figure: cell-count heatmap with the OLS trendline"""
+        import plotly.graph_objects as go
+
+        x_mid = (self.x_edges[:-1] + self.x_edges[1:]) / 2
+        y_mid = (self.y_edges[:-1] + self.y_edges[1:]) / 2
+        counts = np.where(self.counts.T > 0, self.counts.T, np.nan)
+        fig = go.Figure(go.Heatmap(x=x_mid, y=y_mid, z=np.log10(counts), colorscale='Viridis',
+                                   colorbar={'title': 'log10 rows'}))
+        slope, intercept, r2 = self.fit()
+        if slope == slope:
+            xs = self.x_edges[[0, -1]]
+            fig.add_trace(go.Scatter(x=xs, y=intercept + slope * xs, mode='lines', line={'color': 'red'},
+                                     name=f"OLS (R² = {r2:.3f})"))
+        fig.update_layout(title=title, xaxis_title=self.x_name, yaxis_title=self.y_name)
+        return fig
+
+
+def _edges(values, bins):
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return np.linspace(0, 1, bins + 1)
+    lo, hi = values.min(), values.max()
+    if lo == hi:
+        lo, hi = lo - 0.5, hi + 0.5
+    return np.linspace(lo, hi, bins + 1)
+
+
+def binned_pairs(df, columns=PAIR_COLUMNS, bins=40):
+    """
+    The data behind sns.pairplot: a 1D histogram per column (diagonal) and a
+    BinnedScatter per ordered pair of columns (off-diagonal)
+    """
+    values = {c: df[c].to_numpy(dtype=np.float64) for c in columns}
+    edges = {c: _edges(values[c], bins) for c in columns}
+    diagonal = {
+        c: np.histogram(values[c][~np.isnan(values[c])], bins=edges[c])[0]
+        for c in columns
+    }
+    pairs = {}
+    for i, row in enumerate(columns):
+        for col in columns[:i]:
+            # Bin each unordered pair once; the mirrored panel is its transpose
+            pairs[row, col] = BinnedScatter(edges[col], edges[row], col, row).update(values[col], values[row])
+    return {'columns': list(columns), 'edges': edges, 'diagonal': diagonal, 'pairs': pairs}
+
+
+def pairplot(binned, size=2.5):
+    """matplotlib pair grid from binned_pairs, drawn from bin counts only"""
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import LogNorm
+
+    columns = binned['columns']
+    k = len(columns)
+    fig, axes = plt.subplots(k, k, figsize=(size * k, size * k), squeeze=False)
+    for i, row in enumerate(columns):
+        for j, col in enumerate(columns):
+            ax = axes[i][j]
+            if i == j:
+                ax.stairs(binned['diagonal'][row], binned['edges'][row], fill=True)
+            else:
+                pair = binned['pairs'][(row, col) if j < i else (col, row)]
+                counts = pair.counts.T if j < i else pair.counts
+                counts = np.ma.masked_equal(counts, 0)
+                ax.pcolormesh(binned['edges'][col], binned['edges'][row], counts, cmap='viridis',
+                              norm=LogNorm(vmin=1, vmax=max(1, counts.max() or 1)))
+            if i == k - 1:
+                ax.set_xlabel(col)
+            if j == 0:
+                ax.set_ylabel(row)
+    fig.tight_layout()
+    return fig
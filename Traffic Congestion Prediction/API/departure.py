@@ -0,0 +1,110 @@
+import threading
+import time
+import numpy as np
+import pandas as pd
+from service import parse_time, calendar_features
+
+SLOT = pd.Timedelta('15min')
+
+
+def day_type(ts):
+    """Weekday name, or 'Holiday' for public holidays"""
+    return 'Holiday' if calendar_features(ts)['is_holiday'] else ts.day_name()
+
+
+class DepartureSearch:
+    def __init__(self, service, cache_ttl=900, max_slots=96):
+        """
+        Best departure time within a window for a route, from a
+        PredictionService.
+
+        Every 15-minute slot of the window is scored in one batch: feature
+        rows for all slots are stacked and sent to the models in a single
+        predict per horizon (one call when the window sits within one
+        horizon, as future windows do).
+
+        Slots beyond the longest trained horizon carry the route's latest
+        lag and rolling features forward (see PredictionService.feature_vector),
+        so among those slots the ranking rests on the calendar features and
+        the latest weather: it tells hours, weekdays and holidays apart, but
+        not slots within one hour.
+
+        Results are cached per (route, window, latest observation) for
+        cache_ttl seconds, so a new scrape of the route replaces the answer
+        at once and expired windows are dropped on the next miss.
+        """
+        self.service = service
+        self.cache_ttl = cache_ttl
+        self.max_slots = max_slots
+        self._cache = {}
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _score(self, route, slots):
+        horizons, rows = zip(*[self.service.feature_vector(route, slot, carry=True) for slot in slots])
+        X = np.vstack(rows)
+        ratios = np.empty(len(slots))
+        for horizon in set(horizons):
+            mask = np.array([h == horizon for h in horizons])
+            ratios[mask] = self.service.registry.predict(horizon, [route] * int(mask.sum()), X[mask])
+        return ratios * self.service.normal_minutes.get(route, np.nan)
+
+    def invalidate(self, route=None):
+        with self._lock:
+            if route is None:
+                self._cache.clear()
+            else:
+                self._cache = {k: v for k, v in self._cache.items() if k[0] != route}
+
+    def best_departure(self, route, start=None, end=None, top=3):
+        """
+        Optimal departure between start (default: next slot) and end
+        (default: start + 3h), both Africa/Lagos, with the predicted
+        duration_in_traffic_mins of every slot. Ties go to the earliest slot.
+        """
+        if route not in self.service.registry.route_index:
+            raise KeyError(f"No model for route {route}")
+        start = parse_time(start).ceil(SLOT)
+        end = parse_time(end).floor(SLOT) if end is not None else start + pd.Timedelta('3h')
+        if end < start:
+            raise ValueError("end must not be before start")
+        if (end - start) / SLOT + 1 > self.max_slots:
+            raise ValueError(f"window is longer than {self.max_slots} slots")
+
+        key = (route, start, end, self.service.store.latest(route))
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(key)
+            hit = cached is not None and now - cached[0] < self.cache_ttl
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+        if hit:
+            minutes = cached[1]
+        else:
+            minutes = self._score(route, pd.date_range(start, end, freq=SLOT))
+            with self._lock:
+                self._cache = {k: v for k, v in self._cache.items() if now - v[0] < self.cache_ttl}
+                self._cache[key] = (now, minutes)
+
+        slots = pd.date_range(start, end, freq=SLOT)
+        order = np.argsort(minutes, kind='stable')
+        best = [
+            {
+                'departure': slots[i].isoformat(),
+                'predicted_minutes': float(minutes[i]),
+                'arrival': (slots[i] + pd.Timedelta(minutes=float(minutes[i]))).round('s').isoformat()
+            }
+            for i in order[:top]
+        ]
+        return {
+            'city': route[0],
+            'origin': route[1],
+            'destination': route[2],
+            'day_type': day_type(start),
+            'best': best,
+            'minutes_saved': float(np.nanmax(minutes) - minutes[order[0]]),
+            'slots': [{'departure': s.isoformat(), 'predicted_minutes': float(m)} for s, m in zip(slots, minutes)]
+        }
@@ -0,0 +1,170 @@
+import numpy as np
+import pandas as pd
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Indices of the points Largest-Triangle-Three-Buckets keeps from a series
+    sorted by x (Steinarsson, 2013).
+
+    The first and last points are always kept. The rest are split into
+    n_out - 2 equal buckets, and from each bucket the point forming the
+    largest triangle with the previously kept point and the mean of the
+    next bucket is kept, which preserves peaks and dips that averaging
+    would flatten.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    bounds = (np.arange(n_out - 1) * ((n - 2) / (n_out - 2))).astype(np.int64) + 1
+    bounds[-1] = n - 1
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = bounds[i], bounds[i + 1]
+        if i + 2 < len(bounds):
+            next_start, next_end = end, bounds[i + 2]
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        # Twice the triangle area; the constant factor does not change the argmax
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+class SeriesDownsampler:
+    def __init__(self, df, x='timestamp', y='traffic_ratio', by=('origin', 'destination'), points=2000):
+        """
+        Per-route LTTB views of a time series for plotting.
+
+        Each route is sorted once; view() slices the visible time range with
+        a binary search and spends the point budget evenly across routes.
+        A route with no more visible points than its share is returned at
+        full resolution, so zooming in far enough shows the raw scrapes.
+
+        by: column naming each series, or several columns joined into an
+            "origin → destination" label in a 'route' column (the default, so
+            routes sharing an origin stay separate series)
+        points: total point budget per viewport, across all routes
+        """
+        columns = [by] if isinstance(by, str) else list(by)
+        self.x, self.y, self.by = x, y, by if isinstance(by, str) else 'route'
+        self.points = points
+        times = pd.DatetimeIndex(df[x])
+        self.tz = times.tz
+        # Nanoseconds since the epoch in UTC (asi8 ignores the tz); LTTB only needs a monotonic axis
+        values = times.as_unit('ns').asi8
+        metric = df[y].to_numpy(dtype=np.float64)
+        keys = df[columns[0]].astype(str)
+        for column in columns[1:]:
+            keys = keys + ' → ' + df[column].astype(str)
+        keys = keys.to_numpy()
+
+        self.routes = {}
+        for route in np.unique(keys):
+            mask = (keys == route) & ~np.isnan(metric)
+            order = np.argsort(values[mask], kind='stable')
+            self.routes[route] = (values[mask][order], metric[mask][order])
+        self._cache = {}
+
+    def _bound(self, value):
+        if value is None:
+            return None
+        ts = pd.Timestamp(value)
+        if ts.tz is None and self.tz is not None:
+            ts = ts.tz_localize(self.tz)
+        return ts.as_unit('ns').value
+
+    def view(self, start=None, end=None, points=None):
+        """
+        Downsampled rows between start and end (default: everything), as a
+        DataFrame with the by, x and y columns
+        """
+        points = points or self.points
+        key = (start, end, points)
+        cached = self._cache.get(key) if start is None and end is None else None
+        if cached is not None:
+            return cached
+
+        lo, hi = self._bound(start), self._bound(end)
+        budget = max(3, points // max(1, len(self.routes)))
+        frames = []
+        for route, (times, values) in self.routes.items():
+            i = np.searchsorted(times, lo, side='left') if lo is not None else 0
+            j = np.searchsorted(times, hi, side='right') if hi is not None else len(times)
+            # Keep one point either side so lines run to the edges of the viewport
+            i, j = max(0, i - 1), min(len(times), j + 1)
+            t, v = times[i:j], values[i:j]
+            keep = lttb_indices(t - t[0] if len(t) else t, v, budget)
+            frames.append(pd.DataFrame({
+                self.by: route,
+                self.x: pd.to_datetime(t[keep], utc=self.tz is not None).tz_convert(self.tz)
+                if self.tz is not None else pd.to_datetime(t[keep]),
+                self.y: v[keep]
+            }))
+
+        result = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=[self.by, self.x, self.y])
+        if start is None and end is None:
+            self._cache[key] = result
+        return result
+
+    def figure(self, title=None, start=None, end=None, points=None):
+        """Static plotly figure of view(); one WebGL trace per route"""
+        import plotly.graph_objects as go
+
+        frame = self.view(start, end, points)
+        fig = go.Figure(layout={'title': title, 'xaxis_title': self.x, 'yaxis_title': self.y})
+        for route, group in frame.groupby(self.by, sort=False):
+            fig.add_trace(go.Scattergl(x=group[self.x], y=group[self.y], mode='lines', name=route))
+        return fig
+
+    def widget(self, title=None, points=None):
+        """
+        plotly FigureWidget that re-downsamples the visible range whenever
+        the x axis is zoomed or panned (needs a Jupyter widget frontend;
+        falls back to a static figure elsewhere)
+        """
+        import plotly.graph_objects as go
+
+        try:
+            fig = go.FigureWidget(self.figure(title, points=points))
+        except (ImportError, ValueError):
+            return self.figure(title, points=points)
+
+        def rescale(layout, x_range):
+            start, end = x_range if x_range else (None, None)
+            frame = self.view(start, end, points)
+            groups = dict(tuple(frame.groupby(self.by, sort=False)))
+            with fig.batch_update():
+                for trace in fig.data:
+                    group = groups.get(trace.name)
+                    if group is not None:
+                        trace.x, trace.y = group[self.x], group[self.y]
+
+        fig.layout.on_change(rescale, 'xaxis.range')
+        return fig
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from loader import load_traffic_csv
+
+    path = sys.argv[1] if len(sys.argv) > 1 else '../Data/traffic_weather_data_lagos.csv'
+    df = load_traffic_csv(path, columns=['origin', 'destination', 'timestamp', 'traffic_ratio'])
+    start = time.perf_counter()
+    sampler = SeriesDownsampler(df)
+    full = sampler.view()
+    elapsed = time.perf_counter() - start
+    day = df['timestamp'].min() + pd.Timedelta('1D')
+    zoomed = sampler.view(df['timestamp'].min(), day)
+    print(f"{len(df):,} rows -> {len(full):,} points for the full range in {elapsed * 1000:.0f} ms; "
+          f"first day: {len(zoomed):,} points")
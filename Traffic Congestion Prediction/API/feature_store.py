@@ -0,0 +1,253 @@
+import math
+import threading
+from collections import deque
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from lag_features import LAG_METRICS, DEFAULT_LAGS, DEFAULT_WINDOWS, DEFAULT_STATS, _feature_name
+
+
+def _microseconds(value):
+    return pd.Timedelta(value) // pd.Timedelta(microseconds=1)
+
+
+def _timestamp_us(value):
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    # Timestamp.value is always nanoseconds, whatever the unit
+    return pd.Timestamp(value).value // 1000
+
+
+class RollingWindow:
+    def __init__(self, window_us):
+        """
+        Running count/sum/sum-of-squares and monotonic min/max deques over
+        the observations in [latest - window, latest], expired as new
+        observations arrive, so the state stays bounded by the window.
+        Push is amortized O(1); stats(at) for a later time leaves out the
+        expired prefix without changing the state.
+        """
+        self.window_us = window_us
+        self._items = deque()
+        self._min = deque()
+        self._max = deque()
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def __len__(self):
+        return len(self._items)
+
+    def push(self, t, value):
+        self.expire(t)
+        if value != value:
+            return
+        self._items.append((t, value))
+        self.count += 1
+        self.total += value
+        self.total_sq += value * value
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((t, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((t, value))
+
+    def expire(self, now):
+        cutoff = now - self.window_us
+        while self._items and self._items[0][0] < cutoff:
+            _, value = self._items.popleft()
+            self.count -= 1
+            self.total -= value
+            self.total_sq -= value * value
+        while self._min and self._min[0][0] < cutoff:
+            self._min.popleft()
+        while self._max and self._max[0][0] < cutoff:
+            self._max.popleft()
+        if not self.count:
+            # Reset accumulated rounding error whenever the window empties
+            self.total = self.total_sq = 0.0
+
+    def stats(self, at=None):
+        """
+        mean, std (ddof=1, as pandas), min and max over [at - window, at)
+        for a time after every pushed observation (default: the current
+        window)
+        """
+        count, total, total_sq = self.count, self.total, self.total_sq
+        low = self._min[0] if self._min else None
+        high = self._max[0] if self._max else None
+        if at is not None:
+            cutoff = at - self.window_us
+            for t, value in self._items:
+                if t >= cutoff:
+                    break
+                count -= 1
+                total -= value
+                total_sq -= value * value
+            # Monotonic deques: the first entry inside the window is its min/max
+            low = next((item for item in self._min if item[0] >= cutoff), None)
+            high = next((item for item in self._max if item[0] >= cutoff), None)
+
+        if not count:
+            return {'mean': math.nan, 'std': math.nan, 'min': math.nan, 'max': math.nan}
+        mean = total / count
+        if count > 1:
+            variance = max(0.0, (total_sq - count * mean * mean) / (count - 1))
+            std = math.sqrt(variance)
+        else:
+            std = math.nan
+        return {'mean': mean, 'std': std, 'min': low[1], 'max': high[1]}
+
+
+class RouteBuffer:
+    def __init__(self, capacity, n_metrics):
+        """
+        Fixed-size ring buffer of the last `capacity` observations of a route.
+
+        Each observation is written twice, at i and i + capacity, so the
+        latest `capacity` entries are always one contiguous, time-ordered
+        slice that can be binary searched without copying.
+        """
+        self.capacity = capacity
+        self.times = np.zeros(2 * capacity, dtype=np.int64)
+        self.values = np.full((2 * capacity, n_metrics), np.nan)
+        self.size = 0
+        self._next = 0
+
+    def push(self, t, values):
+        i = self._next
+        self.times[i] = self.times[i + self.capacity] = t
+        self.values[i] = self.values[i + self.capacity] = values
+        self._next = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def window(self):
+        start = self._next if self.size == self.capacity else 0
+        return self.times[start:start + self.size], self.values[start:start + self.size]
+
+    def nearest(self, target, tolerance):
+        """Values of the observation nearest to target within tolerance, or None"""
+        times, values = self.window()
+        i = np.searchsorted(times, target)
+        best, best_distance = None, tolerance + 1
+        for j in (i - 1, i):
+            if 0 <= j < len(times) and abs(times[j] - target) < best_distance:
+                best, best_distance = j, abs(times[j] - target)
+        return None if best is None else values[best]
+
+
+class OnlineFeatureStore:
+    def __init__(self, metrics=LAG_METRICS, lags=DEFAULT_LAGS, windows=DEFAULT_WINDOWS,
+                 stats=DEFAULT_STATS, capacity=1024, tolerance='7min30s'):
+        """
+        In-process store of per-route lag and rolling features, fed one
+        scraped row at a time.
+
+        Feature names and semantics match lag_features.build_lag_features,
+        so a model trained on offline features can be served from here:
+        lags pick the observation nearest to `at - lag` within tolerance,
+        rolling stats cover [at - window, at).
+
+        capacity: observations kept per route; must cover the longest lag at
+        the scrape cadence (7 days of 15-minute rows is 672)
+        """
+        self.metrics = list(metrics)
+        self.lags = [(_feature_name(lag), _microseconds(lag)) for lag in lags]
+        self.windows = [(_feature_name(window), _microseconds(window)) for window in windows]
+        self.stats = list(stats)
+        self.capacity = capacity
+        self.tolerance = _microseconds(tolerance)
+        self._buffers = {}
+        self._rolling = {}
+        self._latest = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def route_key(data):
+        return (data['city'], data['origin'], data['destination'])
+
+    @property
+    def routes(self):
+        return list(self._buffers)
+
+    def latest(self, route):
+        """Time of the route's latest observation in microseconds since the epoch, or None"""
+        return self._latest.get(route)
+
+    def update(self, data):
+        """Add a scraped row. Rows older than the route's latest are ignored."""
+        key = self.route_key(data)
+        t = _timestamp_us(data['timestamp'])
+        values = [math.nan if data.get(metric) is None else float(data[metric]) for metric in self.metrics]
+
+        with self._lock:
+            if t < self._latest.get(key, t):
+                return
+            self._latest[key] = t
+
+            buffer = self._buffers.get(key)
+            if buffer is None:
+                buffer = self._buffers[key] = RouteBuffer(self.capacity, len(self.metrics))
+                self._rolling[key] = {
+                    (metric, name): RollingWindow(window_us)
+                    for metric in self.metrics
+                    for name, window_us in self.windows
+                }
+            buffer.push(t, values)
+            rolling = self._rolling[key]
+            for i, metric in enumerate(self.metrics):
+                for name, _ in self.windows:
+                    rolling[metric, name].push(t, values[i])
+
+    def features(self, route, at=None):
+        """
+        Lag and rolling features for a route key (city, origin, destination)
+        at a time (default: now). Rolling stats include observations strictly
+        before `at`, so pass a time after the latest scrape to include it.
+        """
+        at = _timestamp_us(at if at is not None else pd.Timestamp.now(tz='UTC'))
+        features = {}
+        with self._lock:
+            buffer = self._buffers.get(route)
+            if buffer is None:
+                raise KeyError(f"No observations for route {route}")
+
+            for name, lag_us in self.lags:
+                values = buffer.nearest(at - lag_us, self.tolerance)
+                for i, metric in enumerate(self.metrics):
+                    features[f"{metric}_lag_{name}"] = math.nan if values is None else float(values[i])
+
+            # Queries after the latest observation come from the running
+            # windows (read-only); earlier times are recomputed from the buffer
+            current = at > self._latest[route]
+            for (metric, name), window in self._rolling[route].items():
+                if current:
+                    stats = window.stats(at)
+                else:
+                    stats = self._window_stats(buffer, metric, at, window.window_us)
+                for stat in self.stats:
+                    features[f"{metric}_roll_{name}_{stat}"] = stats[stat]
+        return features
+
+    def _window_stats(self, buffer, metric, at, window_us):
+        # Recompute from the ring buffer for times at or before the latest observation
+        times, values = buffer.window()
+        mask = (times >= at - window_us) & (times < at)
+        column = values[mask, self.metrics.index(metric)]
+        column = column[~np.isnan(column)]
+        if not len(column):
+            return {'mean': math.nan, 'std': math.nan, 'min': math.nan, 'max': math.nan}
+        return {
+            'mean': float(column.mean()),
+            'std': float(column.std(ddof=1)) if len(column) > 1 else math.nan,
+            'min': float(column.min()),
+            'max': float(column.max())
+        }
+
+    def warm(self, df):
+        """Replay historical rows (e.g. the tail of a city CSV) in timestamp order"""
+        columns = ['city', 'origin', 'destination', 'timestamp'] + self.metrics
+        for row in df[columns].sort_values('timestamp').itertuples(index=False):
+            self.update(row._asdict())
+        return self
@@ -0,0 +1,36 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+_shared_session = None
+_shared_lock = threading.Lock()
+
+
+def build_session(pool_size=10, gzip=True):
+    """
+    Build a keep-alive requests session.
+
+    pool_size sets both the number of per-host pools and the connections kept
+    open per host, so it should be at least the number of concurrent requests
+    made against a single upstream.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['Accept-Encoding'] = 'gzip, deflate' if gzip else 'identity'
+    return session
+
+
+def get_shared_session(pool_size=10, gzip=True):
+    """
+    Return the process-wide session, creating it on first use.
+
+    Only the first call's settings take effect; later callers share the same
+    connection pools.
+    """
+    global _shared_session
+    with _shared_lock:
+        if _shared_session is None:
+            _shared_session = build_session(pool_size, gzip)
+        return _shared_session
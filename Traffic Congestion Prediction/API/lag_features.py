@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+
+ROUTE_COLUMNS = ['city', 'origin', 'destination']
+LAG_METRICS = ['traffic_ratio', 'duration_in_traffic_mins']
+DEFAULT_LAGS = ['15min', '1h', '24h', '7D']
+DEFAULT_WINDOWS = ['1h', '3h', '24h']
+DEFAULT_STATS = ['mean', 'std', 'min', 'max']
+# DatetimeIndex.asi8 of NaT
+NAT_US = np.iinfo(np.int64).min
+
+
+def route_codes(df, route_columns=ROUTE_COLUMNS):
+    """Integer route id per row from the route columns present in df"""
+    columns = [c for c in route_columns if c in df.columns]
+    return df.groupby(columns, observed=True, sort=True).ngroup().to_numpy()
+
+
+def _feature_name(value):
+    return str(value).replace(' ', '')
+
+
+def lag_indices(routes, times, lag, tolerance):
+    """
+    For rows sorted by (route, time), the index of the same-route row whose
+    time is nearest to time - lag, or -1 when none lies within tolerance.
+
+    routes, times: int64 arrays (times in microseconds); lag, tolerance in
+    microseconds. Routes and times are folded into one monotonic key so a
+    single searchsorted covers every route at once. NaT rows (NAT_US) get -1
+    and are never picked.
+    """
+    if not len(times):
+        return np.zeros(0, dtype=np.int64)
+
+    missing = times == NAT_US
+    if missing.any():
+        # NaT would wrap the key arithmetic below; solve for the rest and map back
+        keep = np.flatnonzero(~missing)
+        inner = lag_indices(routes[keep], times[keep], lag, tolerance)
+        best = np.full(len(times), -1, dtype=np.int64)
+        best[keep] = np.where(inner >= 0, keep[np.maximum(inner, 0)], -1)
+        return best
+
+    origin = times.min() - lag - tolerance
+    span = times.max() - origin + tolerance + 1
+    keys = routes * span + (times - origin)
+    targets = routes * span + (times - lag - origin)
+
+    right = np.searchsorted(keys, targets, side='left')
+    left = right - 1
+    best = np.full(len(times), -1, dtype=np.int64)
+    best_distance = np.full(len(times), np.iinfo(np.int64).max, dtype=np.int64)
+
+    for candidate in (left, right):
+        valid = (candidate >= 0) & (candidate < len(times))
+        candidate = np.where(valid, candidate, 0)
+        distance = np.abs(times[candidate] - (times - lag))
+        valid &= (routes[candidate] == routes) & (distance <= tolerance)
+        better = valid & (distance < best_distance)
+        best = np.where(better, candidate, best)
+        best_distance = np.where(better, distance, best_distance)
+    return best
+
+
+def build_lag_features(df, metrics=LAG_METRICS, lags=DEFAULT_LAGS, windows=DEFAULT_WINDOWS,
+                       stats=DEFAULT_STATS, tolerance='7min30s', route_columns=ROUTE_COLUMNS):
+    """
+    Add per-route lag and rolling-window features of the given metrics.
+
+    Rows are aligned on timestamp rather than row position, so a missing
+    scrape leaves a NaN instead of shifting every later lag:
+
+    - <metric>_lag_<lag>: value of the same route's observation nearest to
+      timestamp - lag, if one lies within tolerance (default half the
+      15-minute cadence)
+    - <metric>_roll_<window>_<stat>: stat over the route's observations in
+      [timestamp - window, timestamp), i.e. excluding the current row so
+      the features only use the past
+
+    Everything runs as array operations over the frame sorted by route and
+    timestamp; the result keeps df's index and row order. Rows without a
+    timestamp get NaN features and serve as no other row's lag.
+    """
+    metrics = list(metrics)
+    tolerance_us = pd.Timedelta(tolerance) // pd.Timedelta(microseconds=1)
+
+    routes = route_codes(df, route_columns)
+    times = pd.DatetimeIndex(df['timestamp']).as_unit('us').asi8
+    present = np.flatnonzero(times != NAT_US)
+    order = present[np.lexsort((times[present], routes[present]))]
+    sorted_routes, sorted_times = routes[order], times[order]
+    values = df[metrics].to_numpy(dtype=np.float64)[order]
+
+    features = {}
+    for lag in lags:
+        lag_us = pd.Timedelta(lag) // pd.Timedelta(microseconds=1)
+        index = lag_indices(sorted_routes, sorted_times, lag_us, tolerance_us)
+        found = index >= 0
+        lagged = np.where(found[:, None], values[np.where(found, index, 0)], np.nan)
+        for i, metric in enumerate(metrics):
+            features[f"{metric}_lag_{_feature_name(lag)}"] = lagged[:, i]
+
+    if windows:
+        frame = pd.DataFrame(values, columns=metrics)
+        frame['route'] = sorted_routes
+        frame['timestamp'] = pd.to_datetime(sorted_times, unit='us')
+        grouped = frame.groupby('route', sort=False)
+        for window in windows:
+            rolled = grouped.rolling(window, on='timestamp', closed='left')[metrics].agg(list(stats))
+            # groupby-rolling keeps each group's rows in order; the frame is
+            # already grouped by route, so positions line up with `order`
+            for (metric, stat), column in zip(rolled.columns, rolled.to_numpy().T):
+                features[f"{metric}_roll_{_feature_name(window)}_{stat}"] = column
+
+    if not features:
+        return df.copy()
+
+    out = np.full((len(df), len(features)), np.nan)
+    out[order] = np.column_stack(list(features.values()))
+    return df.join(pd.DataFrame(out, index=df.index, columns=list(features)))
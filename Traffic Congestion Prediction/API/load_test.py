@@ -0,0 +1,75 @@
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from urllib.parse import urlencode
+import numpy as np
+
+
+def run_client(host, port, routes, count, latencies, errors, seed):
+    """One keep-alive connection issuing `count` GET /predict requests"""
+    rng = random.Random(seed)
+    connection = http.client.HTTPConnection(host, port, timeout=10)
+    for _ in range(count):
+        params = urlencode(rng.choice(routes))
+        start = time.perf_counter()
+        try:
+            connection.request('GET', f"/predict?{params}")
+            response = connection.getresponse()
+            body = response.read()
+            if response.status != 200:
+                errors.append(body)
+                continue
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(str(e))
+            connection = http.client.HTTPConnection(host, port, timeout=10)
+            continue
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+
+
+def load_test(host='127.0.0.1', port=8000, requests=5000, concurrency=16):
+    """Hammer a running service.py from concurrent clients and summarize latency"""
+    connection = http.client.HTTPConnection(host, port, timeout=10)
+    connection.request('GET', '/routes')
+    routes = json.loads(connection.getresponse().read())
+    connection.close()
+
+    latencies, errors = [], []
+    per_client = max(1, requests // concurrency)
+    threads = [
+        threading.Thread(target=run_client, args=(host, port, routes, per_client, latencies, errors, i))
+        for i in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    ms = np.array(latencies) * 1000
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'throughput_rps': len(latencies) / elapsed,
+        'p50_ms': float(np.percentile(ms, 50)) if len(ms) else float('nan'),
+        'p99_ms': float(np.percentile(ms, 99)) if len(ms) else float('nan'),
+        'max_ms': float(ms.max()) if len(ms) else float('nan')
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Load-test the prediction service')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    args = parser.parse_args()
+
+    results = load_test(args.host, args.port, args.requests, args.concurrency)
+    print(f"requests: {results['requests']:,} ({results['errors']} errors)")
+    print(f"throughput: {results['throughput_rps']:.0f} req/s")
+    print(f"p50: {results['p50_ms']:.2f} ms  p99: {results['p99_ms']:.2f} ms  max: {results['max_ms']:.2f} ms")
@@ -0,0 +1,177 @@
+import time
+import numpy as np
+import pandas as pd
+from schema import (
+    TIMEZONE, COLUMNS, CATEGORICAL_COLUMNS, BOOL_COLUMNS, INT_COLUMNS, FLOAT_COLUMNS,
+    DAY_ORDER, TIME_PERIOD_ORDER
+)
+
+# datetime.isoformat() output of an aware datetime with microseconds
+TIMESTAMP_LENGTH = 32
+NAIVE_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+
+
+def csv_dtypes(columns=None):
+    """read_csv dtypes for the scraper's CSV columns"""
+    dtypes = {}
+    for name in columns or COLUMNS:
+        if name in ('timestamp', 'distance_km'):
+            dtypes[name] = 'str'
+        elif name in CATEGORICAL_COLUMNS:
+            dtypes[name] = 'category'
+        elif name in BOOL_COLUMNS:
+            dtypes[name] = 'bool'
+        elif name in INT_COLUMNS:
+            dtypes[name] = INT_COLUMNS[name]
+        elif name in FLOAT_COLUMNS:
+            dtypes[name] = 'float64'
+    return dtypes
+
+
+def _read_arrow(path, columns):
+    import pyarrow as pa
+    import pyarrow.csv as pv
+
+    categorical = pa.dictionary(pa.int32(), pa.string())
+    types = {}
+    for name, dtype in csv_dtypes(columns).items():
+        if dtype == 'str':
+            types[name] = pa.string()
+        elif dtype == 'category':
+            types[name] = categorical
+        elif dtype == 'bool':
+            types[name] = pa.bool_()
+        else:
+            types[name] = pa.from_numpy_dtype(np.dtype(dtype))
+
+    options = pv.ConvertOptions(column_types=types, include_columns=columns, strings_can_be_null=True)
+    df = pv.read_csv(str(path), convert_options=options).to_pandas()
+
+    # Arrow keeps categories in order of first appearance; match read_csv's sorted order
+    for name in df.columns.intersection(CATEGORICAL_COLUMNS):
+        df[name] = df[name].cat.reorder_categories(sorted(df[name].cat.categories))
+    return df
+
+
+def _read_pandas(path, columns):
+    df = pd.read_csv(path, usecols=columns, dtype=csv_dtypes(columns))
+    # usecols keeps file order; match the pyarrow reader, which keeps the requested order
+    return df if columns is None else df[list(columns)]
+
+
+def parse_timestamps(values):
+    """
+    Parse the scraper's isoformat timestamps into Africa/Lagos datetimes.
+
+    The fast path parses the fixed-width local part with an explicit format
+    and applies the UTC offset once, which holds whenever every value has
+    microseconds and the same offset (Lagos has no DST). Anything else falls
+    back to pandas' ISO8601 parser.
+    """
+    values = pd.Series(values)
+    if len(values) and (values.str.len() == TIMESTAMP_LENGTH).all():
+        offsets = values.str.slice(26).unique()
+        if len(offsets) == 1:
+            naive = pd.to_datetime(values.str.slice(0, 26), format=NAIVE_FORMAT)
+            offset = pd.to_datetime('2000-01-01T00:00:00' + offsets[0]).utcoffset()
+            return (naive - offset).dt.tz_localize('UTC').dt.tz_convert(TIMEZONE)
+
+    return pd.to_datetime(values, format='ISO8601', utc=True).dt.tz_convert(TIMEZONE)
+
+
+def parse_distance_column(values):
+    """Vectorized parse of "28.8 km" / "850 m" distance text into kilometres"""
+    values = pd.Series(values)
+    if values.str.endswith(' km').all():
+        return pd.to_numeric(values.str.slice(0, -3).str.replace(',', '', regex=False))
+
+    parts = values.str.replace(',', '', regex=False).str.extract(r'^\s*([\d.]+)\s*(km|m)?\s*$')
+    km = parts[0].astype('float64')
+    return km.where(parts[1] != 'm', km / 1000)
+
+
+def load_traffic_csv(path, columns=None, engine=None):
+    """
+    Load a traffic_weather_data_<city>.csv file with explicit types.
+
+    - origin, destination, weather and calendar labels are categoricals
+      (day_of_week and time_period ordered)
+    - is_weekend, peak_hour and has_tolls are booleans
+    - distance_km is numeric kilometres instead of "28.8 km" text
+    - timestamp is a tz-aware Africa/Lagos datetime
+
+    columns: subset of columns to read
+    engine: 'pyarrow' or 'c'; defaults to pyarrow's CSV reader when installed
+    """
+    if engine is None:
+        try:
+            import pyarrow  # noqa: F401
+            engine = 'pyarrow'
+        except ImportError:
+            engine = 'c'
+
+    df = _read_arrow(path, columns) if engine == 'pyarrow' else _read_pandas(path, columns)
+
+    if 'timestamp' in df.columns:
+        df['timestamp'] = parse_timestamps(df['timestamp'])
+    if 'distance_km' in df.columns:
+        df['distance_km'] = parse_distance_column(df['distance_km'])
+    return order_categories(df)
+
+
+def iter_traffic_csv(path, columns=None, chunksize=100_000):
+    """
+    Read a traffic_weather_data_<city>.csv file in chunks of chunksize rows,
+    typed as load_traffic_csv, so files larger than memory can be streamed.
+    Categories are per chunk.
+    """
+    for df in pd.read_csv(path, usecols=columns, dtype=csv_dtypes(columns), chunksize=chunksize):
+        if 'timestamp' in df.columns:
+            df['timestamp'] = parse_timestamps(df['timestamp'])
+        if 'distance_km' in df.columns:
+            df['distance_km'] = parse_distance_column(df['distance_km'])
+        yield order_categories(df)
+
+
+def order_categories(df):
+    """Give day_of_week and time_period their calendar order"""
+    if 'day_of_week' in df.columns:
+        df['day_of_week'] = df['day_of_week'].astype(pd.CategoricalDtype(DAY_ORDER, ordered=True))
+    if 'time_period' in df.columns:
+        df['time_period'] = df['time_period'].astype(pd.CategoricalDtype(TIME_PERIOD_ORDER, ordered=True))
+    return df
+
+
+def load_notebook_style(path):
+    """The load/convert steps as currently done in TrafficLAG.ipynb, for benchmarking"""
+    df = pd.read_csv(path)
+    df['distance_km'] = pd.to_numeric(df['distance_km'], errors='coerce')
+    df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
+    return df
+
+
+def benchmark(path, repeat=5):
+    """Best-of-repeat wall time in seconds for the notebook path and the typed loader"""
+    results = {}
+    loaders = [
+        ('notebook', load_notebook_style),
+        ('typed (c)', lambda p: load_traffic_csv(p, engine='c')),
+        ('typed', load_traffic_csv)
+    ]
+    for name, func in loaders:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func(path)
+            timings.append(time.perf_counter() - start)
+        results[name] = min(timings)
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+
+    path = sys.argv[1] if len(sys.argv) > 1 else '../Data/traffic_weather_data_lagos.csv'
+    results = benchmark(path)
+    for name, seconds in results.items():
+        print(f"{name:>10}: {seconds * 1000:.1f} ms ({results['notebook'] / seconds:.1f}x)")
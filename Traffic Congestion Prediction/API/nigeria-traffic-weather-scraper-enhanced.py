@@ -1,23 +1,106 @@
-import requests
+import asyncio
 import time
-import json
-from datetime import datetime
-import pandas as pd
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from collections import defaultdict
 from googlemaps import Client
 from pathlib import Path
 import logging
 import pytz
+from schema import ALTERNATIVE_COLUMNS
+from storage import CSVAppendWriter, ParquetPartitionWriter, load_parquet
+from loader import load_traffic_csv
+from http_session import get_shared_session
+from scheduler import WallClockScheduler
+from streaming import StreamingIQRFilter
+from feature_store import OnlineFeatureStore
+import time_features
 
 class NigeriaTrafficScraper:
-    def __init__(self, google_api_key, weather_api_key, locations):
+    def __init__(self, google_api_key, weather_api_key, locations,
+                 data_dir='.', flush_every=1, fsync=False, storage='csv',
+                 max_google_concurrency=8, max_weather_concurrency=4,
+                 weather_cache_ttl=600, http_pool_size=None,
+                 connect_timeout=5, read_timeout=30, gzip=True,
+                 use_distance_matrix=False, directions_every=4, track_outliers=True,
+                 feature_store=None, record_alternatives=True, aggregate_cube=None,
+                 correlations=None):
         """
         Initialize scraper with Google Maps API key and Nigerian locations
+
+        data_dir: directory holding the per-city CSV files; the Parquet dataset
+            goes in its parquet/ subdirectory
+        flush_every: flush each city file after this many appended rows
+        fsync: fsync on every flush, or every Parquet part file written
+            (durable, but slower on spinning disks)
+        storage: 'csv' for one CSV per city, or 'parquet' for a Parquet dataset
+            partitioned by city and date (requires pyarrow)
+        max_google_concurrency: in-flight Google Maps calls allowed by run_async
+        max_weather_concurrency: in-flight OpenWeather calls allowed by run_async
+        weather_cache_ttl: seconds a city's weather is reused; None or 0 disables the cache
+        http_pool_size: keep-alive connections per host (defaults to the larger concurrency limit)
+        connect_timeout, read_timeout: seconds allowed for each upstream HTTP call
+        gzip: request gzip-compressed responses
+        use_distance_matrix: time routes with batched Distance Matrix calls per city/destination
+        directions_every: in Distance Matrix mode, refresh full Directions (steps, tolls,
+            alternatives) once every this many cycles
+        track_outliers: flag rows outside the per-route streaming IQR fences as they are saved;
+            the fences are warmed from the rows already stored for each city
+        feature_store: OnlineFeatureStore updated with every collected row; a new
+            one is created when not given (pass a PredictionService's store so its lag
+            and rolling features see every scraped row)
+        record_alternatives: append every alternative route of each Directions result
+            to route_alternatives_<city>.csv in data_dir
+        aggregate_cube: optional cube.AggregateCube kept up to date with every saved row
+        correlations: optional correlation.CorrelationMatrix kept up to date with every saved row
         """
-        self.gmaps = Client(key=google_api_key)
+        pool_size = http_pool_size or max(max_google_concurrency, max_weather_concurrency)
+        self.session = get_shared_session(pool_size, gzip=gzip)
+        self.timeout = (connect_timeout, read_timeout)
+        self.gmaps = Client(
+            key=google_api_key,
+            requests_session=self.session,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout
+        )
         self.weather_api_key = weather_api_key
         self.locations = locations
         self.nigeria_tz = pytz.timezone('Africa/Lagos')
+        if storage == 'parquet':
+            self.writer = ParquetPartitionWriter(Path(data_dir) / 'parquet', fsync=fsync,
+                                                 flush_every=max(flush_every, len(locations)))
+        elif storage == 'csv':
+            self.writer = CSVAppendWriter(data_dir, flush_every=flush_every, fsync=fsync)
+        else:
+            raise ValueError(f"Unknown storage backend: {storage}")
+        self.alternatives_writer = CSVAppendWriter(
+            data_dir, flush_every=flush_every, fsync=fsync, prefix='route_alternatives',
+            columns=ALTERNATIVE_COLUMNS
+        ) if record_alternatives else None
+        self.max_google_concurrency = max_google_concurrency
+        self.max_weather_concurrency = max_weather_concurrency
+        self.weather_cache_ttl = weather_cache_ttl
+        self.weather_cache = {}
+        self.weather_cache_hits = 0
+        self.weather_cache_misses = 0
+        self._weather_locks = {}
+        self._weather_locks_guard = threading.Lock()
+        # The per-city locks do not cover updates from different cities
+        self._weather_stats_lock = threading.Lock()
+        self.use_distance_matrix = use_distance_matrix
+        self.directions_every = max(1, int(directions_every))
+        self.route_details = {}
+        self.cycle_count = 0
+        self.scheduler = None
+        self.outlier_filter = StreamingIQRFilter() if track_outliers else None
+        self.feature_store = feature_store if feature_store is not None else OnlineFeatureStore()
+        self.aggregate_cube = aggregate_cube
+        self.correlations = correlations
         self.setup_logging()
+        if self.outlier_filter is not None:
+            self.warm_outlier_filter()
         
     def setup_logging(self):
         logging.basicConfig(
@@ -26,13 +109,63 @@ class NigeriaTrafficScraper:
             format='%(asctime)s - %(levelname)s - %(message)s'
         )
     
+    def warm_outlier_filter(self):
+        """
+        Fit the outlier fences on the rows already stored for each city, so
+        flagging resumes right after a restart instead of once every route
+        has min_count new rows
+        """
+        columns = ['city', 'origin', 'destination'] + self.outlier_filter.metrics
+        for city in dict.fromkeys(location['city'] for location in self.locations):
+            try:
+                if isinstance(self.writer, CSVAppendWriter):
+                    path = self.writer.path_for(city)
+                    if not path.exists() or path.stat().st_size == 0:
+                        continue
+                    history = load_traffic_csv(path, columns=columns)
+                else:
+                    if not self.writer.directory.exists():
+                        continue
+                    history = load_parquet(self.writer.directory, columns=columns, cities=[city])
+                self.outlier_filter.fit(history)
+                logging.info(f"Warmed outlier filter for {city} from {len(history)} stored rows")
+            except Exception as e:
+                logging.error(f"Error warming outlier filter for {city}: {str(e)}")
+
     def get_weather_data(self, city):
-        """Get weather data for a city"""
+        """Get weather data for a city, served from the TTL cache when fresh"""
+        if not self.weather_cache_ttl:
+            return self.fetch_weather_data(city)
+
+        # One lock per city so concurrent routes of a city share one request
+        with self._weather_locks_guard:
+            lock = self._weather_locks.setdefault(city, threading.Lock())
+
+        with lock:
+            cached = self.weather_cache.get(city)
+            if cached and time.monotonic() - cached[0] < self.weather_cache_ttl:
+                with self._weather_stats_lock:
+                    self.weather_cache_hits += 1
+                return cached[1]
+
+            with self._weather_stats_lock:
+                self.weather_cache_misses += 1
+            weather_data = self.fetch_weather_data(city)
+            if weather_data:
+                self.weather_cache[city] = (time.monotonic(), weather_data)
+            return weather_data
+
+    def clear_weather_cache(self):
+        """Drop all cached weather payloads"""
+        self.weather_cache.clear()
+
+    def fetch_weather_data(self, city):
+        """Fetch current weather data for a city from OpenWeather"""
         try:
             city_query = f"{city}, Nigeria"
             url = f"http://api.openweathermap.org/data/2.5/weather?q={city_query}&appid={self.weather_api_key}&units=metric"
             
-            response = requests.get(url)
+            response = self.session.get(url, timeout=self.timeout)
             response.raise_for_status()
             weather_data = response.json()
             
@@ -55,60 +188,165 @@ class NigeriaTrafficScraper:
             logging.error(f"Error getting weather data for {city}: {str(e)}")
             return None
 
+    def get_directions(self, origin, destination, city, now):
+        """Get driving directions (with alternatives) departing now"""
+        return self.gmaps.directions(
+            f"{origin}, {city}, Nigeria",
+            f"{destination}, {city}, Nigeria",
+            mode="driving",
+            departure_time=now,
+            traffic_model="best_guess",
+            alternatives=True  # Get alternative routes if available
+        )
+
+    def get_distance_matrix(self, origins, destination, city, now):
+        """Get traffic-aware timings from many origins to one destination"""
+        elements = []
+        # Distance Matrix accepts at most 25 origins per request
+        for i in range(0, len(origins), 25):
+            batch = origins[i:i + 25]
+            response = self.gmaps.distance_matrix(
+                [f"{origin}, {city}, Nigeria" for origin in batch],
+                [f"{destination}, {city}, Nigeria"],
+                mode="driving",
+                departure_time=now,
+                traffic_model="best_guess"
+            )
+            # Rows are matched to origins by position, so a short response cannot be trusted
+            if len(response['rows']) != len(batch):
+                raise Exception(
+                    f"Distance matrix returned {len(response['rows'])} rows for {len(batch)} origins"
+                )
+            elements.extend(row['elements'][0] for row in response['rows'])
+        return elements
+
+    @staticmethod
+    def polyline_hash(points):
+        return hashlib.blake2b(points.encode(), digest_size=8).hexdigest()
+
+    def build_alternatives(self, origin, destination, city, now, result):
+        """
+        One row per route of a directions result (alternative 0 is the one
+        build_record uses). path_id hashes the step polylines, so the same
+        physical path keeps its id whatever order Google returns it in.
+        """
+        rows = []
+        for i, route in enumerate(result):
+            leg = route['legs'][0]
+            step_hashes = [self.polyline_hash(step.get('polyline', {}).get('points', '')) for step in leg['steps']]
+            traffic = leg.get('duration_in_traffic', leg['duration'])
+            rows.append({
+                'city': city,
+                'origin': origin,
+                'destination': destination,
+                'timestamp': now.isoformat(),
+                'alternative': i,
+                'summary': route.get('summary', ''),
+                'path_id': self.polyline_hash(';'.join(step_hashes)),
+                'distance_meters': leg['distance']['value'],
+                'duration_seconds': leg['duration']['value'],
+                'duration_in_traffic_seconds': traffic['value'],
+                'steps_count': len(leg['steps']),
+                'has_tolls': any('toll' in step.get('html_instructions', '').lower() for step in leg['steps']),
+                'step_hashes': ';'.join(step_hashes)
+            })
+        return rows
+
+    def remember_directions(self, origin, destination, city, now, result):
+        """Keep a fresh directions result for the route and record its alternatives"""
+        self.route_details[(city, origin, destination)] = result
+        if self.alternatives_writer is None:
+            return
+        try:
+            for row in self.build_alternatives(origin, destination, city, now, result):
+                self.alternatives_writer.write(row, city)
+        except Exception as e:
+            logging.error(f"Error saving alternatives for {city}: {str(e)}")
+
+    def build_record(self, origin, destination, city, now, result, weather_data, timing=None):
+        """
+        Combine a directions result and weather data into one row
+
+        timing: optional Distance Matrix element; when given, its distance and
+        durations replace those of the directions leg
+        """
+        route = result[0]['legs'][0]
+        timing = timing or route
+        
+        data = {
+            'city': city,
+            'origin': origin,
+            'destination': destination,
+            'distance_km': timing['distance']['text'],
+            'distance_meters': timing['distance']['value'],
+            'duration_normal_mins': timing['duration']['value'] // 60,
+            'duration_in_traffic_mins': timing['duration_in_traffic']['value'] // 60,
+            'traffic_ratio': timing['duration_in_traffic']['value'] / timing['duration']['value'],
+            'timestamp': now.isoformat(),
+            'day_of_week': now.strftime('%A'),
+            'is_weekend': now.weekday() >= 5,
+            'hour_of_day': now.hour,
+            'peak_hour': self.is_peak_hour(now.hour),
+            'time_period': self.get_time_period(now.hour),
+            'num_alternative_routes': len(result) - 1 if len(result) > 1 else 0,
+            'steps_count': len(route['steps']),
+            'has_tolls': any('toll' in step.get('html_instructions', '').lower() for step in route['steps']),
+            'route_complexity': len(route['steps']) / timing['distance']['value'] * 1000  # steps per km
+        }
+        
+        # Add weather data if available
+        if weather_data:
+            data.update(weather_data)
+            
+        return data
+
     def get_traffic_data(self, origin, destination, city):
         """Get enhanced traffic data between two points in Nigeria"""
         try:
-            origin_full = f"{origin}, {city}, Nigeria"
-            destination_full = f"{destination}, {city}, Nigeria"
-            
             # Get current time in Nigeria
             now = datetime.now(self.nigeria_tz)
             
             # Get traffic data
-            result = self.gmaps.directions(
-                origin_full,
-                destination_full,
-                mode="driving",
-                departure_time=now,
-                traffic_model="best_guess",
-                alternatives=True  # Get alternative routes if available
-            )
+            result = self.get_directions(origin, destination, city, now)
             
             if not result:
                 raise Exception(f"No route found between {origin} and {destination}")
-                
-            route = result[0]['legs'][0]
+            self.remember_directions(origin, destination, city, now, result)
             
             # Get weather data
             weather_data = self.get_weather_data(city)
             
-            # Combine traffic and weather data
-            data = {
-                'city': city,
-                'origin': origin,
-                'destination': destination,
-                'distance_km': route['distance']['text'],
-                'distance_meters': route['distance']['value'],
-                'duration_normal_mins': route['duration']['value'] // 60,
-                'duration_in_traffic_mins': route['duration_in_traffic']['value'] // 60,
-                'traffic_ratio': route['duration_in_traffic']['value'] / route['duration']['value'],
-                'timestamp': now.isoformat(),
-                'day_of_week': now.strftime('%A'),
-                'is_weekend': now.weekday() >= 5,
-                'hour_of_day': now.hour,
-                'peak_hour': self.is_peak_hour(now.hour),
-                'time_period': self.get_time_period(now.hour),
-                'num_alternative_routes': len(result) - 1 if len(result) > 1 else 0,
-                'steps_count': len(route['steps']),
-                'has_tolls': any('toll' in step.get('html_instructions', '').lower() for step in route['steps']),
-                'route_complexity': len(route['steps']) / route['distance']['value'] * 1000  # steps per km
-            }
+            return self.build_record(origin, destination, city, now, result, weather_data)
             
-            # Add weather data if available
-            if weather_data:
-                data.update(weather_data)
-                
-            return data
+        except Exception as e:
+            logging.error(f"Error getting traffic data for {city}: {str(e)}")
+            return None
+
+    async def get_traffic_data_async(self, origin, destination, city, limits, executor):
+        """
+        Async variant of get_traffic_data. The Directions and weather calls for
+        the route run concurrently in the executor, each gated by the semaphore
+        for its upstream API.
+        """
+        loop = asyncio.get_running_loop()
+
+        async def call(api, func, *args):
+            async with limits[api]:
+                return await loop.run_in_executor(executor, func, *args)
+
+        try:
+            now = datetime.now(self.nigeria_tz)
+            
+            result, weather_data = await asyncio.gather(
+                call('google', self.get_directions, origin, destination, city, now),
+                call('weather', self.get_weather_data, city)
+            )
+            
+            if not result:
+                raise Exception(f"No route found between {origin} and {destination}")
+            self.remember_directions(origin, destination, city, now, result)
+            
+            return self.build_record(origin, destination, city, now, result, weather_data)
             
         except Exception as e:
             logging.error(f"Error getting traffic data for {city}: {str(e)}")
@@ -116,55 +354,237 @@ class NigeriaTrafficScraper:
 
     def is_peak_hour(self, hour):
         """Determine if current hour is peak traffic time"""
-        morning_peak = 6 <= hour <= 10
-        evening_peak = 16 <= hour <= 20
-        return morning_peak or evening_peak
+        return time_features.is_peak_hour(hour)
 
     def get_time_period(self, hour):
         """Categorize time of day"""
-        if 5 <= hour < 12:
-            return 'Morning'
-        elif 12 <= hour < 16:
-            return 'Afternoon'
-        elif 16 <= hour < 20:
-            return 'Evening'
-        else:
-            return 'Night'
+        return time_features.time_period(hour)
 
     def save_data(self, data, city):
-        """Save traffic and weather data to CSV file organized by city"""
-        filepath = Path(f"traffic_weather_data_{city.lower().replace(' ', '_')}.csv")
-        
+        """
+        Write a row of traffic and weather data for the city through the
+        storage backend (appended to the city CSV, or buffered for its
+        Parquet partition)
+        """
+        # Online features don't depend on the write succeeding
+        self.update_aggregate('feature store', self.feature_store, data, city)
+
         try:
-            if filepath.exists():
-                df = pd.read_csv(filepath)
-                df = pd.concat([df, pd.DataFrame([data])], ignore_index=True)
-            else:
-                df = pd.DataFrame([data])
-            
-            df.to_csv(filepath, index=False)
+            self.writer.write(data, city)
             logging.info(f"Data saved for {city}: {data['origin']} to {data['destination']}")
-            
         except Exception as e:
             logging.error(f"Error saving data for {city}: {str(e)}")
+            return
 
-    def run(self, interval_minutes=15):
-        """Run continuous scraping with specified interval"""
-        while True:
-            for location in self.locations:
-                data = self.get_traffic_data(
-                    location['origin'],
-                    location['destination'],
-                    location['city']
-                )
-                
-                if data:
-                    self.save_data(data, location['city'])
+        # Aggregates follow what was written; one failing must not stop the others
+        if self.aggregate_cube is not None:
+            self.update_aggregate('aggregate cube', self.aggregate_cube, data, city)
+        if self.correlations is not None:
+            self.update_aggregate('correlations', self.correlations, data, city)
+
+        if self.outlier_filter:
+            try:
+                flags = self.outlier_filter.update(data)
+                flagged = [metric for metric, outlier in flags.items() if outlier]
+                if flagged:
+                    logging.warning(f"Outlier {flagged} for {city}: {data['origin']} to {data['destination']}")
+            except Exception as e:
+                logging.error(f"Error flagging outliers for {city}: {str(e)}")
+
+    def update_aggregate(self, name, aggregate, data, city):
+        """Feed a saved row to an in-memory aggregate, logging instead of raising"""
+        try:
+            aggregate.update(data)
+        except Exception as e:
+            logging.error(f"Error updating {name} for {city}: {data['origin']} to {data['destination']}: {str(e)}")
+
+    def flush(self):
+        self.writer.flush()
+        if self.alternatives_writer:
+            self.alternatives_writer.flush()
+
+    def close(self):
+        """Flush and close open data files"""
+        self.writer.close()
+        if self.alternatives_writer:
+            self.alternatives_writer.close()
+
+    def location_key(self, location):
+        return location.get('name') or f"{location['city']}:{location['origin']}->{location['destination']}"
+
+    def fetch_time(self, tick, key):
+        """Scheduled fetch time for a route or group within the tick, or None"""
+        if tick is None or self.scheduler is None:
+            return None
+        return tick + timedelta(seconds=self.scheduler.offset_for(key))
+
+    def collect_cycle(self, tick=None):
+        """
+        Fetch every location once, one request at a time
+
+        tick: scheduler tick for this cycle; when the scheduler spreads fetches,
+        each location waits for its offset within the interval
+        """
+        if self.use_distance_matrix:
+            return self.collect_cycle_matrix(tick)
+
+        locations = self.locations
+        if tick is not None and self.scheduler and self.scheduler.spread_seconds:
+            locations = sorted(locations, key=lambda loc: self.fetch_time(tick, self.location_key(loc)))
+
+        for location in locations:
+            when = self.fetch_time(tick, self.location_key(location))
+            if when is not None:
+                self.scheduler.sleep_until(when)
+
+            data = self.get_traffic_data(
+                location['origin'],
+                location['destination'],
+                location['city']
+            )
+            
+            if data:
+                self.save_data(data, location['city'])
+
+    def collect_cycle_matrix(self, tick=None):
+        """
+        Fetch every location once using one Distance Matrix call per city and
+        destination. Steps, tolls and alternatives come from the route's last
+        Directions result, refreshed every directions_every cycles.
+        """
+        refresh = self.cycle_count % self.directions_every == 0
+        self.cycle_count += 1
+
+        groups = defaultdict(list)
+        for location in self.locations:
+            groups[(location['city'], location['destination'])].append(location['origin'])
+
+        ordered = sorted(groups.items(), key=lambda item: self.fetch_time(tick, item[0]) or 0)
+
+        for (city, destination), origins in ordered:
+            when = self.fetch_time(tick, (city, destination))
+            if when is not None:
+                self.scheduler.sleep_until(when)
+
+            now = datetime.now(self.nigeria_tz)
+            
+            try:
+                elements = self.get_distance_matrix(origins, destination, city, now)
+            except Exception as e:
+                logging.error(f"Error getting distance matrix for {city} to {destination}: {str(e)}")
+                continue
+
+            weather_data = self.get_weather_data(city)
+
+            for origin, element in zip(origins, elements, strict=True):
+                try:
+                    if element.get('status') != 'OK' or 'duration_in_traffic' not in element:
+                        raise Exception(f"No timing between {origin} and {destination}: {element.get('status')}")
+
+                    key = (city, origin, destination)
+                    result = self.route_details.get(key)
+                    if refresh or result is None:
+                        result = self.get_directions(origin, destination, city, now)
+                        if not result:
+                            raise Exception(f"No route found between {origin} and {destination}")
+                        self.remember_directions(origin, destination, city, now, result)
+
+                    data = self.build_record(origin, destination, city, now, result, weather_data, element)
+                    
+                except Exception as e:
+                    logging.error(f"Error getting traffic data for {city}: {str(e)}")
+                    continue
                     
-            time.sleep(interval_minutes * 60)
+                self.save_data(data, city)
+
+    async def collect_cycle_async(self, tick=None):
+        """Fetch every location once with bounded concurrency per upstream API"""
+        if self.use_distance_matrix:
+            # Only a handful of batched calls per cycle; keep them off the loop thread
+            return await asyncio.to_thread(self.collect_cycle_matrix, tick)
+
+        limits = {
+            'google': asyncio.Semaphore(self.max_google_concurrency),
+            'weather': asyncio.Semaphore(self.max_weather_concurrency)
+        }
+        workers = self.max_google_concurrency + self.max_weather_concurrency
+
+        async def fetch(location, executor):
+            when = self.fetch_time(tick, self.location_key(location))
+            if when is not None:
+                await self.scheduler.sleep_until_async(when)
+            return await self.get_traffic_data_async(
+                location['origin'],
+                location['destination'],
+                location['city'],
+                limits,
+                executor
+            )
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = await asyncio.gather(*[
+                fetch(location, executor) for location in self.locations
+            ])
+
+        # Save from the event loop thread, in location order
+        for location, data in zip(self.locations, results):
+            if data:
+                self.save_data(data, location['city'])
+
+    async def run_async(self, interval_minutes=15, spread_minutes=0, missed_ticks='skip'):
+        """Run continuous scraping, collecting each cycle concurrently"""
+        self.scheduler = WallClockScheduler(
+            interval_minutes,
+            self.nigeria_tz,
+            missed_ticks=missed_ticks,
+            spread_seconds=spread_minutes * 60
+        )
+        try:
+            async for tick in self.scheduler.ticks_async():
+                await self.collect_cycle_async(tick)
+                self.flush()
+        finally:
+            self.close()
+
+    def run(self, interval_minutes=15, concurrent=False, spread_minutes=0, missed_ticks='skip'):
+        """
+        Run continuous scraping with cycles aligned to wall-clock boundaries
+        in Africa/Lagos (e.g. :00, :15, :30, :45 for 15 minutes)
+
+        concurrent: collect each cycle with run_async instead of serially
+        spread_minutes: spread route fetches over this many minutes after each
+            boundary, at a fixed per-route offset
+        missed_ticks: 'skip' or 'catch_up' when a cycle overruns a boundary
+        """
+        if concurrent:
+            asyncio.run(self.run_async(interval_minutes, spread_minutes, missed_ticks))
+            return
+
+        self.scheduler = WallClockScheduler(
+            interval_minutes,
+            self.nigeria_tz,
+            missed_ticks=missed_ticks,
+            spread_seconds=spread_minutes * 60
+        )
+        try:
+            for tick in self.scheduler.ticks():
+                self.collect_cycle(tick)
+                self.flush()
+        finally:
+            self.close()
 
 # Example usage with expanded locations
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Scrape traffic and weather data for Nigerian routes')
+    parser.add_argument('--interval', type=int, default=15, help='minutes between cycles')
+    parser.add_argument('--concurrent', action='store_true',
+                        help='collect each cycle with bounded concurrent API calls')
+    parser.add_argument('--spread-minutes', type=float, default=0,
+                        help='spread route fetches over this many minutes after each boundary')
+    args = parser.parse_args()
+
     google_api_key = "Your API KEY"
     weather_api_key = "Your API KEY"
     
@@ -291,4 +711,4 @@ if __name__ == "__main__":
     ]
     
     scraper = NigeriaTrafficScraper(google_api_key, weather_api_key, locations)
-    scraper.run(interval_minutes=15)
+    scraper.run(interval_minutes=args.interval, concurrent=args.concurrent, spread_minutes=args.spread_minutes)
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+from correlation import CorrelationMatrix
+from schema import COLUMNS, FLOAT_COLUMNS, INT_COLUMNS
+
+# TrafficLAG's PCA inputs: numeric columns except the target and the distance text
+PCA_COLUMNS = [
+    c for c in COLUMNS
+    if (c in INT_COLUMNS or c in FLOAT_COLUMNS) and c not in ('traffic_ratio', 'distance_km')
+]
+
+
+class StreamingPCA:
+    def __init__(self, columns=PCA_COLUMNS, variance=0.95):
+        """
+        StandardScaler + PCA over data seen one chunk at a time, as in
+        TrafficLAG but without holding the matrix in memory or refitting.
+
+        partial_fit only adds each chunk's co-moment sums (CorrelationMatrix,
+        O(k^2) memory), which hold both the scaler statistics and the
+        covariance of the standardized features, so after a single pass over
+        the chunks the result equals fillna(mean) -> StandardScaler ->
+        PCA() on the concatenated data. Components come from one k x k
+        eigendecomposition; n_components_ is the count reaching `variance`
+        of the explained variance, and keeping it just truncates that solve.
+
+        Attributes follow sklearn: mean_, var_, scale_, n_samples_seen_,
+        explained_variance_ and explained_variance_ratio_ (every component,
+        for the scree plot), n_components_ and components_ (the first
+        n_components_ rows).
+        """
+        self.columns = list(columns)
+        self.variance = variance
+        self.moments = CorrelationMatrix(self.columns)
+        self.n_samples_seen_ = 0
+
+    def partial_fit(self, df):
+        self.moments.update_frame(df)
+        self.n_samples_seen_ += len(df)
+        return self._solve()
+
+    def fit_chunks(self, chunks):
+        """Fit from an iterable of DataFrames, e.g. loader.iter_traffic_csv"""
+        for chunk in chunks:
+            self.moments.update_frame(chunk)
+            self.n_samples_seen_ += len(chunk)
+        return self._solve()
+
+    def _solve(self):
+        if not len(self.moments.groups) or self.n_samples_seen_ < 2:
+            raise ValueError("StreamingPCA needs at least two rows")
+        n = self.n_samples_seen_
+        count, total, cross = self.moments.count[0], self.moments.total[0], self.moments.cross[0]
+
+        # Shifted column means over present values; missing values take the
+        # mean, so they add nothing to the centred sums below
+        present = np.diag(count)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(present > 0, np.diag(total) / present, 0.0)
+        # total[i, j] sums column i over rows where i and j are both present
+        scatter = cross - mean[None, :] * total - mean[:, None] * total.T + count * np.outer(mean, mean)
+
+        self.mean_ = mean + self.moments.shift
+        self.var_ = np.maximum(np.diag(scatter), 0) / n
+        # StandardScaler leaves constant columns unscaled (all zeros after centring)
+        self.scale_ = np.where(self.var_ > 0, np.sqrt(self.var_), 1.0)
+
+        covariance = scatter / np.outer(self.scale_, self.scale_) / (n - 1)
+        eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+        order = np.argsort(eigenvalues)[::-1]
+        components = eigenvectors[:, order].T
+        # Same sign convention as sklearn's PCA: largest loading of each component positive
+        largest = np.argmax(np.abs(components), axis=1)
+        components *= np.sign(components[np.arange(len(components)), largest])[:, None]
+
+        self.explained_variance_ = np.maximum(eigenvalues[order], 0)
+        self.explained_variance_ratio_ = self.explained_variance_ / self.explained_variance_.sum()
+        self.n_components_ = int(np.argmax(np.cumsum(self.explained_variance_ratio_) >= self.variance - 1e-12)) + 1
+        self.components_ = components[:self.n_components_]
+        return self
+
+    def transform(self, df):
+        """Principal components of a chunk (missing values take the fitted mean)"""
+        values = df.reindex(columns=self.columns).to_numpy(dtype=np.float64, na_value=np.nan)
+        values = np.where(np.isnan(values), self.mean_, values)
+        return ((values - self.mean_) / self.scale_) @ self.components_.T
+
+    def feature_importance(self):
+        """Mean absolute loading over the kept components, largest first"""
+        importance = np.abs(self.components_).mean(axis=0)
+        return pd.Series(importance, index=self.columns).sort_values(ascending=False)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from loader import iter_traffic_csv
+
+    parser = argparse.ArgumentParser(description='Streaming PCA feature importance over city CSV files')
+    parser.add_argument('sources', nargs='*', default=['../Data/traffic_weather_data_lagos.csv'],
+                        help='city CSV files')
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    parser.add_argument('--variance', type=float, default=0.95)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    pca = StreamingPCA(variance=args.variance).fit_chunks(
+        chunk for source in args.sources
+        for chunk in iter_traffic_csv(source, columns=PCA_COLUMNS, chunksize=args.chunksize)
+    )
+    elapsed = time.perf_counter() - start
+    print(f"{pca.n_samples_seen_:,} rows in {elapsed:.2f} s: {pca.n_components_} of {len(pca.columns)} "
+          f"components explain {pca.explained_variance_ratio_[:pca.n_components_].sum():.1%} of the variance")
+    print("Top Important Features for Traffic Congestion Prediction:")
+    for feature, importance in pca.feature_importance().head(args.top).items():
+        print(f"{feature}: {importance:.4f}")
@@ -0,0 +1,162 @@
+"""
+Ranks a route's alternative paths by predicted travel time, from the
+route_alternatives_<city>.csv tables the scraper records.
+
+The predictions are not the per-route models of train.py: those predict one
+traffic_ratio per (origin, destination) and cannot tell the paths Google
+offers apart. Each path is instead scored from its own history, as a
+(route, path, hour-of-week) table of median free-flow duration times the
+path's congestion ratio for the hour, shrunk toward the route's ratio for
+paths seen only a few times (see RouteRecommender).
+"""
+import numpy as np
+import pandas as pd
+from lag_features import ROUTE_COLUMNS
+from loader import parse_timestamps
+from schema import TIMEZONE
+
+SLOTS_PER_WEEK = 168
+
+
+def load_alternatives(paths):
+    """Load route_alternatives_<city>.csv files written by the scraper"""
+    frames = [
+        pd.read_csv(path, usecols=lambda c: c != 'step_hashes', dtype={'path_id': str, 'summary': str})
+        for path in ([paths] if isinstance(paths, str) else paths)
+    ]
+    df = pd.concat(frames, ignore_index=True)
+    df['timestamp'] = parse_timestamps(df['timestamp'])
+    return df
+
+
+def hour_of_week(timestamps):
+    """Hours since Monday 00:00 Africa/Lagos"""
+    local = pd.DatetimeIndex(timestamps).tz_convert(TIMEZONE)
+    return (local.weekday * 24 + local.hour).to_numpy()
+
+
+class RouteRecommender:
+    def __init__(self, shrinkage=4.0, max_age='14D'):
+        """
+        Ranks a route's alternative paths by predicted travel time from a
+        precomputed (route, path, hour-of-week) table, so a request is a
+        dictionary lookup plus a sort of a handful of values.
+
+        Each path's prediction is its median free-flow duration times a
+        congestion ratio for the hour of week. The ratio is the path's own
+        mean for that hour, shrunk toward the route's mean for the hour
+        (scaled by how congested the path usually is relative to the route)
+        with the weight of `shrinkage` observations, so rarely offered
+        alternatives still get a sensible estimate.
+
+        max_age: drop paths not offered by Google within this long of the
+        latest scrape (closed roads, re-routed segments)
+        """
+        self.shrinkage = shrinkage
+        self.max_age = pd.Timedelta(max_age) if max_age else None
+        self.routes = []
+        self.route_index = {}
+
+    def fit(self, df):
+        latest = df.groupby(ROUTE_COLUMNS + ['path_id'], observed=True)['timestamp'].transform('max')
+        if self.max_age is not None:
+            df = df[latest >= df['timestamp'].max() - self.max_age]
+
+        keys = df[ROUTE_COLUMNS].astype(str).apply(tuple, axis=1)
+        route_of_row, self.routes = pd.factorize(keys, sort=True)
+        self.routes = list(self.routes)
+        self.route_index = {route: i for i, route in enumerate(self.routes)}
+
+        path_keys = pd.Series(route_of_row).astype(str) + '/' + df['path_id'].to_numpy()
+        path_of_row, path_labels = pd.factorize(path_keys, sort=True)
+        n_routes, n_paths = len(self.routes), len(path_labels)
+        route_of_path = np.zeros(n_paths, dtype=np.int64)
+        route_of_path[path_of_row] = route_of_row
+
+        slot = hour_of_week(df['timestamp'])
+        ratio = (df['duration_in_traffic_seconds'] / df['duration_seconds']).to_numpy(dtype=np.float64)
+
+        path_sum = np.zeros((n_paths, SLOTS_PER_WEEK))
+        path_count = np.zeros((n_paths, SLOTS_PER_WEEK))
+        np.add.at(path_sum, (path_of_row, slot), ratio)
+        np.add.at(path_count, (path_of_row, slot), 1)
+        route_sum = np.zeros((n_routes, SLOTS_PER_WEEK))
+        route_count = np.zeros((n_routes, SLOTS_PER_WEEK))
+        np.add.at(route_sum, (route_of_row, slot), ratio)
+        np.add.at(route_count, (route_of_row, slot), 1)
+
+        route_mean = route_sum.sum(axis=1) / route_count.sum(axis=1)
+        path_mean = path_sum.sum(axis=1) / path_count.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            route_slot = np.where(route_count > 0, route_sum / route_count, route_mean[:, None])
+            prior = route_slot[route_of_path] * (path_mean / route_mean[route_of_path])[:, None]
+            # Without shrinkage a path's unobserved hours stay NaN and are not ranked
+            path_ratio = (path_sum + self.shrinkage * prior) / (path_count + self.shrinkage)
+
+        grouped = df.groupby(path_of_row)
+        free_flow = grouped['duration_seconds'].median().to_numpy()
+        summary = grouped['summary'].agg(lambda s: s.mode().iat[0] if s.notna().any() else '').to_numpy()
+        distance_km = grouped['distance_meters'].median().to_numpy() / 1000
+        has_tolls = grouped['has_tolls'].any().to_numpy()
+
+        # Lay paths out per route: (route, path slot, hour of week), NaN padded
+        order = np.lexsort((free_flow, route_of_path))
+        rank = np.empty(n_paths, dtype=np.int64)
+        starts = np.searchsorted(route_of_path[order], np.arange(n_routes))
+        rank[order] = np.arange(n_paths) - starts[route_of_path[order]]
+        width = int(rank.max()) + 1 if n_paths else 0
+
+        self.minutes = np.full((n_routes, width, SLOTS_PER_WEEK), np.nan)
+        self.minutes[route_of_path, rank] = free_flow[:, None] * path_ratio / 60
+        self.paths = np.empty((n_routes, width), dtype=object)
+        for p in range(n_paths):
+            self.paths[route_of_path[p], rank[p]] = {
+                'path_id': path_labels[p].split('/', 1)[1],
+                'summary': summary[p],
+                'distance_km': float(distance_km[p]),
+                'has_tolls': bool(has_tolls[p]),
+                'observations': int(path_count[p].sum())
+            }
+        return self
+
+    @classmethod
+    def from_csv(cls, paths, **kwargs):
+        return cls(**kwargs).fit(load_alternatives(paths))
+
+    def recommend(self, city, origin, destination, departure=None, top=None):
+        """
+        Alternatives for a route ranked by predicted duration at the
+        departure time (default now), fastest first
+        """
+        i = self.route_index.get((city, origin, destination))
+        if i is None:
+            raise KeyError(f"No alternatives recorded for {(city, origin, destination)}")
+
+        departure = pd.Timestamp.now(tz=TIMEZONE) if departure is None else pd.Timestamp(departure)
+        departure = departure.tz_localize(TIMEZONE) if departure.tz is None else departure.tz_convert(TIMEZONE)
+        minutes = self.minutes[i, :, departure.weekday() * 24 + departure.hour]
+
+        ranked = [j for j in np.argsort(minutes) if minutes[j] == minutes[j]][:top]
+        best = minutes[ranked[0]] if ranked else np.nan
+        return [
+            dict(self.paths[i, j], rank=rank + 1, predicted_minutes=float(minutes[j]),
+                 minutes_vs_best=float(minutes[j] - best))
+            for rank, j in enumerate(ranked)
+        ]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Rank alternative paths by predicted travel time')
+    parser.add_argument('sources', nargs='+', help='route_alternatives_<city>.csv files')
+    parser.add_argument('--city', default='Lagos')
+    parser.add_argument('--origin', required=True)
+    parser.add_argument('--destination', required=True)
+    parser.add_argument('--departure', default=None)
+    args = parser.parse_args()
+
+    recommender = RouteRecommender.from_csv(args.sources)
+    for path in recommender.recommend(args.city, args.origin, args.destination, args.departure):
+        print(f"{path['rank']}. {path['summary'] or path['path_id']}: {path['predicted_minutes']:.0f} min "
+              f"(+{path['minutes_vs_best']:.0f}), {path['distance_km']:.1f} km, {path['observations']} obs")
@@ -0,0 +1,252 @@
+import html
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from correlation import CorrelationMatrix
+from cube import AggregateCube
+from density import BinnedScatter, binned_pairs, pairplot
+from downsample import SeriesDownsampler
+
+FIGURE_SIZE = (12, 6)
+FIGURE_DPI = 100
+LINE_POINTS = 4000
+SCATTER_FEATURES = ['temperature_c', 'humidity_percent', 'wind_speed_ms', 'route_complexity']
+
+
+def _bar(name, title, rollup, xlabel):
+    return {
+        'name': name, 'kind': 'bar', 'title': title, 'xlabel': xlabel, 'ylabel': 'Average Traffic Ratio',
+        'labels': [str(label) for label in rollup.index], 'values': rollup['mean'].to_numpy(),
+        'errors': rollup['std'].fillna(0).to_numpy()
+    }
+
+
+def _heatmap(name, title, cube, by, xlabel, ylabel):
+    # unstack sorts labels alphabetically; put weekdays etc. back in order
+    rows, columns = (cube.labels(d) for d in by)
+    table = cube.rollup(by)['mean'].unstack()
+    table = table.reindex(index=[r for r in rows if r in table.index],
+                          columns=[c for c in columns if c in table.columns])
+    return {
+        'name': name, 'kind': 'heatmap', 'title': title, 'xlabel': xlabel, 'ylabel': ylabel,
+        'rows': [str(r) for r in table.index], 'columns': [str(c) for c in table.columns],
+        'values': table.to_numpy(dtype=np.float64)
+    }
+
+
+def figure_specs(df, cube=None):
+    """
+    Everything the TrafficEDA-2 figures need, computed once: groupby-style
+    panels come from one AggregateCube, the rest from single array passes.
+    Each spec holds only the plotted numbers, so it is cheap to send to a
+    rendering process.
+    """
+    cube = cube if cube is not None else AggregateCube().update_frame(df)
+    ratio = df['traffic_ratio'].to_numpy(dtype=np.float64)
+    valid = ~np.isnan(ratio)
+    counts, edges = np.histogram(ratio[valid], bins=30)
+
+    specs = [{
+        'name': 'traffic_ratio_distribution', 'kind': 'hist', 'title': 'Distribution of Traffic Ratio',
+        'xlabel': 'Traffic Ratio', 'ylabel': 'Frequency', 'counts': counts, 'edges': edges
+    }]
+    for dimension, title, xlabel in [
+        ('hour', 'Traffic Ratio by Hour of the Day', 'Hour of the Day'),
+        ('day_of_week', 'Traffic Ratio by Day of the Week', 'Day of the Week'),
+        ('weather_condition', 'Traffic Ratio by Weather Condition', 'Weather Condition'),
+        ('time_period', 'Traffic Ratio by Time Period', 'Time Period'),
+        ('peak_hour', 'Traffic Ratio by Peak Hour', 'Peak Hour'),
+        ('origin', 'Traffic Ratio by Location', 'Origin')
+    ]:
+        specs.append(_bar(f"by_{dimension}", title, cube.rollup(dimension), xlabel))
+
+    if 'num_alternative_routes' in df.columns:
+        alternatives = df['num_alternative_routes'].to_numpy(dtype=np.int64)[valid]
+        sums = np.bincount(alternatives, ratio[valid])
+        n = np.bincount(alternatives)
+        present = n > 0
+        specs.append({
+            'name': 'by_num_alternative_routes', 'kind': 'bar',
+            'title': 'Traffic Ratio by Number of Alternative Routes', 'xlabel': 'Number of Alternative Routes',
+            'ylabel': 'Average Traffic Ratio', 'labels': [str(i) for i in np.flatnonzero(present)],
+            'values': sums[present] / n[present], 'errors': None
+        })
+
+    specs += [
+        _heatmap('hour_by_day', 'Average Traffic Ratio by Hour and Day of Week',
+                 cube, ['hour', 'day_of_week'], 'Day of Week', 'Hour of Day'),
+        _heatmap('weather_by_time_period', 'Average Traffic Ratio by Weather Condition and Time Period',
+                 cube, ['weather_condition', 'time_period'], 'Time Period', 'Weather Condition'),
+        _heatmap('day_by_time_period', 'Traffic Ratio by Day of Week and Time Period',
+                 cube, ['day_of_week', 'time_period'], 'Time Period', 'Day of Week')
+    ]
+
+    # LTTB per origin → destination route keeps the figure at LINE_POINTS however
+    # long the history gets; routes sharing an origin stay separate lines
+    line = SeriesDownsampler(df, points=LINE_POINTS).view()
+    series = {route: (group['timestamp'].to_numpy(), group['traffic_ratio'].to_numpy())
+              for route, group in line.groupby('route', sort=False)}
+    specs.append({
+        'name': 'traffic_ratio_over_time', 'kind': 'line', 'title': 'Traffic Ratio Over Time',
+        'xlabel': 'Time', 'ylabel': 'Traffic Ratio', 'series': series
+    })
+
+    # One grouped pass gives the per-period slices; their sums give the full matrix
+    numeric = df.select_dtypes(include=[np.number]).columns
+    correlations = CorrelationMatrix(numeric, by='time_period').update_frame(df)
+    corr = correlations.corr()
+    specs.append({
+        'name': 'correlation', 'kind': 'heatmap', 'title': 'Correlation Heatmap', 'xlabel': '', 'ylabel': '',
+        'rows': list(corr.index), 'columns': list(corr.columns), 'values': corr.to_numpy(), 'diverging': True
+    })
+    by_period = correlations.column('traffic_ratio').drop(columns='traffic_ratio')
+    by_period = by_period.reindex([p for p in cube.labels('time_period') if p in by_period.index])
+    specs.append({
+        'name': 'traffic_ratio_correlation_by_time_period', 'kind': 'heatmap',
+        'title': 'Correlation with Traffic Ratio by Time Period', 'xlabel': '', 'ylabel': 'Time Period',
+        'rows': list(by_period.index), 'columns': list(by_period.columns), 'values': by_period.to_numpy(),
+        'diverging': True
+    })
+
+    # Scatters and the pair grid are drawn from bin counts, so their cost
+    # does not grow with the row count
+    specs.append({
+        'name': 'pairplot', 'kind': 'pairs', 'title': 'Pairplot for Selected Features',
+        'binned': binned_pairs(df)
+    })
+    for feature in [f for f in SCATTER_FEATURES if f in df.columns]:
+        specs.append({
+            'name': f"traffic_ratio_vs_{feature}", 'kind': 'density',
+            'title': f"Traffic Ratio vs. {feature.replace('_', ' ').title()}",
+            'xlabel': feature, 'ylabel': 'Traffic Ratio',
+            'binned': BinnedScatter.from_frame(df, feature, 'traffic_ratio')
+        })
+    return specs
+
+
+def render_figure(spec, out_dir):
+    """Draw one spec to out_dir/<name>.png (runs in a worker process)"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    kind = spec['kind']
+    filename = f"{spec['name']}.png"
+    if kind == 'pairs':
+        fig = pairplot(spec['binned'])
+        fig.suptitle(spec['title'], y=1.01)
+        fig.savefig(os.path.join(out_dir, filename), dpi=FIGURE_DPI, bbox_inches='tight')
+        plt.close(fig)
+        return filename
+
+    fig, ax = plt.subplots(figsize=FIGURE_SIZE)
+    if kind == 'hist':
+        ax.stairs(spec['counts'], spec['edges'], fill=True)
+    elif kind == 'bar':
+        positions = np.arange(len(spec['labels']))
+        ax.bar(positions, spec['values'], yerr=spec['errors'], capsize=3)
+        ax.set_xticks(positions, spec['labels'], rotation=45 if len(spec['labels']) > 8 else 0)
+        ax.grid(axis='y', linestyle='--', alpha=0.7)
+    elif kind == 'heatmap':
+        values = spec['values']
+        cmap, limits = ('coolwarm', (-1, 1)) if spec.get('diverging') else ('YlOrRd', (None, None))
+        image = ax.imshow(values, aspect='auto', cmap=cmap, vmin=limits[0], vmax=limits[1])
+        ax.set_xticks(np.arange(len(spec['columns'])), spec['columns'], rotation=45, ha='right')
+        ax.set_yticks(np.arange(len(spec['rows'])), spec['rows'])
+        if values.size <= 400:
+            for (i, j), value in np.ndenumerate(values):
+                if value == value:
+                    ax.text(j, i, f"{value:.2f}", ha='center', va='center', fontsize=7)
+        fig.colorbar(image, ax=ax)
+    elif kind == 'line':
+        for route, (x, y) in spec['series'].items():
+            ax.plot(x, y, linewidth=0.6, label=route)
+        ax.legend(fontsize=8, ncol=2)
+    elif kind == 'density':
+        fig.colorbar(spec['binned'].plot(ax), ax=ax, label='Rows')
+    else:
+        raise ValueError(f"Unknown figure kind: {kind}")
+
+    ax.set_title(spec['title'])
+    ax.set_xlabel(spec['xlabel'])
+    ax.set_ylabel(spec['ylabel'])
+    fig.tight_layout()
+    fig.savefig(os.path.join(out_dir, filename), dpi=FIGURE_DPI)
+    plt.close(fig)
+    return filename
+
+
+def report_title(df):
+    """'<cities> Traffic EDA' for the cities present in df"""
+    cities = df['city'].dropna().astype(str).unique() if 'city' in df.columns else []
+    return f"{', '.join(sorted(cities))} Traffic EDA" if len(cities) else 'Traffic EDA'
+
+
+def write_index(specs, filenames, out_dir, source, rows, timings, title='Traffic EDA'):
+    """Static index.html linking every figure"""
+    sections = '\n'.join(
+        f"<section><h2>{html.escape(spec['title'])}</h2><img src=\"{html.escape(filename)}\" "
+        f"alt=\"{html.escape(spec['title'])}\"></section>"
+        for spec, filename in zip(specs, filenames)
+    )
+    page = f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{html.escape(title)}</title>
+<style>body {{ font-family: sans-serif; max-width: 1240px; margin: auto; }} img {{ max-width: 100%; }}</style>
+</head>
+<body>
+<h1>{html.escape(title)}</h1>
+<p>{rows:,} rows from {html.escape(source)}, generated {datetime.now():%Y-%m-%d %H:%M}
+(aggregates {timings['aggregate_s']:.2f} s, rendering {timings['render_s']:.2f} s)</p>
+{sections}
+</body>
+</html>
+"""
+    path = os.path.join(out_dir, 'index.html')
+    with open(path, 'w') as f:
+        f.write(page)
+    return path
+
+
+def render_report(df, out_dir='report', workers=None, source='', title=None):
+    """
+    Render the TrafficEDA-2 figures for df to out_dir as PNGs plus an
+    index.html, drawing figures in parallel worker processes.
+
+    title: page heading (default: named after the cities in df)
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    start = time.perf_counter()
+    specs = figure_specs(df)
+    aggregated = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        filenames = list(pool.map(render_figure, specs, [out_dir] * len(specs)))
+    timings = {'aggregate_s': aggregated - start, 'render_s': time.perf_counter() - aggregated}
+    title = title or report_title(df)
+    return write_index(specs, filenames, out_dir, source, len(df), timings, title), timings
+
+
+if __name__ == "__main__":
+    import argparse
+    from loader import load_traffic_csv
+
+    parser = argparse.ArgumentParser(description='Render the traffic EDA figures to a static HTML/PNG bundle')
+    parser.add_argument('sources', nargs='*', default=['../Data/traffic_weather_data_lagos.csv'],
+                        help='city CSV files')
+    parser.add_argument('--out', default='report')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--title', default=None, help='page heading (default: named after the cities in the data)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    frame = pd.concat([load_traffic_csv(source) for source in args.sources], ignore_index=True)
+    loaded = time.perf_counter() - start
+    index, timings = render_report(frame, args.out, args.workers, ', '.join(args.sources), args.title)
+    print(f"load {loaded:.2f} s, aggregates {timings['aggregate_s']:.2f} s, "
+          f"rendering {timings['render_s']:.2f} s -> {index}")
@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+from schema import TIMEZONE
+from lag_features import ROUTE_COLUMNS, route_codes
+
+GRID_FEATURES = ['traffic_ratio', 'duration_in_traffic_mins', 'duration_normal_mins']
+FILL_POLICIES = ('ffill', 'linear', 'seasonal', 'none')
+
+
+class RouteGrid:
+    def __init__(self, values, mask, routes, times, features):
+        """
+        Dense per-route time grid.
+
+        values: float array (route, time, feature)
+        mask: bool array of the same shape, True where the cell was imputed
+        routes: route keys in axis-0 order
+        times: tz-aware DatetimeIndex for axis 1
+        features: feature names for axis 2
+        """
+        self.values = values
+        self.mask = mask
+        self.routes = routes
+        self.times = times
+        self.features = features
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def route_index(self, route):
+        return self.routes.index(route)
+
+    def to_frame(self):
+        """Long DataFrame with one row per (route, time) and an imputed flag per feature"""
+        n_routes, n_times, _ = self.values.shape
+        index = pd.MultiIndex.from_product([range(n_routes), self.times], names=['route', 'timestamp'])
+        df = pd.DataFrame(self.values.reshape(n_routes * n_times, -1), index=index, columns=self.features)
+        for i, feature in enumerate(self.features):
+            df[f"{feature}_imputed"] = self.mask[:, :, i].reshape(-1)
+        return df
+
+
+def _fill_indices(observed):
+    """Index of the last observed cell at or before / at or after each position, along axis 1"""
+    n = observed.shape[1]
+    positions = np.arange(n)
+    previous = np.where(observed, positions, -1)
+    np.maximum.accumulate(previous, axis=1, out=previous)
+    following = np.where(observed, positions, n)
+    following = np.minimum.accumulate(following[:, ::-1], axis=1)[:, ::-1]
+    return previous, following
+
+
+def _fill_ffill(values, observed):
+    previous, following = _fill_indices(observed)
+    # Leading gaps take the first observation
+    source = np.where(previous >= 0, previous, following)
+    source = np.clip(source, 0, values.shape[1] - 1)
+    filled = np.take_along_axis(values, source, axis=1)
+    return np.where(observed, values, filled)
+
+
+def _fill_linear(values, observed):
+    n = values.shape[1]
+    previous, following = _fill_indices(observed)
+    has_prev, has_next = previous >= 0, following < n
+    prev_i, next_i = np.clip(previous, 0, n - 1), np.clip(following, 0, n - 1)
+    prev_v = np.take_along_axis(values, prev_i, axis=1)
+    next_v = np.take_along_axis(values, next_i, axis=1)
+
+    positions = np.arange(n)[None, :]
+    span = np.where(next_i > prev_i, next_i - prev_i, 1)
+    weight = (positions - prev_i) / span
+    interpolated = prev_v + weight * (next_v - prev_v)
+    # Edges have only one neighbour; hold it
+    interpolated = np.where(has_prev & ~has_next, prev_v, interpolated)
+    interpolated = np.where(~has_prev & has_next, next_v, interpolated)
+    interpolated = np.where(~has_prev & ~has_next, np.nan, interpolated)
+    return np.where(observed, values, interpolated)
+
+
+def _fill_seasonal(values, observed, slots, n_slots):
+    """Fill each gap with the route's mean at the same slot of the week, then linearly"""
+    slot_sum = np.zeros((values.shape[0], n_slots))
+    slot_count = np.zeros((values.shape[0], n_slots))
+    np.add.at(slot_sum.T, slots, np.where(observed, values, 0).T)
+    np.add.at(slot_count.T, slots, observed.T.astype(float))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        profile = slot_sum / slot_count
+    seasonal = profile[:, slots]
+    filled = np.where(observed, values, seasonal)
+    # Slots never observed for the route fall back to interpolation
+    return _fill_linear(filled, ~np.isnan(filled))
+
+
+def _local_time(value):
+    """Timestamp in Africa/Lagos; naive values are taken as local time"""
+    ts = pd.Timestamp(value)
+    return ts.tz_localize(TIMEZONE) if ts.tz is None else ts.tz_convert(TIMEZONE)
+
+
+def resample_routes(df, features=GRID_FEATURES, freq='15min', fill='linear', start=None, end=None,
+                    route_columns=ROUTE_COLUMNS):
+    """
+    Snap every route's observations onto an exact grid of `freq` slots in
+    Africa/Lagos time and fill the gaps.
+
+    Each observation goes to its nearest slot; when several land on the
+    same slot, the closest one wins. Empty slots (failed or drifted scrapes)
+    are filled per route and feature by `fill`:
+
+    - 'ffill': last observed value (leading gaps take the first one)
+    - 'linear': linear interpolation between the surrounding observations
+    - 'seasonal': the route's mean at the same slot of the week, falling
+      back to linear interpolation for slots never observed
+    - 'none': left as NaN
+
+    start, end: grid bounds (default: the first and last observation);
+    naive values are Africa/Lagos time
+
+    Returns a RouteGrid whose mask marks every imputed cell.
+    """
+    if fill not in FILL_POLICIES:
+        raise ValueError(f"Unknown fill policy: {fill}")
+
+    features = list(features)
+    route_columns = [c for c in route_columns if c in df.columns]
+    freq = pd.Timedelta(freq)
+    step = freq // pd.Timedelta(microseconds=1)
+
+    timestamps = pd.DatetimeIndex(df['timestamp'])
+    timestamps = timestamps.tz_localize(TIMEZONE) if timestamps.tz is None else timestamps.tz_convert(TIMEZONE)
+    start = _local_time(timestamps.min() if start is None else start).floor(freq)
+    end = _local_time(timestamps.max() if end is None else end).ceil(freq)
+    times = pd.date_range(start, end, freq=freq)
+
+    route_index = route_codes(df, route_columns)
+    routes = [tuple(key) if isinstance(key, tuple) else (key,)
+              for key in df.groupby(route_columns, observed=True, sort=True).groups]
+
+    # Timestamp.value is always nanoseconds, whatever the unit
+    offset = timestamps.as_unit('us').asi8 - start.value // 1000
+    slot = np.floor_divide(offset + step // 2, step)
+    distance = np.abs(offset - slot * step)
+    inside = (slot >= 0) & (slot < len(times))
+
+    # Closest observation per (route, slot): sort by distance, keep the first of each cell
+    rows = np.flatnonzero(inside)
+    rows = rows[np.lexsort((distance[rows], slot[rows], route_index[rows]))]
+    cell = route_index[rows] * len(times) + slot[rows]
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = cell[1:] != cell[:-1]
+    rows, cell = rows[first], cell[first]
+
+    values = np.full((len(routes) * len(times), len(features)), np.nan)
+    values[cell] = df[features].to_numpy(dtype=np.float64)[rows]
+    values = values.reshape(len(routes), len(times), len(features))
+    observed = ~np.isnan(values)
+
+    if fill != 'none':
+        # Work on (route * feature, time) planes so each policy is one array pass
+        planes = values.transpose(0, 2, 1).reshape(-1, len(times))
+        planes_observed = observed.transpose(0, 2, 1).reshape(-1, len(times))
+        if fill == 'ffill':
+            planes = _fill_ffill(planes, planes_observed)
+        elif fill == 'linear':
+            planes = _fill_linear(planes, planes_observed)
+        else:
+            slots_per_week = pd.Timedelta('7D') // freq
+            local = times.tz_localize(None).as_unit('us').asi8
+            # Weeks counted from Monday 1970-01-05
+            week_offset = (local - pd.Timestamp('1970-01-05').value // 1000) % (slots_per_week * step)
+            planes = _fill_seasonal(planes, planes_observed, week_offset // step, slots_per_week)
+        values = planes.reshape(len(routes), len(features), len(times)).transpose(0, 2, 1)
+
+    return RouteGrid(np.ascontiguousarray(values), ~observed, routes, times, features)
@@ -0,0 +1,143 @@
+import asyncio
+import hashlib
+import logging
+import time
+from collections import deque
+from datetime import datetime, timedelta
+import pytz
+
+
+class WallClockScheduler:
+    def __init__(self, interval_minutes=15, timezone='Africa/Lagos', missed_ticks='skip',
+                 spread_seconds=0, grace_seconds=60, history=96, clock=None, sleep=time.sleep):
+        """
+        Schedule scrape cycles on wall-clock boundaries instead of sleeping a
+        fixed interval after each cycle.
+
+        Ticks fall on multiples of interval_minutes counted from local midnight
+        (00:00, 00:15, 00:30, ... for 15 minutes), so cycle duration never
+        accumulates into timestamp drift.
+
+        missed_ticks: what to do when a cycle overruns one or more boundaries
+            'skip'     - resume at the next future boundary
+            'catch_up' - run every missed tick immediately, in order
+        spread_seconds: window after each tick across which individual fetches
+            are spread; see offset_for
+        grace_seconds: a tick reached this late is still run under 'skip'
+        history: number of recent (tick, lateness) pairs kept in self.lateness
+        clock: callable returning the current aware datetime (default: the
+            system clock in timezone); with sleep, lets tests drive time
+        sleep: blocking sleep taking seconds
+        """
+        if missed_ticks not in ('skip', 'catch_up'):
+            raise ValueError(f"Unknown missed_ticks policy: {missed_ticks}")
+
+        self.interval = timedelta(minutes=interval_minutes)
+        self.tz = pytz.timezone(timezone) if isinstance(timezone, str) else timezone
+        self.missed_ticks = missed_ticks
+        self.spread_seconds = spread_seconds
+        self.grace = timedelta(seconds=grace_seconds)
+        self.lateness = deque(maxlen=history)
+        self.skipped_ticks = 0
+        self.clock = clock
+        self.sleep = sleep
+
+    def now(self):
+        return self.clock() if self.clock is not None else datetime.now(self.tz)
+
+    def next_boundary(self, after):
+        """First tick strictly after the given aware datetime"""
+        local = after.astimezone(self.tz)
+        midnight = self.tz.localize(datetime(local.year, local.month, local.day))
+        elapsed = local - midnight
+        ticks = elapsed // self.interval + 1
+        boundary = midnight + ticks * self.interval
+
+        # Intervals that don't divide a day restart at the next midnight
+        next_midnight = self.tz.localize(datetime.combine(local.date() + timedelta(days=1), datetime.min.time()))
+        return min(boundary, next_midnight)
+
+    def offset_for(self, key):
+        """
+        Deterministic offset in [0, spread_seconds) for a route or group key.
+
+        The same key always lands at the same point of the interval, so API
+        calls are spread out evenly instead of bursting on the boundary.
+        """
+        if not self.spread_seconds:
+            return 0.0
+        digest = hashlib.md5(str(key).encode('utf-8')).digest()
+        fraction = int.from_bytes(digest[:8], 'big') / 2 ** 64
+        return fraction * self.spread_seconds
+
+    def seconds_until(self, when):
+        return (when - self.now()).total_seconds()
+
+    def sleep_until(self, when):
+        remaining = self.seconds_until(when)
+        while remaining > 0:
+            self.sleep(remaining)
+            remaining = self.seconds_until(when)
+
+    async def sleep_until_async(self, when):
+        remaining = self.seconds_until(when)
+        while remaining > 0:
+            await asyncio.sleep(remaining)
+            remaining = self.seconds_until(when)
+
+    def record(self, tick):
+        """Record and log how late a tick actually started"""
+        lateness = max(0.0, -self.seconds_until(tick))
+        self.lateness.append((tick, lateness))
+        logging.info(f"Tick {tick.isoformat()} started {lateness:.3f}s late")
+        return lateness
+
+    def advance(self, tick):
+        """Choose the tick to run after the given one, applying the missed-tick policy"""
+        following = self.next_boundary(tick)
+        if self.missed_ticks == 'catch_up':
+            return following
+
+        now = self.now()
+        if now <= following + self.grace:
+            return following
+
+        resume = self.next_boundary(now)
+        # Walk the boundaries rather than divide: a day need not hold whole intervals
+        skipped, missed = 0, following
+        while missed < resume:
+            skipped += 1
+            missed = self.next_boundary(missed)
+        self.skipped_ticks += skipped
+        logging.warning(f"Skipped {skipped} missed tick(s); resuming at {resume.isoformat()}")
+        return resume
+
+    def ticks(self):
+        """Yield tick datetimes forever, sleeping until each one is due"""
+        tick = self.next_boundary(self.now())
+        while True:
+            self.sleep_until(tick)
+            self.record(tick)
+            yield tick
+            tick = self.advance(tick)
+
+    async def ticks_async(self):
+        """Async counterpart of ticks"""
+        tick = self.next_boundary(self.now())
+        while True:
+            await self.sleep_until_async(tick)
+            self.record(tick)
+            yield tick
+            tick = self.advance(tick)
+
+    def lateness_summary(self):
+        """Mean and max lateness in seconds over the recorded ticks"""
+        if not self.lateness:
+            return {'ticks': 0, 'mean_s': 0.0, 'max_s': 0.0, 'skipped': self.skipped_ticks}
+        values = [lateness for _, lateness in self.lateness]
+        return {
+            'ticks': len(values),
+            'mean_s': sum(values) / len(values),
+            'max_s': max(values),
+            'skipped': self.skipped_ticks
+        }
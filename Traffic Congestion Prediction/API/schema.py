@@ -0,0 +1,92 @@
+from datetime import datetime
+
+TIMEZONE = 'Africa/Lagos'
+
+# Column order written by NigeriaTrafficScraper.build_record
+TRAFFIC_COLUMNS = [
+    'city', 'origin', 'destination', 'distance_km', 'distance_meters',
+    'duration_normal_mins', 'duration_in_traffic_mins', 'traffic_ratio',
+    'timestamp', 'day_of_week', 'is_weekend', 'hour_of_day', 'peak_hour',
+    'time_period', 'num_alternative_routes', 'steps_count', 'has_tolls',
+    'route_complexity'
+]
+WEATHER_COLUMNS = [
+    'temperature_c', 'feels_like_c', 'humidity_percent', 'pressure_hpa',
+    'weather_condition', 'weather_description', 'wind_speed_ms',
+    'wind_direction_degrees', 'cloud_coverage_percent', 'visibility_meters',
+    'rain_1h_mm', 'rain_3h_mm'
+]
+COLUMNS = TRAFFIC_COLUMNS + WEATHER_COLUMNS
+
+# Column order written by NigeriaTrafficScraper.build_alternatives
+ALTERNATIVE_COLUMNS = [
+    'city', 'origin', 'destination', 'timestamp', 'alternative', 'summary', 'path_id',
+    'distance_meters', 'duration_seconds', 'duration_in_traffic_seconds', 'steps_count',
+    'has_tolls', 'step_hashes'
+]
+
+CATEGORICAL_COLUMNS = [
+    'city', 'origin', 'destination', 'day_of_week', 'time_period',
+    'weather_condition', 'weather_description'
+]
+BOOL_COLUMNS = ['is_weekend', 'peak_hour', 'has_tolls']
+INT_COLUMNS = {
+    'distance_meters': 'int32',
+    'duration_normal_mins': 'int32',
+    'duration_in_traffic_mins': 'int32',
+    'hour_of_day': 'int8',
+    'num_alternative_routes': 'int8',
+    'steps_count': 'int16'
+}
+# Weather fields are missing for rows whose OpenWeather call failed, so they stay float
+FLOAT_COLUMNS = [
+    'distance_km', 'traffic_ratio', 'route_complexity', 'temperature_c',
+    'feels_like_c', 'humidity_percent', 'pressure_hpa', 'wind_speed_ms',
+    'wind_direction_degrees', 'cloud_coverage_percent', 'visibility_meters',
+    'rain_1h_mm', 'rain_3h_mm'
+]
+
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+TIME_PERIOD_ORDER = ['Morning', 'Afternoon', 'Evening', 'Night']
+
+
+def parse_distance_km(text):
+    """Convert Google's distance text ("28.8 km", "850 m", "1,204 km") to kilometres"""
+    if text is None or isinstance(text, float):
+        return text
+    value, _, unit = str(text).replace(',', '').partition(' ')
+    value = float(value)
+    return value / 1000 if unit.strip() == 'm' else value
+
+
+def arrow_schema(include_partitions=False):
+    """pyarrow schema for the columnar storage backend"""
+    import pyarrow as pa
+
+    categorical = pa.dictionary(pa.int32(), pa.string())
+    fields = []
+    for name in COLUMNS:
+        if name == 'city' and not include_partitions:
+            continue
+        if name == 'timestamp':
+            fields.append((name, pa.timestamp('us', tz=TIMEZONE)))
+        elif name in CATEGORICAL_COLUMNS:
+            fields.append((name, categorical))
+        elif name in BOOL_COLUMNS:
+            fields.append((name, pa.bool_()))
+        elif name in INT_COLUMNS:
+            fields.append((name, getattr(pa, INT_COLUMNS[name])()))
+        else:
+            fields.append((name, pa.float64()))
+    if include_partitions:
+        fields.append(('date', pa.date32()))
+    return pa.schema(fields)
+
+
+def normalize_record(data):
+    """Typed copy of a scraped row: numeric distance_km and a parsed timestamp"""
+    record = {name: data.get(name) for name in COLUMNS}
+    record['distance_km'] = parse_distance_km(record['distance_km'])
+    if isinstance(record['timestamp'], str):
+        record['timestamp'] = datetime.fromisoformat(record['timestamp'])
+    return record
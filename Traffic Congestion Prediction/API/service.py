@@ -0,0 +1,377 @@
+import json
+import logging
+import math
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+import pandas as pd
+from feature_store import OnlineFeatureStore
+from schema import TIMEZONE
+from time_features import PEAK_HOURS, nigerian_holidays
+from train import DEFAULT_REGISTRY, WEATHER_FEATURES
+
+CADENCE_US = 15 * 60 * 1_000_000
+
+
+@lru_cache(maxsize=None)
+def _holidays(year):
+    return frozenset(nigerian_holidays([year]))
+
+
+def calendar_features(ts):
+    """train.TIME_FEATURES for one Africa/Lagos timestamp, without a DataFrame"""
+    hour, weekday = ts.hour, ts.weekday()
+    return {
+        'hour': hour,
+        'weekday': weekday,
+        'is_weekend': float(weekday >= 5),
+        'hour_of_week': weekday * 24 + hour,
+        'peak_hour': float(PEAK_HOURS[hour]),
+        'is_holiday': float(ts.date() in _holidays(ts.year))
+    }
+
+
+def parse_time(value):
+    """Request time as an Africa/Lagos Timestamp; naive values are local time, None is now"""
+    ts = pd.Timestamp.now(tz=TIMEZONE) if value is None else pd.Timestamp(value)
+    return ts.tz_localize(TIMEZONE) if ts.tz is None else ts.tz_convert(TIMEZONE)
+
+
+class LinearStack:
+    def __init__(self, pipelines):
+        """
+        Imputer -> scaler -> ridge pipelines of several routes folded into
+        stacked arrays, so one vectorized expression predicts a batch that
+        mixes routes.
+        """
+        imputers, scalers, ridges = zip(*[[step for _, step in p.steps] for p in pipelines])
+        self.fill = np.vstack([imputer.statistics_ for imputer in imputers])
+        scale = np.vstack([scaler.scale_ for scaler in scalers])
+        mean = np.vstack([scaler.mean_ for scaler in scalers])
+        coef = np.vstack([ridge.coef_ for ridge in ridges])
+        self.weight = coef / scale
+        self.bias = np.array([ridge.intercept_ for ridge in ridges]) - (mean * self.weight).sum(axis=1)
+
+    @staticmethod
+    def supports(pipeline):
+        names = [type(step).__name__ for _, step in getattr(pipeline, 'steps', [])]
+        return names == ['SimpleImputer', 'StandardScaler', 'Ridge']
+
+    def predict(self, X, rows):
+        X = np.where(np.isnan(X), self.fill[rows], X)
+        return np.einsum('ij,ij->i', X, self.weight[rows]) + self.bias[rows]
+
+
+class ModelRegistry:
+    def __init__(self, registry=DEFAULT_REGISTRY, model='linear'):
+        """
+        Models of one kind loaded from a train.train_routes registry and
+        kept resident. Linear pipelines are folded into one LinearStack per
+        horizon; other models are called per route.
+        """
+        import joblib
+
+        with open(os.path.join(registry, 'manifest.json')) as f:
+            manifest = json.load(f)
+        self.model = model
+        self.features = manifest['features']
+        self.target = manifest['target']
+
+        metrics = pd.read_csv(os.path.join(registry, 'metrics.csv'))
+        metrics = metrics[(metrics['model'] == model) & metrics['path'].notna()]
+        if metrics.empty:
+            raise ValueError(f"No {model} models in {registry}")
+
+        self.routes = sorted({(r.city, r.origin, r.destination) for r in metrics.itertuples()})
+        self.route_index = {route: i for i, route in enumerate(self.routes)}
+        horizons = sorted(metrics['horizon'].unique(), key=pd.Timedelta)
+        self.horizons = [(h, pd.Timedelta(h) // pd.Timedelta(microseconds=1)) for h in horizons]
+
+        # {horizon: {route: model}}; a horizon missing some routes is not stacked
+        self._models = {h: {} for h in horizons}
+        for r in metrics.itertuples():
+            self._models[r.horizon][(r.city, r.origin, r.destination)] = joblib.load(r.path)
+        self._stacks = {}
+        for horizon, models in self._models.items():
+            if len(models) == len(self.routes) and all(LinearStack.supports(m) for m in models.values()):
+                self._stacks[horizon] = LinearStack([models[route] for route in self.routes])
+
+    def predict(self, horizon, routes, X):
+        """Predictions for rows X of the given routes, all at one horizon"""
+        stack = self._stacks.get(horizon)
+        if stack is not None:
+            return stack.predict(X, np.array([self.route_index[route] for route in routes]))
+        out = np.empty(len(routes))
+        by_route = {}
+        for i, route in enumerate(routes):
+            by_route.setdefault(route, []).append(i)
+        for route, rows in by_route.items():
+            out[rows] = self._models[horizon][route].predict(X[rows])
+        return out
+
+
+class PredictionService:
+    def __init__(self, registry=DEFAULT_REGISTRY, sources=(), model='linear', max_batch=64,
+                 max_wait_ms=1.0, store=None):
+        """
+        Congestion predictions from resident route models.
+
+        Feature history comes from an OnlineFeatureStore warmed from the
+        city CSVs in `sources` (and fed further by update()). Requests are
+        queued and a single batcher thread drains up to max_batch of them,
+        waiting at most max_wait_ms for company, into one predict call per
+        horizon.
+
+        A prediction for time T uses the shortest trained horizon h whose
+        feature time T - h is no later than one scrape after the route's
+        latest observation. Beyond the longest horizon the lag features are
+        missing and the models fall back on their imputed values (unless
+        feature_vector is asked to carry the latest ones forward).
+
+        store: OnlineFeatureStore to share with a scraper in the same
+        process, so its rows reach the lag and rolling features directly;
+        weather and normal durations still come from warm() and update()
+        """
+        from loader import load_traffic_csv
+
+        self.registry = ModelRegistry(registry, model)
+        self.store = store if store is not None else OnlineFeatureStore()
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.weather = {}
+        self.normal_minutes = {}
+
+        if sources:
+            frame = pd.concat([load_traffic_csv(source) for source in sources], ignore_index=True)
+            self.warm(frame)
+
+        self._queue = queue.Queue()
+        self._batcher = threading.Thread(target=self._run_batches, daemon=True)
+        self._batcher.start()
+
+    def warm(self, df):
+        self.store.warm(df)
+        latest = df.sort_values('timestamp').groupby(['city', 'origin', 'destination'], observed=True)
+        weather = [c for c in WEATHER_FEATURES if c in df.columns]
+        for route, row in latest[weather].last().iterrows():
+            self.weather[route] = row.to_dict()
+        for route, minutes in latest['duration_normal_mins'].median().items():
+            self.normal_minutes[route] = float(minutes)
+
+    def update(self, data):
+        """Feed a freshly scraped row (same dict as the scraper's save_data)"""
+        self.store.update(data)
+        route = self.store.route_key(data)
+        self.weather[route] = {c: data.get(c) for c in WEATHER_FEATURES}
+
+    def choose_horizon(self, route, at_us):
+        latest = self.store.latest(route)
+        for horizon, horizon_us in self.registry.horizons:
+            if latest is not None and at_us - horizon_us <= latest + CADENCE_US:
+                return horizon, horizon_us
+        return self.registry.horizons[-1]
+
+    def feature_vector(self, route, at, carry=False):
+        """
+        (horizon, feature row) for predicting the route at time `at`
+
+        carry: beyond the longest horizon, take the lag and rolling features
+        as of one scrape after the route's latest observation instead of
+        leaving them missing
+        """
+        at_us = at.value // 1000
+        horizon, horizon_us = self.choose_horizon(route, at_us)
+        feature_time = at - pd.Timedelta(microseconds=horizon_us)
+
+        values = calendar_features(feature_time)
+        values.update(self.weather.get(route, {}))
+        if route in self.store.routes:
+            store_time = feature_time
+            latest = self.store.latest(route)
+            if carry and at_us - horizon_us > latest + CADENCE_US:
+                store_time = pd.Timestamp(latest + CADENCE_US, unit='us', tz=TIMEZONE)
+            values.update(self.store.features(route, at=store_time))
+        row = np.array([values.get(name, math.nan) for name in self.registry.features], dtype=np.float64)
+        return horizon, row
+
+    def submit(self, route, at=None):
+        """Queue a prediction; returns a Future of the result dict"""
+        if route not in self.registry.route_index:
+            raise KeyError(f"No model for route {route}")
+        at = parse_time(at)
+        horizon, row = self.feature_vector(route, at)
+        future = Future()
+        self._queue.put((route, at, horizon, row, future))
+        return future
+
+    def predict(self, route, at=None, timeout=5):
+        return self.submit(route, at).result(timeout)
+
+    def _run_batches(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._predict_batch(batch)
+            except Exception as e:
+                logging.error(f"Prediction batch failed: {str(e)}")
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _predict_batch(self, batch):
+        by_horizon = {}
+        for item in batch:
+            by_horizon.setdefault(item[2], []).append(item)
+
+        for horizon, items in by_horizon.items():
+            routes = [item[0] for item in items]
+            start = time.perf_counter()
+            predictions = self.registry.predict(horizon, routes, np.vstack([item[3] for item in items]))
+            model_ms = (time.perf_counter() - start) * 1000
+
+            for (route, at, _, _, future), ratio in zip(items, predictions):
+                normal = self.normal_minutes.get(route, math.nan)
+                future.set_result({
+                    'city': route[0],
+                    'origin': route[1],
+                    'destination': route[2],
+                    'timestamp': at.isoformat(),
+                    'horizon': horizon,
+                    'model': self.registry.model,
+                    self.registry.target: float(ratio),
+                    'duration_in_traffic_mins': float(ratio * normal) if normal == normal else None,
+                    'batch_size': len(items),
+                    'model_ms': model_ms
+                })
+
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; Nagle would hold the body
+    # back for the client's delayed ACK (~40 ms) on every keep-alive request
+    disable_nagle_algorithm = True
+    service = None
+    departures = None
+    # Seconds to wait for the batcher before answering 504
+    timeout = 5
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self, params):
+        if not isinstance(params, dict):
+            raise ValueError('each request must be a JSON object')
+        for name in ('origin', 'destination'):
+            if not isinstance(params.get(name), str):
+                raise ValueError(f"missing or invalid parameter: {name}")
+        return (params.get('city', 'Lagos'), params['origin'], params['destination'])
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/health':
+            self._send(200, {'status': 'ok', 'routes': len(self.service.registry.routes)})
+        elif url.path == '/routes':
+            self._send(200, [dict(zip(['city', 'origin', 'destination'], r)) for r in self.service.registry.routes])
+        elif url.path == '/predict':
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            self._predict([params])
+        elif url.path == '/departure':
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            try:
+                result = self.departures.best_departure(self._route(params), params.get('start'),
+                                                        params.get('end'), int(params.get('top', 3)))
+            except KeyError as e:
+                self._send(404, {'error': e.args[0] if e.args else 'not found'})
+            except (ValueError, TypeError) as e:
+                self._send(400, {'error': str(e)})
+            else:
+                self._send(200, result)
+        else:
+            self._send(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if urlparse(self.path).path != '/predict':
+            self._send(404, {'error': 'not found'})
+            return
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        except ValueError:
+            self._send(400, {'error': 'invalid JSON'})
+            return
+        self._predict(payload if isinstance(payload, list) else [payload])
+
+    def _predict(self, requests):
+        if not requests:
+            self._send(400, {'error': 'empty request'})
+            return
+        try:
+            # Validate and submit everything first so a multi-route request shares one batch
+            routes = [self._route(r) for r in requests]
+            futures = [self.service.submit(route, r.get('timestamp')) for route, r in zip(routes, requests)]
+            results = [future.result(timeout=self.timeout) for future in futures]
+        except KeyError as e:
+            self._send(404, {'error': e.args[0] if e.args else 'not found'})
+        except (ValueError, TypeError) as e:
+            self._send(400, {'error': str(e)})
+        except FutureTimeout:
+            self._send(504, {'error': 'prediction timed out'})
+        else:
+            self._send(200, results[0] if len(results) == 1 else results)
+
+    def log_message(self, format, *args):
+        logging.debug(format % args)
+
+
+class PredictionServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops connections when many clients connect at once
+    request_queue_size = 128
+
+
+def serve(service, host='127.0.0.1', port=8000):
+    from departure import DepartureSearch
+
+    handler = type('Handler', (PredictionHandler,), {'service': service, 'departures': DepartureSearch(service)})
+    server = PredictionServer((host, port), handler)
+    logging.info(f"Serving predictions on http://{host}:{port}")
+    return server
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Serve congestion predictions from the model registry')
+    parser.add_argument('sources', nargs='*', default=['../Data/traffic_weather_data_lagos.csv'],
+                        help='city CSV files to warm the feature store from')
+    parser.add_argument('--registry', default=DEFAULT_REGISTRY,
+                        help='model registry directory (default: $TRAFFIC_MODEL_REGISTRY or '
+                             '~/.cache/traffic-congestion/models)')
+    parser.add_argument('--model', default='linear')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    server = serve(PredictionService(args.registry, args.sources, args.model), args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
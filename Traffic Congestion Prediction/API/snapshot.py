@@ -0,0 +1,68 @@
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from loader import load_traffic_csv
+from cleaning import WEATHER_FILL_COLUMNS, OUTLIER_COLUMNS, clean_traffic_data
+
+# Bump when clean_traffic_data changes so old snapshots are not reused
+CLEANING_VERSION = 1
+# Snapshots live outside the repository; set TRAFFIC_SNAPSHOT_DIR (or pass
+# cache_dir) to use another directory
+DEFAULT_SNAPSHOT_DIR = os.environ.get(
+    'TRAFFIC_SNAPSHOT_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'traffic-congestion', 'snapshots')
+)
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """sha256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def snapshot_key(source, params):
+    """Cache key from the source file contents and the cleaning parameters"""
+    payload = json.dumps(
+        {'source': file_digest(source), 'params': params, 'version': CLEANING_VERSION},
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+
+def load_cleaned(source, cache_dir=DEFAULT_SNAPSHOT_DIR, fill_columns=WEATHER_FILL_COLUMNS,
+                 outlier_columns=OUTLIER_COLUMNS, iqr_k=1.5, drop_columns=('distance_km',)):
+    """
+    Load the cleaned analysis DataFrame for a scraped CSV, using a cached snapshot.
+
+    Snapshots are uncompressed Feather (Arrow IPC) files named by a hash of
+    the source file's contents and the cleaning parameters, and are read
+    memory-mapped. A changed source file or parameter set produces a new
+    key, so a stale snapshot is never returned.
+    """
+    from pyarrow import feather
+
+    params = {
+        'fill_columns': list(fill_columns),
+        'outlier_columns': list(outlier_columns),
+        'iqr_k': iqr_k,
+        'drop_columns': list(drop_columns)
+    }
+    cache_dir = Path(cache_dir)
+    snapshot = cache_dir / f"cleaned-{snapshot_key(source, params)}.feather"
+
+    if snapshot.exists():
+        return feather.read_table(snapshot, memory_map=True).to_pandas()
+
+    df = clean_traffic_data(load_traffic_csv(source), **params)
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # Write then rename so a concurrent reader never sees a partial file
+    partial = snapshot.with_suffix(f'.{os.getpid()}.tmp')
+    feather.write_feather(df, partial, compression='uncompressed')
+    os.replace(partial, snapshot)
+    logging.info(f"Wrote cleaned snapshot {snapshot}")
+    return df
@@ -0,0 +1,285 @@
+import csv
+import os
+import functools
+import operator
+import uuid
+import logging
+from datetime import datetime
+from pathlib import Path
+from schema import TIMEZONE, COLUMNS, arrow_schema, normalize_record
+from loader import load_traffic_csv, order_categories
+
+
+def city_filename(city, suffix, prefix='traffic_weather_data'):
+    """Build the per-city file name used by the scraper"""
+    return f"{prefix}_{city.lower().replace(' ', '_')}{suffix}"
+
+
+def _is_missing(value):
+    # pandas writes both None and NaN as an empty field
+    return value is None or (isinstance(value, float) and value != value)
+
+
+class CSVAppendWriter:
+    def __init__(self, directory='.', flush_every=1, fsync=False, prefix='traffic_weather_data',
+                 columns=COLUMNS):
+        """
+        Append-only CSV writer keeping one open file handle per city.
+
+        Rows are formatted the same way as ``pd.DataFrame([row]).to_csv(index=False)``
+        so files written here are interchangeable with the old read/concat/rewrite
+        path. A new file gets the full `columns` header whatever keys its first
+        row has (a row scraped while the weather call failed has no weather
+        keys); for existing files the header line is read once and reused as
+        the column order.
+
+        flush_every: flush the handle after this many rows (1 = every row)
+        fsync: also fsync the file descriptor on every flush
+        prefix: file name prefix, so other per-city tables can share the directory
+        columns: header of new files
+        """
+        self.directory = Path(directory)
+        self.flush_every = max(1, int(flush_every))
+        self.fsync = fsync
+        self.prefix = prefix
+        self.columns = list(columns)
+        self._handles = {}
+
+    def path_for(self, city):
+        return self.directory / city_filename(city, '.csv', self.prefix)
+
+    def _open(self, city):
+        filepath = self.path_for(city)
+        fieldnames = None
+
+        if filepath.exists() and filepath.stat().st_size > 0:
+            with open(filepath, 'r', newline='') as f:
+                fieldnames = next(csv.reader(f), None)
+
+        handle = open(filepath, 'a', newline='')
+        writer = csv.DictWriter(
+            handle,
+            fieldnames=fieldnames or self.columns,
+            restval='',
+            extrasaction='ignore',
+            lineterminator=os.linesep
+        )
+        if fieldnames is None:
+            writer.writeheader()
+
+        state = {'handle': handle, 'writer': writer, 'pending': 0}
+        self._handles[city] = state
+        return state
+
+    def write(self, data, city):
+        """Append a single row for a city"""
+        state = self._handles.get(city) or self._open(city)
+
+        extra = set(data) - set(state['writer'].fieldnames)
+        if extra:
+            logging.warning(f"Dropping columns not in {city} header: {sorted(extra)}")
+
+        state['writer'].writerow({k: '' if _is_missing(v) else v for k, v in data.items()})
+        state['pending'] += 1
+
+        if state['pending'] >= self.flush_every:
+            self._flush(state)
+
+    def _flush(self, state):
+        state['handle'].flush()
+        if self.fsync:
+            os.fsync(state['handle'].fileno())
+        state['pending'] = 0
+
+    def flush(self):
+        for state in self._handles.values():
+            self._flush(state)
+
+    def close(self):
+        for state in self._handles.values():
+            self._flush(state)
+            state['handle'].close()
+        self._handles.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _partitioning(dictionary_city=False):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    city_type = pa.dictionary(pa.int32(), pa.string()) if dictionary_city else pa.string()
+    return ds.partitioning(
+        pa.schema([('city', city_type), ('date', pa.date32())]),
+        flavor='hive',
+        dictionaries='infer' if dictionary_city else None
+    )
+
+
+def _fsync_paths(paths):
+    """fsync each file, then the directories holding them so the new entries are durable too"""
+    paths = [str(path) for path in paths]
+    for path in paths + sorted({os.path.dirname(path) for path in paths}):
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def write_parquet_partitions(table, directory, fsync=False):
+    """
+    Write an arrow table holding 'city' and 'date' columns as one new part
+    file per city/date partition under directory. Existing parts are kept.
+
+    fsync: fsync the new part files and their partition directories
+    """
+    import pyarrow.dataset as ds
+
+    written = []
+    ds.write_dataset(
+        table,
+        str(directory),
+        format='parquet',
+        partitioning=_partitioning(),
+        existing_data_behavior='overwrite_or_ignore',
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        file_visitor=lambda written_file: written.append(written_file.path)
+    )
+    if fsync:
+        _fsync_paths(written)
+
+
+class ParquetPartitionWriter:
+    def __init__(self, directory='traffic_weather_data', flush_every=100, fsync=False):
+        """
+        Columnar storage backend: rows are buffered and written as Parquet part
+        files under directory/city=<city>/date=<YYYY-MM-DD>/.
+
+        Categorical columns are dictionary encoded, flags are booleans,
+        distance_km is numeric and timestamp is a tz-aware Africa/Lagos
+        timestamp. Parquet files cannot be appended to, so each flush adds a
+        part file; run compact() periodically to merge a partition's parts.
+
+        flush_every: buffered rows that trigger a flush (the scraper also
+        flushes at the end of every cycle)
+        fsync: fsync every part file written (and merged files before their
+        parts are removed)
+        """
+        self.directory = Path(directory)
+        self.flush_every = max(1, int(flush_every))
+        self.fsync = fsync
+        self._rows = []
+
+    def write(self, data, city):
+        record = normalize_record(data)
+        record['city'] = city
+        self._rows.append(record)
+        if len(self._rows) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+        import pyarrow as pa
+
+        rows, self._rows = self._rows, []
+        for row in rows:
+            row['date'] = row['timestamp'].date()
+        table = pa.Table.from_pylist(rows, schema=arrow_schema(include_partitions=True))
+        write_parquet_partitions(table, self.directory, fsync=self.fsync)
+
+    def compact(self, city=None):
+        """Merge the part files of each partition (optionally one city) into one file"""
+        import pyarrow.parquet as pq
+
+        pattern = f"city={city}/date=*" if city else "city=*/date=*"
+        for partition in sorted(self.directory.glob(pattern)):
+            parts = sorted(partition.glob('*.parquet'))
+            if len(parts) < 2:
+                continue
+            table = pq.read_table(parts, schema=arrow_schema()).sort_by('timestamp')
+            merged = partition / f"part-{uuid.uuid4().hex}-0.parquet"
+            pq.write_table(table, merged)
+            if self.fsync:
+                _fsync_paths([merged])
+            for part in parts:
+                part.unlink()
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def csv_to_parquet(csv_path, directory):
+    """Convert an existing per-city CSV into the partitioned Parquet layout"""
+    import pyarrow as pa
+
+    df = load_traffic_csv(csv_path)
+    for name in ('day_of_week', 'time_period'):
+        df[name] = df[name].cat.as_unordered()
+    df['date'] = df['timestamp'].dt.date
+    schema = arrow_schema(include_partitions=True)
+    table = pa.Table.from_pandas(df[schema.names], schema=schema, preserve_index=False)
+    write_parquet_partitions(table, directory)
+
+
+def _local_bound(value, end=False):
+    """Timestamp bound in Africa/Lagos; a bare date as an end bound covers the whole day"""
+    import pandas as pd
+
+    bound = pd.Timestamp(value)
+    whole_day = not isinstance(value, datetime) and (not isinstance(value, str) or len(value) == 10)
+    if end and whole_day:
+        bound = bound + pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
+    return bound.tz_localize(TIMEZONE) if bound.tzinfo is None else bound.tz_convert(TIMEZONE)
+
+
+def load_parquet(directory, columns=None, start=None, end=None, routes=None, cities=None):
+    """
+    Load scraped data from the partitioned Parquet layout into a DataFrame.
+
+    Only the requested columns are read, and city/date partitions outside the
+    filters are never opened.
+
+    start, end: inclusive bounds (date, datetime or ISO string); naive values
+        are taken as Africa/Lagos local time
+    routes: iterable of (origin, destination) pairs
+    cities: iterable of city names
+    """
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(str(directory), format='parquet', partitioning=_partitioning(dictionary_city=True))
+
+    filters = []
+    if cities:
+        filters.append(ds.field('city').isin(list(cities)))
+    if start is not None:
+        start = _local_bound(start)
+        filters.append(ds.field('date') >= start.date())
+        filters.append(ds.field('timestamp') >= start)
+    if end is not None:
+        end = _local_bound(end, end=True)
+        filters.append(ds.field('date') <= end.date())
+        filters.append(ds.field('timestamp') <= end)
+    if routes:
+        clauses = [
+            (ds.field('origin') == origin) & (ds.field('destination') == destination)
+            for origin, destination in routes
+        ]
+        filters.append(functools.reduce(operator.or_, clauses))
+
+    expression = functools.reduce(operator.and_, filters) if filters else None
+    df = dataset.to_table(columns=columns, filter=expression).to_pandas()
+    if 'timestamp' in df.columns:
+        df = df.sort_values('timestamp', ignore_index=True)
+    return order_categories(df)
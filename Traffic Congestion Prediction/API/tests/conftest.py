@@ -0,0 +1,116 @@
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+
+# The API modules import each other as top-level siblings
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from schema import TIMEZONE, WEATHER_COLUMNS  # noqa: E402
+from storage import CSVAppendWriter  # noqa: E402
+from time_features import is_peak_hour, time_period  # noqa: E402
+
+ROUTES = [
+    ('Lagos', 'Ikeja', 'Victoria Island'), ('Lagos', 'Ajah', 'Victoria Island'),
+    ('Lagos', 'Festac', 'Ikoyi'), ('Lagos', 'Ikeja', 'Ikoyi')
+]
+
+
+def make_traffic_frame(cycles=500, seed=0, routes=ROUTES, start='2024-01-01', missing=0.05):
+    """
+    Synthetic scraper output: every route scraped once per cycle, in the
+    column layout of schema.COLUMNS.
+
+    Cycles are ~15 minutes apart with a few minutes of jitter and the odd
+    missed cycle. Weather comes from two shared latent factors, so the
+    weather columns are correlated with each other and with traffic_ratio;
+    pressure and visibility sit far from zero, and rain only falls in the
+    morning. `missing` is the fraction of rows whose weather call failed
+    (all weather fields NaN) and, separately, whose traffic_ratio is NaN.
+    """
+    rng = np.random.default_rng(seed)
+    steps = rng.choice([15, 15, 15, 30], cycles) + rng.integers(-2, 3, cycles)
+    cycle_times = pd.Timestamp(start, tz=TIMEZONE) + pd.to_timedelta(np.cumsum(steps), unit='min')
+    n = cycles * len(routes)
+    timestamp = cycle_times.repeat(len(routes))
+    city, origin, destination = (np.tile(np.array(column, dtype=object), cycles) for column in zip(*routes))
+    hour = timestamp.hour.to_numpy()
+
+    heat, storm = rng.normal(size=(2, n))
+    temperature = 28 + 2 * heat + rng.normal(0, 0.5, n)
+    morning = np.array([time_period(h) == 'Morning' for h in hour])
+    normal = rng.integers(20, 90, n)
+    ratio = 1.1 + 0.02 * (temperature - 28) + 0.1 * storm + 0.2 * np.isin(hour, [7, 8, 17, 18]) \
+        + rng.normal(0, 0.1, n)
+    df = pd.DataFrame({
+        'city': city, 'origin': origin, 'destination': destination,
+        'distance_km': rng.uniform(5, 40, n).round(1), 'duration_normal_mins': normal,
+        'duration_in_traffic_mins': np.round(normal * ratio).astype(int), 'traffic_ratio': ratio,
+        'timestamp': timestamp, 'day_of_week': timestamp.day_name(), 'is_weekend': timestamp.dayofweek >= 5,
+        'hour_of_day': hour, 'peak_hour': [is_peak_hour(h) for h in hour],
+        'time_period': [time_period(h) for h in hour], 'num_alternative_routes': rng.integers(0, 4, n),
+        'steps_count': rng.integers(5, 40, n), 'route_complexity': rng.uniform(0.1, 2, n),
+        'temperature_c': temperature, 'feels_like_c': temperature + 2 + rng.normal(0, 0.5, n),
+        'humidity_percent': 80 - 4 * heat + 5 * storm + rng.normal(0, 2, n),
+        'pressure_hpa': 1010 - 0.5 * storm + rng.normal(0, 0.2, n),
+        'weather_condition': np.where(storm > 1, 'Rain', rng.choice(['Clear', 'Clouds'], n)).astype(object),
+        'wind_speed_ms': np.abs(2 + storm + rng.normal(0, 0.5, n)), 'wind_direction_degrees': rng.uniform(0, 360, n),
+        'cloud_coverage_percent': np.clip(40 + 25 * storm + rng.normal(0, 10, n), 0, 100),
+        'visibility_meters': 10000 - 800 * np.clip(storm, 0, None) + rng.normal(0, 100, n),
+        'rain_1h_mm': np.where(morning, rng.exponential(1, n), 0.0), 'rain_3h_mm': 0.0
+    })
+    df['distance_meters'] = (df['distance_km'] * 1000).astype(int)
+
+    weather = ['temperature_c', 'feels_like_c', 'humidity_percent', 'pressure_hpa', 'wind_speed_ms',
+               'wind_direction_degrees', 'cloud_coverage_percent', 'visibility_meters', 'rain_1h_mm', 'rain_3h_mm']
+    failed = rng.random(n) < missing
+    df.loc[failed, weather] = np.nan
+    df.loc[failed, 'weather_condition'] = None
+    df.loc[rng.random(n) < missing, 'traffic_ratio'] = np.nan
+    return df
+
+
+def scraped_rows(df):
+    """Rows as the scraper hands them to the writers: ISO timestamps and Google's distance text"""
+    rows = []
+    for row in df.to_dict('records'):
+        row['timestamp'] = row['timestamp'].isoformat()
+        row['distance_km'] = f"{row['distance_km']} km"
+        # Rows scraped while the weather call failed have no weather keys
+        if row['temperature_c'] != row['temperature_c']:
+            row = {k: v for k, v in row.items() if k not in WEATHER_COLUMNS}
+        rows.append(row)
+    return rows
+
+
+@pytest.fixture(scope='session')
+def city_csv():
+    """Write a frame's rows to the per-city CSVs in a directory, as the scraper would; returns the paths"""
+    def write(df, directory):
+        paths = {}
+        with CSVAppendWriter(directory) as writer:
+            for row in scraped_rows(df):
+                writer.write(row, row['city'])
+                paths[row['city']] = writer.path_for(row['city'])
+        return paths
+
+    return write
+
+
+@pytest.fixture(scope='session')
+def traffic_frame():
+    """make_traffic_frame, for tests that need synthetic scraper output"""
+    return make_traffic_frame
+
+
+@pytest.fixture(scope='session')
+def trained_registry(traffic_frame, tmp_path_factory):
+    """(registry directory, training frame): linear models of two routes at the 15min and 1h horizons"""
+    pytest.importorskip('sklearn')
+    from train import train_routes
+
+    # Over a week of history, so the 7-day lags are populated
+    df = traffic_frame(700, routes=ROUTES[:2])
+    registry = str(tmp_path_factory.mktemp('registry'))
+    train_routes(df, registry, models=['linear'], horizons=('15min', '1h'), workers=1)
+    return registry, df
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+from correlation import CorrelationMatrix
+from schema import WEATHER_COLUMNS
+
+COLUMNS = ['distance_km', 'traffic_ratio', 'temperature_c', 'hour_of_day']
+NUMERIC = ['distance_km', 'temperature_c', 'traffic_ratio', 'pressure_hpa', 'hour_of_day', 'rain_1h_mm']
+
+
+def _scraped_rows(df):
+    """df as the dicts the scraper hands to save_data: distance as Google's text"""
+    rows = []
+    for i, row in enumerate(df.to_dict('records')):
+        row['distance_km'] = f"{row['distance_km']:.1f} km"
+        # Rows scraped while the weather call failed have no weather keys
+        if i % 10 == 0:
+            row = {k: v for k, v in row.items() if k not in WEATHER_COLUMNS}
+        rows.append(row)
+    return rows
+
+
+def test_update_accepts_raw_scraped_rows(traffic_frame):
+    rows = _scraped_rows(traffic_frame(50))
+    matrix = CorrelationMatrix(COLUMNS, by='time_period')
+    for row in rows:
+        matrix.update(row)
+
+    df = pd.DataFrame(rows)
+    df['distance_km'] = df['distance_km'].str.slice(0, -3).astype(float)
+    expected = df[COLUMNS].corr()
+    np.testing.assert_allclose(matrix.corr().to_numpy(), expected.to_numpy(), atol=1e-12)
+    for period, group in df.groupby('time_period'):
+        np.testing.assert_allclose(matrix.corr(period).to_numpy(), group[COLUMNS].corr().to_numpy(), atol=1e-12)
+
+
+def _assert_matches(actual, expected):
+    assert (actual.isna() == expected.isna()).all().all()
+    np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(), atol=1e-10)
+
+
+def test_matches_dataframe_corr(traffic_frame):
+    df = traffic_frame(750)
+    _assert_matches(CorrelationMatrix(NUMERIC).update_frame(df).corr(), df[NUMERIC].corr())
+
+
+def test_grouped_slices_match_groupby_corr(traffic_frame):
+    df = traffic_frame(750)
+    for by, columns in [('time_period', ['time_period']), ('route', ['city', 'origin', 'destination'])]:
+        matrix = CorrelationMatrix(NUMERIC, by=by).update_frame(df)
+        _assert_matches(matrix.corr(), df[NUMERIC].corr())
+        for key, group in df.groupby(columns):
+            key = key[0] if by == 'time_period' else key
+            _assert_matches(matrix.corr(key), group[NUMERIC].corr())
+
+        column = matrix.column('traffic_ratio')
+        assert len(column) == df.groupby(columns).ngroups
+
+
+def test_chunked_updates_and_persistence(traffic_frame, tmp_path):
+    df = traffic_frame(750)
+    matrix = CorrelationMatrix(NUMERIC, by='time_period')
+    for chunk in np.array_split(np.arange(len(df)), 5):
+        matrix.update_frame(df.iloc[chunk[:len(chunk) // 2]])
+        matrix.save(tmp_path / 'corr.npz')
+        matrix = CorrelationMatrix.load(tmp_path / 'corr.npz').update_frame(df.iloc[chunk[len(chunk) // 2:]])
+    _assert_matches(matrix.corr('Night'), df.loc[df['time_period'] == 'Night', NUMERIC].corr())
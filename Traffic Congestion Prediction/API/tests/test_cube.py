@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+from cube import AggregateCube
+from schema import DAY_ORDER
+
+
+def _expected(df, by, metric='traffic_ratio'):
+    columns = ['hour_of_day' if d == 'hour' else d for d in by]
+    result = df.groupby(columns)[metric].agg(['mean', 'std', 'count'])
+    result = result[result['count'] > 0]
+    result.index = result.index.set_names(by)
+    return result
+
+
+@pytest.mark.parametrize('by', [
+    ['hour'], ['day_of_week'], ['weather_condition'], ['time_period'], ['peak_hour'], ['origin'],
+    ['hour', 'day_of_week'], ['weather_condition', 'time_period'], ['origin', 'destination']
+])
+def test_rollups_match_groupby(traffic_frame, by):
+    df = traffic_frame()
+    cube = AggregateCube().update_frame(df)
+    actual = cube.rollup(by)
+    expected = _expected(df, by)
+    # Compare by label; the cube lists levels in their natural order
+    actual = actual.reindex(expected.index)
+    np.testing.assert_allclose(actual['mean'], expected['mean'], rtol=1e-10)
+    np.testing.assert_allclose(actual['std'], expected['std'], rtol=1e-8)
+    np.testing.assert_array_equal(actual['count'], expected['count'])
+    assert len(cube.rollup(by)) == len(expected)
+
+
+def test_rollup_order_follows_the_calendar(traffic_frame):
+    cube = AggregateCube().update_frame(traffic_frame())
+    assert list(cube.rollup('day_of_week').index) == DAY_ORDER
+    assert list(cube.rollup(['hour', 'day_of_week']).index[:7]) == [(0, day) for day in DAY_ORDER]
+
+
+def test_row_updates_and_persistence(traffic_frame, tmp_path):
+    df = traffic_frame(125)
+    by_frame = AggregateCube().update_frame(df)
+    by_row = AggregateCube()
+    for row in df.to_dict('records'):
+        by_row.update(row)
+    pd.testing.assert_frame_equal(by_row.rollup(['origin', 'hour']), by_frame.rollup(['origin', 'hour']))
+
+    by_frame.save(tmp_path / 'cube.npz')
+    loaded = AggregateCube.load(tmp_path / 'cube.npz').update_frame(df)
+    doubled = by_frame.update_frame(df).rollup('weather_condition')
+    pd.testing.assert_frame_equal(loaded.rollup('weather_condition'), doubled)
+
+
+def test_rows_without_a_cell_are_skipped(traffic_frame):
+    df = traffic_frame(50)
+    bad = df.astype({'hour_of_day': 'float64', 'day_of_week': object})
+    bad.loc[3, 'hour_of_day'] = np.nan
+    bad.loc[7, 'hour_of_day'] = 24
+    bad.loc[9, 'day_of_week'] = 'Someday'
+
+    cube = AggregateCube().update_frame(bad)
+    assert cube.skipped_rows == 3
+    expected = AggregateCube().update_frame(df.drop(index=[3, 7, 9]))
+    pd.testing.assert_frame_equal(cube.rollup(['origin', 'hour']), expected.rollup(['origin', 'hour']))
+
+    # Row updates skip the same rows
+    by_row = AggregateCube()
+    for row in bad.to_dict('records'):
+        by_row.update(row)
+    assert by_row.skipped_rows == 3
+    pd.testing.assert_frame_equal(by_row.rollup(['origin', 'hour']), expected.rollup(['origin', 'hour']))
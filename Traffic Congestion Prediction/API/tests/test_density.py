@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from density import PAIR_COLUMNS, BinnedScatter, OLSStats, binned_pairs
+
+
+def _polyfit(x, y):
+    valid = ~(np.isnan(x) | np.isnan(y))
+    slope, intercept = np.polyfit(x[valid], y[valid], 1)
+    return slope, intercept, np.corrcoef(x[valid], y[valid])[0, 1] ** 2
+
+
+@pytest.mark.parametrize('x', ['temperature_c', 'pressure_hpa', 'visibility_meters'])
+def test_fit_from_sums_matches_polyfit(traffic_frame, x):
+    # Pressure and visibility sit far from zero, where unshifted sums would cancel
+    df = traffic_frame(500)
+    xs, ys = df[x].to_numpy(), df['traffic_ratio'].to_numpy()
+    ols = OLSStats()
+    for batch in np.array_split(np.arange(len(df)), 7):
+        ols.update(xs[batch], ys[batch])
+    np.testing.assert_allclose(ols.fit(), _polyfit(xs, ys), rtol=1e-9)
+
+
+def test_fit_is_nan_without_spread():
+    assert np.isnan(OLSStats().update([1.0], [2.0]).fit()).all()
+    assert np.isnan(OLSStats().update([3.0, 3.0, 3.0], [1.0, 2.0, 4.0]).fit()).all()
+
+
+def test_bin_counts_match_histogram2d(traffic_frame):
+    df = traffic_frame(500)
+    binned = BinnedScatter.from_frame(df, 'temperature_c', 'humidity_percent', bins=25)
+    x, y = df['temperature_c'].to_numpy(), df['humidity_percent'].to_numpy()
+    valid = ~(np.isnan(x) | np.isnan(y))
+    expected, _, _ = np.histogram2d(x[valid], y[valid], bins=[binned.x_edges, binned.y_edges])
+    np.testing.assert_array_equal(binned.counts, expected)
+    assert binned.counts.sum() == valid.sum()
+    np.testing.assert_allclose(binned.fit(), _polyfit(x, y), rtol=1e-9)
+
+
+def test_points_outside_the_edges_land_in_the_outer_bins(traffic_frame):
+    df = traffic_frame(200)
+    x, y = df['temperature_c'].to_numpy(), df['traffic_ratio'].to_numpy()
+    x_edges, y_edges = np.linspace(26, 30, 9), np.linspace(1.0, 1.4, 5)
+    binned = BinnedScatter(x_edges, y_edges)
+    for batch in np.array_split(np.arange(len(df)), 3):
+        binned.update(x[batch], y[batch])
+    valid = ~(np.isnan(x) | np.isnan(y))
+    clipped = np.clip(x[valid], x_edges[0], x_edges[-1]), np.clip(y[valid], y_edges[0], y_edges[-1])
+    expected, _, _ = np.histogram2d(*clipped, bins=[x_edges, y_edges])
+    np.testing.assert_array_equal(binned.counts, expected)
+    # The fit still uses the unclipped values
+    np.testing.assert_allclose(binned.fit(), _polyfit(x, y), rtol=1e-9)
+
+
+def test_binned_pairs(traffic_frame):
+    df = traffic_frame(300)
+    binned = binned_pairs(df, bins=12)
+    assert binned['columns'] == PAIR_COLUMNS
+    assert set(binned['pairs']) == {(row, col) for i, row in enumerate(PAIR_COLUMNS) for col in PAIR_COLUMNS[:i]}
+    for column in PAIR_COLUMNS:
+        values = df[column].dropna().to_numpy()
+        np.testing.assert_array_equal(binned['diagonal'][column], np.histogram(values, bins=12)[0])
+    for (row, col), pair in binned['pairs'].items():
+        x, y = df[col].to_numpy(), df[row].to_numpy()
+        valid = ~(np.isnan(x) | np.isnan(y))
+        expected, _, _ = np.histogram2d(x[valid], y[valid], bins=[binned['edges'][col], binned['edges'][row]])
+        np.testing.assert_array_equal(pair.counts, expected)
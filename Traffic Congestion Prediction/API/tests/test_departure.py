@@ -0,0 +1,105 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('sklearn')
+from departure import DepartureSearch  # noqa: E402
+from service import PredictionService  # noqa: E402
+
+ROUTE = ('Lagos', 'Ikeja', 'Victoria Island')
+
+
+@pytest.fixture
+def service(trained_registry):
+    registry, df = trained_registry
+    service = PredictionService(registry, model='linear')
+    service.warm(df)
+    return service
+
+
+def _latest(service):
+    return pd.Timestamp(service.store.latest(ROUTE), unit='us', tz='Africa/Lagos')
+
+
+def _minutes(service, at):
+    horizon, row = service.feature_vector(ROUTE, at, carry=True)
+    return service.registry.predict(horizon, [ROUTE], row[None])[0] * service.normal_minutes[ROUTE]
+
+
+def test_best_departure_scores_every_slot(service):
+    start = _latest(service).ceil('15min') + pd.Timedelta('15min')
+    result = DepartureSearch(service).best_departure(ROUTE, start, start + pd.Timedelta('2h'), top=3)
+
+    slots = pd.date_range(start, start + pd.Timedelta('2h'), freq='15min')
+    expected = np.array([_minutes(service, slot) for slot in slots])
+    assert [s['departure'] for s in result['slots']] == [slot.isoformat() for slot in slots]
+    np.testing.assert_allclose([s['predicted_minutes'] for s in result['slots']], expected)
+
+    best = [b['predicted_minutes'] for b in result['best']]
+    assert best == sorted(best) and best[0] == pytest.approx(expected.min())
+    assert result['best'][0]['departure'] == slots[np.argmin(expected)].isoformat()
+    assert result['minutes_saved'] == pytest.approx(expected.max() - expected.min())
+    assert result['day_type'] == slots[0].day_name()
+
+
+def test_slots_beyond_the_horizons_carry_the_latest_lags(service):
+    latest = _latest(service)
+    far = latest + pd.Timedelta('1D')
+    names = service.registry.features
+    lags = [i for i, name in enumerate(names) if '_lag_' in name or '_roll_' in name]
+
+    _, missing = service.feature_vector(ROUTE, far)
+    _, carried = service.feature_vector(ROUTE, far, carry=True)
+    current = service.store.features(ROUTE, at=latest + pd.Timedelta('15min'))
+    short = [names.index(name) for name in ['traffic_ratio_lag_15min', 'traffic_ratio_roll_1h_mean']]
+    assert np.isnan(missing[short]).all()
+    np.testing.assert_array_equal(carried[lags], [current[names[i]] for i in lags])
+    assert not np.isnan(carried[short]).any()
+
+
+def test_cache_is_keyed_by_date_and_latest_observation(service):
+    search = DepartureSearch(service)
+    start = _latest(service).ceil('15min') + pd.Timedelta('1D')
+    end = start + pd.Timedelta('1h')
+    first = search.best_departure(ROUTE, start, end)
+    assert search.best_departure(ROUTE, start, end) == first
+    assert (search.cache_hits, search.cache_misses) == (1, 1)
+
+    # Same weekday and time of day a week later is a different search
+    search.best_departure(ROUTE, start + pd.Timedelta('7D'), end + pd.Timedelta('7D'))
+    assert search.cache_misses == 2
+
+    # A new scrape of the route replaces the cached answer
+    service.update({'city': ROUTE[0], 'origin': ROUTE[1], 'destination': ROUTE[2],
+                    'timestamp': _latest(service) + pd.Timedelta('15min'), 'traffic_ratio': 1.5,
+                    'duration_in_traffic_mins': 60.0})
+    search.best_departure(ROUTE, start, end)
+    assert (search.cache_hits, search.cache_misses) == (1, 3)
+
+
+def test_cache_entries_expire(service):
+    search = DepartureSearch(service, cache_ttl=0)
+    start = _latest(service).ceil('15min') + pd.Timedelta('1h')
+    for _ in range(2):
+        search.best_departure(ROUTE, start, start + pd.Timedelta('1h'))
+    assert (search.cache_hits, search.cache_misses) == (0, 2)
+    assert len(search._cache) == 1
+
+
+def test_cache_counters_under_concurrency(service):
+    search = DepartureSearch(service)
+    start = _latest(service).ceil('15min') + pd.Timedelta('2h')
+    windows = [(start + pd.Timedelta(hours=i % 4), start + pd.Timedelta(hours=i % 4 + 1)) for i in range(40)]
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda window: search.best_departure(ROUTE, *window), windows))
+    # Every lookup is counted once; at least one miss per distinct window
+    assert search.cache_hits + search.cache_misses == len(windows)
+    assert search.cache_misses >= 4
+
+
+def test_unknown_route(service):
+    with pytest.raises(KeyError, match='No model for route'):
+        DepartureSearch(service).best_departure(('Lagos', 'Nowhere', 'Victoria Island'))
+    with pytest.raises(ValueError):
+        DepartureSearch(service, max_slots=4).best_departure(ROUTE, '2025-01-20 08:00', '2025-01-20 10:00')
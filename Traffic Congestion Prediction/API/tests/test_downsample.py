@@ -0,0 +1,94 @@
+import math
+import numpy as np
+import pandas as pd
+import pytest
+from downsample import SeriesDownsampler, lttb_indices
+
+
+def naive_lttb(x, y, threshold):
+    """Direct port of Steinarsson's reference LTTB loop"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        avg_start = math.floor((i + 1) * every) + 1
+        avg_end = min(math.floor((i + 2) * every) + 1, n)
+        avg_x = sum(x[avg_start:avg_end]) / (avg_end - avg_start)
+        avg_y = sum(y[avg_start:avg_end]) / (avg_end - avg_start)
+
+        range_start = math.floor(i * every) + 1
+        range_end = math.floor((i + 1) * every) + 1
+        best, best_area = range_start, -1.0
+        for j in range(range_start, range_end):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return selected
+
+
+@pytest.mark.parametrize('n, n_out', [(1000, 100), (997, 50), (5000, 333), (50, 49), (10, 3)])
+def test_matches_reference_lttb(n, n_out):
+    rng = np.random.default_rng(n)
+    x = np.sort(rng.uniform(0, 1e6, n))
+    y = np.cumsum(rng.normal(size=n))
+    np.testing.assert_array_equal(lttb_indices(x, y, n_out), naive_lttb(list(x), list(y), n_out))
+
+
+def test_short_series_are_kept_whole():
+    np.testing.assert_array_equal(lttb_indices(np.arange(5), np.arange(5), 10), np.arange(5))
+
+
+def _series(n=5000):
+    rng = np.random.default_rng(0)
+    times = pd.date_range('2024-01-01', periods=n, freq='15min', tz='Africa/Lagos')
+    return pd.DataFrame({
+        'timestamp': np.concatenate([times, times]),
+        'origin': ['Ikeja'] * n + ['Ajah'] * n,
+        'destination': 'Victoria Island',
+        'traffic_ratio': np.concatenate([1 + np.cumsum(rng.normal(0, 0.01, n)), np.full(n, 1.1)])
+    })
+
+
+def test_view_spends_the_budget_across_routes():
+    df = _series()
+    sampler = SeriesDownsampler(df, points=400)
+    view = sampler.view()
+    assert view.groupby('route').size().to_dict() == {'Ajah → Victoria Island': 200, 'Ikeja → Victoria Island': 200}
+
+    ikeja = df[df['origin'] == 'Ikeja']
+    kept = view[view['route'] == 'Ikeja → Victoria Island']
+    assert kept['timestamp'].iloc[0] == ikeja['timestamp'].iloc[0]
+    assert kept['timestamp'].iloc[-1] == ikeja['timestamp'].iloc[-1]
+    assert kept['timestamp'].is_monotonic_increasing
+
+
+def test_routes_sharing_an_origin_stay_separate():
+    df = _series(1000)
+    df.loc[df['origin'] == 'Ajah', ['origin', 'destination']] = ['Ikeja', 'Ikoyi']
+    view = SeriesDownsampler(df, points=400).view()
+    assert view.groupby('route').size().to_dict() == {'Ikeja → Ikoyi': 200, 'Ikeja → Victoria Island': 200}
+    assert (view.loc[view['route'] == 'Ikeja → Ikoyi', 'traffic_ratio'] == 1.1).all()
+
+    # A single column still names the series itself
+    by_origin = SeriesDownsampler(df, by='origin', points=400).view()
+    assert list(by_origin.columns) == ['origin', 'timestamp', 'traffic_ratio']
+    assert by_origin['origin'].unique().tolist() == ['Ikeja']
+
+
+def test_zoomed_view_returns_raw_rows():
+    df = _series()
+    sampler = SeriesDownsampler(df, points=400)
+    start = df['timestamp'].iloc[100]
+    end = df['timestamp'].iloc[150]
+    zoomed = sampler.view(start, end)
+    ikeja = zoomed[zoomed['route'] == 'Ikeja → Victoria Island']
+    # 51 rows in range plus one either side
+    assert len(ikeja) == 53
+    expected = df[df['origin'] == 'Ikeja'].iloc[99:152]
+    np.testing.assert_array_equal(ikeja['traffic_ratio'].to_numpy(), expected['traffic_ratio'].to_numpy())
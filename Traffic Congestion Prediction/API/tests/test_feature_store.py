@@ -0,0 +1,65 @@
+import math
+import pandas as pd
+from feature_store import OnlineFeatureStore, RollingWindow
+
+ROUTE = ('Lagos', 'Ikeja', 'Victoria Island')
+
+
+def _expected(df, metric, at, window):
+    mask = (df['timestamp'] >= at - pd.Timedelta(window)) & (df['timestamp'] < at)
+    return df.loc[mask, metric].agg(['mean', 'std', 'min', 'max']).to_dict()
+
+
+def _assert_close(actual, expected):
+    for stat, value in expected.items():
+        if value != value:
+            assert math.isnan(actual[stat]), stat
+        else:
+            assert math.isclose(actual[stat], value, rel_tol=1e-9, abs_tol=1e-9), stat
+
+
+def test_windows_are_bounded_by_update(traffic_frame):
+    df = traffic_frame(400, routes=[ROUTE])
+    store = OnlineFeatureStore().warm(df)
+    step = pd.Timedelta('13min')
+    for (metric, name), window in store._rolling[ROUTE].items():
+        # At a 13-minute minimum spacing a window holds at most window / 13min + 1 rows
+        assert len(window) <= pd.Timedelta(name) // step + 1, (metric, name)
+
+
+def test_rolling_features_match_pandas(traffic_frame):
+    df = traffic_frame(400, routes=[ROUTE])
+    store = OnlineFeatureStore()
+    for i, row in enumerate(df.to_dict('records')):
+        store.update(row)
+        if i % 37 == 0:
+            at = row['timestamp'] + pd.Timedelta('1min')
+            features = store.features(ROUTE, at)
+            for metric in store.metrics:
+                for window in ['1h', '3h', '24h']:
+                    actual = {stat: features[f"{metric}_roll_{window}_{stat}"] for stat in store.stats}
+                    _assert_close(actual, _expected(df.iloc[:i + 1], metric, at, window))
+
+
+def test_future_queries_do_not_change_the_store(traffic_frame):
+    df = traffic_frame(400, routes=[ROUTE])
+    store = OnlineFeatureStore().warm(df)
+    latest = df['timestamp'].iloc[-1]
+    near = latest + pd.Timedelta('1min')
+    before = store.features(ROUTE, near)
+    store.features(ROUTE, latest + pd.Timedelta('20h'))
+    after = store.features(ROUTE, near)
+    assert after.keys() == before.keys()
+    assert all(a == b or (a != a and b != b) for a, b in zip(before.values(), after.values()))
+    # Past times fall back to the ring buffer and still match
+    past = df['timestamp'].iloc[200]
+    _assert_close({stat: store.features(ROUTE, past)[f"traffic_ratio_roll_3h_{stat}"] for stat in store.stats},
+                  _expected(df, 'traffic_ratio', past, '3h'))
+
+
+def test_rolling_window_stats_at():
+    window = RollingWindow(10)
+    for t, value in enumerate([5.0, 1.0, 4.0, 2.0, 3.0]):
+        window.push(t, value)
+    assert window.stats(12) == {'mean': 3.0, 'std': 1.0, 'min': 2.0, 'max': 4.0}
+    assert len(window) == 5
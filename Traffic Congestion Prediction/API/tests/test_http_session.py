@@ -0,0 +1,30 @@
+import pytest
+import http_session
+from http_session import build_session, get_shared_session
+
+
+@pytest.fixture
+def fresh(monkeypatch):
+    """Forget the process-wide session for the duration of a test"""
+    monkeypatch.setattr(http_session, '_shared_session', None)
+
+
+@pytest.mark.parametrize('gzip, encoding', [(True, 'gzip, deflate'), (False, 'identity')])
+def test_build_session(gzip, encoding):
+    session = build_session(pool_size=12, gzip=gzip)
+    http = session.get_adapter('http://api.openweathermap.org')
+    https = session.get_adapter('https://maps.googleapis.com')
+    # One adapter serves both schemes
+    assert http is https
+    assert http._pool_maxsize == 12 and http._pool_connections == 12
+    assert http.poolmanager.connection_pool_kw['maxsize'] == 12
+    assert session.headers['Accept-Encoding'] == encoding
+
+
+def test_shared_session_is_created_once(fresh):
+    first = get_shared_session(pool_size=3, gzip=False)
+    # Later settings are ignored: every caller gets the first session and its pools
+    second = get_shared_session(pool_size=50, gzip=True)
+    assert second is first
+    assert first.get_adapter('https://maps.googleapis.com')._pool_maxsize == 3
+    assert first.headers['Accept-Encoding'] == 'identity'
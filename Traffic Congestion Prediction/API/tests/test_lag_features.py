@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+from lag_features import LAG_METRICS, build_lag_features, lag_indices
+
+LAGS = ['15min', '1h', '24h']
+WINDOWS = ['1h', '3h']
+TOLERANCE = pd.Timedelta('7min30s')
+ROUTES = [('Lagos', 'Ikeja', 'Victoria Island'), ('Lagos', 'Ajah', 'Victoria Island')]
+
+
+def _naive(df):
+    """Per-route loop: nearest observation to t - lag (earlier on ties), stats over [t - window, t)"""
+    rows = {}
+    for _, group in df.groupby(['city', 'origin', 'destination']):
+        times = group['timestamp']
+        for i, t in times.items():
+            row = rows[i] = {}
+            for lag in LAGS:
+                distance = (times - (t - pd.Timedelta(lag))).abs()
+                candidates = distance[distance <= TOLERANCE]
+                best = candidates.index[np.argmin(candidates.to_numpy())] if len(candidates) else None
+                for metric in LAG_METRICS:
+                    row[f"{metric}_lag_{lag}"] = np.nan if best is None else group.loc[best, metric]
+            for window in WINDOWS:
+                inside = group[(times >= t - pd.Timedelta(window)) & (times < t)]
+                for metric in LAG_METRICS:
+                    for stat, value in inside[metric].agg(['mean', 'std', 'min', 'max']).items():
+                        row[f"{metric}_roll_{window}_{stat}"] = value
+    return pd.DataFrame.from_dict(rows, orient='index').reindex(df.index).astype(float)
+
+
+def _lagged(df):
+    return build_lag_features(df, lags=LAGS, windows=WINDOWS)
+
+
+def test_matches_naive_per_route_reference(traffic_frame):
+    # Over a day of two routes, shuffled so the input is sorted neither by route nor by time
+    df = traffic_frame(100, routes=ROUTES).sample(frac=1, random_state=0)
+    lagged = _lagged(df)
+    expected = _naive(df)
+
+    assert lagged.index.equals(df.index)
+    pd.testing.assert_frame_equal(lagged[expected.columns], expected, check_exact=False, rtol=1e-9)
+    # Missed cycles leave 15-minute lags with no scrape within tolerance
+    assert lagged['traffic_ratio_lag_15min'].isna().sum() > df['traffic_ratio'].isna().sum()
+
+
+def test_tolerance_misses_are_nan():
+    times = pd.to_datetime(['2024-01-01 08:00', '2024-01-01 08:15', '2024-01-01 08:38', '2024-01-01 08:52'])
+    df = pd.DataFrame({
+        'city': 'Lagos', 'origin': 'Ikeja', 'destination': 'Victoria Island',
+        'timestamp': times.tz_localize('Africa/Lagos'),
+        'traffic_ratio': [1.0, 2.0, 3.0, 4.0], 'duration_in_traffic_mins': [10.0, 20.0, 30.0, 40.0]
+    })
+    lagged = build_lag_features(df, lags=['15min'], windows=[])
+    # 08:38 - 15min = 08:23 is 8 minutes from 08:15, outside 7m30s; 08:52 - 15min = 08:37 matches 08:38
+    np.testing.assert_array_equal(lagged['traffic_ratio_lag_15min'], [np.nan, 1.0, np.nan, 3.0])
+
+
+def test_routes_do_not_see_each_other(traffic_frame):
+    df = traffic_frame(60)
+    ikeja = (df['origin'] == 'Ikeja') & (df['destination'] == 'Victoria Island')
+    alone = _lagged(df[ikeja])
+    # Other routes scraped at the same instants must not leak into this route's features
+    pd.testing.assert_frame_equal(_lagged(df)[ikeja], alone)
+
+
+def test_nat_timestamps_get_no_features(traffic_frame):
+    df = traffic_frame(60)
+    broken = df.copy()
+    broken.loc[broken.index[::7], 'timestamp'] = pd.NaT
+    lagged = _lagged(broken)
+
+    features = [c for c in lagged.columns if c not in df.columns]
+    assert lagged.loc[broken.index[::7], features].isna().all().all()
+    kept = broken['timestamp'].notna()
+    pd.testing.assert_frame_equal(lagged[kept], _lagged(broken[kept]))
+
+
+@pytest.mark.parametrize('lag', [0, 15, -15])
+def test_lag_indices_skip_nat(lag):
+    nat = np.iinfo(np.int64).min
+    routes = np.array([0, 0, 0, 0, 1, 1])
+    minute = 60_000_000
+    times = np.array([nat, 0, 15 * minute, 30 * minute, 0, 15 * minute])
+    expected = {0: [-1, 1, 2, 3, 4, 5], 15: [-1, -1, 1, 2, -1, 4], -15: [-1, 2, 3, -1, 5, -1]}[lag]
+    np.testing.assert_array_equal(lag_indices(routes, times, lag * minute, 7 * minute + minute // 2), expected)
@@ -0,0 +1,69 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import pytest
+import loader
+from loader import load_traffic_csv, parse_distance_column, parse_timestamps
+
+ROUTES = [('Lagos', 'Ikeja', 'Victoria Island'), ('Lagos', 'Ajah', 'Victoria Island')]
+
+
+def _expected(values):
+    return pd.Series([pd.Timestamp(datetime.fromisoformat(v)).tz_convert('Africa/Lagos') for v in values])
+
+
+@pytest.fixture
+def formats(monkeypatch):
+    """The format argument of every pd.to_datetime call made by the loader"""
+    calls = []
+    to_datetime = pd.to_datetime
+
+    def spy(*args, **kwargs):
+        calls.append(kwargs.get('format'))
+        return to_datetime(*args, **kwargs)
+
+    monkeypatch.setattr(loader.pd, 'to_datetime', spy)
+    return calls
+
+
+@pytest.mark.parametrize('values, fast', [
+    # Scraper output: microseconds and one offset
+    (['2024-01-01T08:00:00.123456+01:00', '2024-01-01T23:59:59.999999+01:00',
+      '2024-01-02T00:15:00.000001+01:00'], True),
+    # datetime.isoformat() drops zero microseconds
+    (['2024-01-01T08:00:00.123456+01:00', '2024-01-01T08:15:00+01:00'], False),
+    (['2024-01-01T08:00:00+01:00', '2024-01-01T08:15:00+01:00'], False),
+    # Same width, different offsets
+    (['2024-01-01T08:00:00.500000+01:00', '2024-01-01T07:15:00.500000+00:00'], False)
+])
+def test_parse_timestamps(values, fast, formats):
+    parsed = parse_timestamps(values)
+    assert str(parsed.dt.tz) == 'Africa/Lagos'
+    pd.testing.assert_series_equal(parsed, _expected(values), check_dtype=False)
+    assert (loader.NAIVE_FORMAT in formats) == fast
+    assert ('ISO8601' in formats) != fast
+
+
+def test_parse_distance_column():
+    mixed = parse_distance_column(['850 m', '1,204 km', np.nan, '28.8 km', '1,050 m'])
+    np.testing.assert_allclose(mixed, [0.85, 1204.0, np.nan, 28.8, 1.05])
+
+    # All kilometres: the fast path, thousands separators included
+    km = parse_distance_column(['1,204 km', '28.8 km', np.nan])
+    np.testing.assert_allclose(km, [1204.0, 28.8, np.nan])
+    assert mixed.dtype == km.dtype == np.float64
+
+
+@pytest.mark.parametrize('columns', [None, ['timestamp', 'origin', 'distance_km', 'traffic_ratio', 'time_period']])
+def test_engines_return_identical_frames(traffic_frame, city_csv, tmp_path, columns):
+    pytest.importorskip('pyarrow')
+    df = traffic_frame(200, routes=ROUTES).assign(has_tolls=False)
+    path = city_csv(df, tmp_path)['Lagos']
+
+    arrow = load_traffic_csv(path, columns=columns, engine='pyarrow')
+    pandas = load_traffic_csv(path, columns=columns, engine='c')
+    pd.testing.assert_frame_equal(arrow, pandas)
+
+    assert arrow['time_period'].cat.ordered and list(arrow['time_period'].cat.categories)[0] == 'Morning'
+    np.testing.assert_allclose(arrow['distance_km'], df['distance_km'])
+    assert (arrow['timestamp'] == df['timestamp']).all()
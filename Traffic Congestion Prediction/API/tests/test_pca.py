@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pca import PCA_COLUMNS, StreamingPCA
+
+sklearn = pytest.importorskip('sklearn')
+from sklearn.decomposition import PCA  # noqa: E402
+from sklearn.preprocessing import StandardScaler  # noqa: E402
+
+
+def _batch(df, variance=0.95):
+    """TrafficLAG's in-memory path: fillna(mean) -> StandardScaler -> PCA() -> refit"""
+    filled = df.fillna(df.mean())
+    scaler = StandardScaler().fit(filled)
+    scaled = scaler.transform(filled)
+    ratio = PCA().fit(scaled).explained_variance_ratio_
+    n_components = int(np.argmax(np.cumsum(ratio) >= variance)) + 1
+    return scaler, ratio, PCA(n_components=n_components).fit(scaled), scaled
+
+
+@pytest.mark.parametrize('chunksize', [4000, 700])
+def test_matches_scaler_and_pca(traffic_frame, chunksize):
+    df = traffic_frame(1000)[PCA_COLUMNS]
+    chunks = (df.iloc[i:i + chunksize] for i in range(0, len(df), chunksize))
+    streaming = StreamingPCA().fit_chunks(chunks)
+    scaler, ratio, pca, scaled = _batch(df)
+
+    assert streaming.n_samples_seen_ == len(df)
+    np.testing.assert_allclose(streaming.mean_, scaler.mean_, rtol=1e-10)
+    np.testing.assert_allclose(streaming.scale_, scaler.scale_, rtol=1e-8)
+    np.testing.assert_allclose(streaming.explained_variance_ratio_, ratio, atol=1e-10)
+    assert streaming.n_components_ == pca.n_components_
+    np.testing.assert_allclose(streaming.components_, pca.components_, atol=1e-8)
+    np.testing.assert_allclose(streaming.transform(df), pca.transform(scaled), atol=1e-6)
+
+
+def test_partial_fit_and_feature_importance(traffic_frame):
+    df = traffic_frame(1000)[PCA_COLUMNS]
+    streaming = StreamingPCA()
+    for chunk in np.array_split(np.arange(len(df)), 3):
+        streaming.partial_fit(df.iloc[chunk])
+    _, _, pca, _ = _batch(df)
+    importance = pd.Series(np.abs(pca.components_).mean(axis=0), index=PCA_COLUMNS).sort_values(ascending=False)
+    pd.testing.assert_series_equal(streaming.feature_importance(), importance, atol=1e-8)
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import pytest
+from recommend import RouteRecommender, hour_of_week
+
+ROUTE = ('Lagos', 'Ikeja', 'Victoria Island')
+# path_id: (free-flow seconds, congestion relative to the route, share of scrapes offering it)
+PATHS = {'third-mainland': (1500, 1.3, 1.0), 'ikorodu-road': (1800, 1.0, 0.8)}
+
+
+def _alternatives(df, paths=PATHS, seed=0):
+    """Expand scraped rows into the scraper's route_alternatives rows, one per offered path"""
+    rng = np.random.default_rng(seed)
+    df = df.dropna(subset='traffic_ratio')
+    rows = []
+    for path_id, (free_flow, scale, share) in paths.items():
+        offered = df[rng.random(len(df)) < share]
+        seconds = free_flow + rng.integers(-60, 61, len(offered))
+        rows.append(pd.DataFrame({
+            'city': offered['city'], 'origin': offered['origin'], 'destination': offered['destination'],
+            'timestamp': offered['timestamp'], 'path_id': path_id, 'summary': path_id.replace('-', ' ').title(),
+            'distance_meters': offered['distance_meters'], 'duration_seconds': seconds,
+            'duration_in_traffic_seconds': np.round(seconds * offered['traffic_ratio'] * scale),
+            'has_tolls': False
+        }))
+    # Only the first scrape offered this path
+    sparse = df.iloc[[0]]
+    rows.append(sparse[['city', 'origin', 'destination', 'timestamp', 'distance_meters']].assign(
+        path_id='lekki-link', summary='Lekki Link', duration_seconds=2100,
+        duration_in_traffic_seconds=np.round(2100 * sparse['traffic_ratio'] * 0.9), has_tolls=True))
+    return pd.concat(rows, ignore_index=True)
+
+
+def _profile(alternatives, shrinkage):
+    """Predicted minutes per (path, hour of week) from plain groupbys"""
+    df = alternatives.assign(ratio=alternatives['duration_in_traffic_seconds'] / alternatives['duration_seconds'],
+                             slot=hour_of_week(alternatives['timestamp']))
+    route_slot = df.groupby('slot')['ratio'].mean().reindex(range(168)).fillna(df['ratio'].mean())
+    expected = {}
+    for path_id, path in df.groupby('path_id'):
+        prior = route_slot * path['ratio'].mean() / df['ratio'].mean()
+        own = path.groupby('slot')['ratio'].agg(['sum', 'count']).reindex(range(168), fill_value=0)
+        ratio = (own['sum'] + shrinkage * prior) / (own['count'] + shrinkage)
+        expected[path_id] = path['duration_seconds'].median() * ratio.to_numpy() / 60
+    return expected
+
+
+def _fitted_minutes(recommender, route=ROUTE):
+    i = recommender.route_index[route]
+    return {info['path_id']: recommender.minutes[i, j] for j, info in enumerate(recommender.paths[i]) if info}
+
+
+@pytest.fixture
+def alternatives(traffic_frame):
+    df = traffic_frame(700, routes=[ROUTE, ('Lagos', 'Ajah', 'Victoria Island')])
+    return _alternatives(df[df['origin'] == 'Ikeja']), _alternatives(df[df['origin'] == 'Ajah'])
+
+
+def test_profile_is_the_paths_hour_of_week_mean(alternatives):
+    ikeja, _ = alternatives
+    unshrunk = ikeja[ikeja['path_id'] != 'lekki-link']
+    recommender = RouteRecommender(shrinkage=0).fit(unshrunk)
+    expected = _profile(unshrunk, shrinkage=0)
+    fitted = _fitted_minutes(recommender)
+    assert fitted.keys() == expected.keys()
+    for path_id, minutes in fitted.items():
+        np.testing.assert_allclose(minutes, expected[path_id], rtol=1e-12)
+
+
+def test_sparse_paths_fall_back_on_the_route_profile(alternatives):
+    ikeja, _ = alternatives
+    recommender = RouteRecommender(shrinkage=4).fit(ikeja)
+    expected = _profile(ikeja, shrinkage=4)
+    fitted = _fitted_minutes(recommender)
+    for path_id, minutes in fitted.items():
+        np.testing.assert_allclose(minutes, expected[path_id], rtol=1e-12)
+
+    # Seen once: every other hour of week is the route's ratio for that hour, scaled by
+    # how congested the path is relative to the route
+    ratio = ikeja['duration_in_traffic_seconds'] / ikeja['duration_seconds']
+    slots = hour_of_week(ikeja['timestamp'])
+    lekki = (ikeja['path_id'] == 'lekki-link').to_numpy()
+    seen = slots[lekki][0]
+    assert recommender.paths[0, 2]['observations'] == 1
+    scale = ratio[lekki].mean() / ratio.mean()
+    for slot in np.unique(slots):
+        prior = ratio[slots == slot].mean() * scale
+        own = ratio[lekki].iloc[0] if slot == seen else None
+        expected = prior if own is None else (own + 4 * prior) / 5
+        assert fitted['lekki-link'][slot] == pytest.approx(2100 / 60 * expected, rel=1e-12)
+
+
+def test_recommendations_are_ordered_fastest_first(alternatives):
+    ikeja, ajah = alternatives
+    recommender = RouteRecommender().fit(pd.concat([ikeja, ajah], ignore_index=True))
+    departure = pd.Timestamp('2024-01-08 08:00')
+    ranked = recommender.recommend(*ROUTE, departure=departure)
+
+    minutes = [path['predicted_minutes'] for path in ranked]
+    assert minutes == sorted(minutes) and [path['rank'] for path in ranked] == [1, 2, 3]
+    assert [path['minutes_vs_best'] for path in ranked] == pytest.approx([m - minutes[0] for m in minutes])
+    fitted = _fitted_minutes(recommender)
+    slot = hour_of_week(pd.DatetimeIndex([departure]).tz_localize('Africa/Lagos'))[0]
+    assert {path['path_id']: path['predicted_minutes'] for path in ranked} == \
+        pytest.approx({path_id: m[slot] for path_id, m in fitted.items()})
+    assert recommender.recommend(*ROUTE, departure=departure, top=1) == ranked[:1]
+
+
+def test_stale_paths_and_unknown_routes(alternatives):
+    ikeja, _ = alternatives
+    recommender = RouteRecommender(max_age='1D').fit(ikeja)
+    # Offered only on the first scrape, more than a day before the latest
+    assert {p['path_id'] for p in recommender.recommend(*ROUTE)} == {'third-mainland', 'ikorodu-road'}
+    with pytest.raises(KeyError, match='No alternatives recorded'):
+        recommender.recommend('Lagos', 'Nowhere', 'Victoria Island')
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from report import figure_specs, render_figure, render_report, report_title
+
+ROUTES = [('Lagos', 'Ikeja', 'Victoria Island'), ('Lagos', 'Ikeja', 'Lekki'), ('Abuja', 'Wuse', 'Garki')]
+
+
+def test_title_names_the_cities_in_the_data(traffic_frame):
+    df = traffic_frame(20, routes=ROUTES)
+    assert report_title(df) == 'Abuja, Lagos Traffic EDA'
+    assert report_title(df.drop(columns='city')) == 'Traffic EDA'
+
+
+def test_time_series_has_one_line_per_route(traffic_frame):
+    df = traffic_frame(80, routes=ROUTES)
+    line = next(spec for spec in figure_specs(df) if spec['name'] == 'traffic_ratio_over_time')
+    assert sorted(line['series']) == ['Ikeja → Lekki', 'Ikeja → Victoria Island', 'Wuse → Garki']
+    for route, (x, y) in line['series'].items():
+        origin, destination = route.split(' → ')
+        expected = df[(df['origin'] == origin) & (df['destination'] == destination)].dropna(subset='traffic_ratio')
+        np.testing.assert_array_equal(y, expected['traffic_ratio'].to_numpy())
+
+
+def test_render_report_writes_every_figure(traffic_frame, tmp_path):
+    pytest.importorskip('matplotlib')
+    df = traffic_frame(100, routes=ROUTES)
+    index, timings = render_report(df, tmp_path, workers=1, source='lagos.csv')
+
+    specs = figure_specs(df)
+    assert len({spec['name'] for spec in specs}) == len(specs)
+    page = (tmp_path / 'index.html').read_text()
+    assert index == str(tmp_path / 'index.html')
+    assert '<h1>Abuja, Lagos Traffic EDA</h1>' in page and '300 rows from lagos.csv' in page
+    for spec in specs:
+        png = tmp_path / f"{spec['name']}.png"
+        assert png.read_bytes()[:8] == b'\x89PNG\r\n\x1a\n'
+        assert f'src="{png.name}"' in page
+    assert sorted(p.name for p in tmp_path.glob('*.png')) == sorted(f"{spec['name']}.png" for spec in specs)
+    assert set(timings) == {'aggregate_s', 'render_s'}
+
+
+def test_unknown_figure_kind(tmp_path):
+    pytest.importorskip('matplotlib')
+    with pytest.raises(ValueError, match='Unknown figure kind: pie'):
+        render_figure({'name': 'share', 'kind': 'pie', 'title': 'Share'}, tmp_path)
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+from resample import resample_routes
+from schema import TIMEZONE
+
+IKEJA = ('Lagos', 'Ikeja', 'Victoria Island')
+AJAH = ('Lagos', 'Ajah', 'Victoria Island')
+
+
+def _rows(route, times, values):
+    city, origin, destination = route
+    return pd.DataFrame({
+        'city': city, 'origin': origin, 'destination': destination,
+        'timestamp': pd.DatetimeIndex(times).tz_localize(TIMEZONE), 'traffic_ratio': values
+    })
+
+
+def test_gap_slots_are_created():
+    df = pd.concat([
+        # 08:06 and 08:01 both snap to 08:00; the closer one wins
+        _rows(IKEJA, ['2025-01-20 08:06', '2025-01-20 08:01', '2025-01-20 08:14', '2025-01-20 09:02'],
+              [9.0, 1.0, 2.0, 5.0]),
+        _rows(AJAH, ['2025-01-20 08:00', '2025-01-20 08:30'], [3.0, 4.0])
+    ])
+    grid = resample_routes(df, ['traffic_ratio'], fill='none')
+
+    assert grid.routes == [AJAH, IKEJA]
+    assert list(grid.times.strftime('%H:%M')) == ['08:00', '08:15', '08:30', '08:45', '09:00', '09:15']
+    np.testing.assert_array_equal(grid.values[1, :, 0], [1.0, 2.0, np.nan, np.nan, 5.0, np.nan])
+    np.testing.assert_array_equal(grid.values[0, :, 0], [3.0, np.nan, 4.0, np.nan, np.nan, np.nan])
+    np.testing.assert_array_equal(grid.mask[:, :, 0], np.isnan(grid.values[:, :, 0]))
+
+
+@pytest.mark.parametrize('fill, expected', [
+    ('none', np.nan),
+    ('ffill', 7 * 96 + 31.0),
+    ('linear', 7 * 96 + 32.0),
+    # The only other Monday 08:00 observation is a week earlier
+    ('seasonal', 32.0)
+])
+def test_mask_marks_filled_cells(fill, expected):
+    # Two weeks of 15-minute slots from Monday 2025-01-20; the second Monday 08:00 is missing
+    times = pd.date_range('2025-01-20', periods=2 * 7 * 96, freq='15min')
+    gap = 7 * 96 + 32
+    df = _rows(IKEJA, times.delete(gap), np.delete(np.arange(len(times), dtype=float), gap))
+    grid = resample_routes(df, ['traffic_ratio'], fill=fill)
+
+    assert grid.times[gap] == pd.Timestamp('2025-01-27 08:00', tz=TIMEZONE)
+    assert np.flatnonzero(grid.mask).tolist() == [gap]
+    np.testing.assert_array_equal(grid.values[0, gap], [expected])
+    observed = np.delete(grid.values[0, :, 0], gap)
+    np.testing.assert_array_equal(observed, np.delete(np.arange(len(times), dtype=float), gap))
+
+
+def test_naive_bounds_are_local_time():
+    df = _rows(IKEJA, pd.date_range('2025-01-20 06:00', periods=12, freq='15min'), np.arange(12.0))
+    naive = resample_routes(df, ['traffic_ratio'], start='2025-01-20', end='2025-01-20 09:00')
+    aware = resample_routes(df, ['traffic_ratio'], start=pd.Timestamp('2025-01-19 23:00', tz='UTC'),
+                            end=pd.Timestamp('2025-01-20 09:00', tz=TIMEZONE))
+
+    assert naive.times[0] == pd.Timestamp('2025-01-20 00:00', tz=TIMEZONE)
+    assert naive.times[-1] == pd.Timestamp('2025-01-20 09:00', tz=TIMEZONE)
+    pd.testing.assert_index_equal(naive.times, aware.times)
+    np.testing.assert_array_equal(naive.values, aware.values)
+    # Slots before the first observation are leading gaps
+    assert naive.mask[0, :24].all() and not naive.mask[0, 24:36].any()
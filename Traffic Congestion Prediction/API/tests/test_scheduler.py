@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+import pytest
+import pytz
+from scheduler import WallClockScheduler
+
+LAGOS = pytz.timezone('Africa/Lagos')
+
+
+def _at(*args):
+    return LAGOS.localize(datetime(*args))
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += timedelta(seconds=seconds)
+
+
+def _scheduler(clock, **kwargs):
+    return WallClockScheduler(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+@pytest.mark.parametrize('minutes, after, expected', [
+    (15, _at(2025, 1, 20, 8, 7), _at(2025, 1, 20, 8, 15)),
+    # Strictly after: a tick on the boundary moves to the next one
+    (15, _at(2025, 1, 20, 8, 15), _at(2025, 1, 20, 8, 30)),
+    (15, _at(2025, 1, 20, 23, 50), _at(2025, 1, 21)),
+    # 7 minutes does not divide a day; the last tick before midnight is 23:55
+    (7, _at(2025, 1, 20, 23, 55), _at(2025, 1, 21)),
+    (7, _at(2025, 1, 21), _at(2025, 1, 21, 0, 7))
+])
+def test_boundaries_count_from_local_midnight(minutes, after, expected):
+    scheduler = WallClockScheduler(interval_minutes=minutes)
+    assert scheduler.next_boundary(after) == expected
+    # Aware datetimes in another zone land on the same local boundaries
+    assert scheduler.next_boundary(after.astimezone(pytz.utc)) == expected
+
+
+@pytest.mark.parametrize('missed_ticks', ['skip', 'catch_up'])
+def test_advance_realigns_at_midnight(missed_ticks):
+    clock = FakeClock(_at(2025, 1, 20, 23, 55, 30))
+    scheduler = _scheduler(clock, interval_minutes=7, missed_ticks=missed_ticks)
+    assert scheduler.advance(_at(2025, 1, 20, 23, 55)) == _at(2025, 1, 21)
+    assert scheduler.advance(_at(2025, 1, 21)) == _at(2025, 1, 21, 0, 7)
+
+
+def test_skip_resumes_at_the_next_future_boundary():
+    clock = FakeClock(_at(2025, 1, 20, 8, 7))
+    scheduler = _scheduler(clock, missed_ticks='skip')
+    ticks = scheduler.ticks()
+    assert next(ticks) == _at(2025, 1, 20, 8, 15)
+    assert clock.sleeps == [8 * 60]
+
+    # The 08:15 cycle overruns 08:30, 08:45 and 09:00
+    clock.now = _at(2025, 1, 20, 9, 10)
+    assert next(ticks) == _at(2025, 1, 20, 9, 15)
+    assert scheduler.skipped_ticks == 3
+
+    # Within the grace period the tick still runs, late
+    clock.now = _at(2025, 1, 20, 9, 30, 40)
+    assert next(ticks) == _at(2025, 1, 20, 9, 30)
+    assert scheduler.skipped_ticks == 3
+    assert [lateness for _, lateness in scheduler.lateness] == [0.0, 0.0, 40.0]
+
+
+def test_skip_counts_ticks_across_midnight():
+    clock = FakeClock(_at(2025, 1, 21, 0, 10))
+    scheduler = _scheduler(clock, interval_minutes=7, missed_ticks='skip')
+    # Missed 23:48, 23:55 and 00:00, 00:07; resumes at 00:14
+    assert scheduler.advance(_at(2025, 1, 20, 23, 41)) == _at(2025, 1, 21, 0, 14)
+    assert scheduler.skipped_ticks == 4
+
+
+def test_catch_up_replays_missed_ticks_in_order():
+    clock = FakeClock(_at(2025, 1, 20, 8, 15))
+    scheduler = _scheduler(clock, missed_ticks='catch_up')
+    ticks = scheduler.ticks()
+    assert next(ticks) == _at(2025, 1, 20, 8, 30)
+
+    clock.now = _at(2025, 1, 20, 9, 10)
+    replayed = [next(ticks) for _ in range(3)]
+    assert replayed == [_at(2025, 1, 20, 8, 45), _at(2025, 1, 20, 9), _at(2025, 1, 20, 9, 15)]
+    # The first two ran immediately, the third waited for its boundary
+    assert clock.sleeps == [15 * 60, 5 * 60]
+    assert [lateness for _, lateness in scheduler.lateness] == [0.0, 25 * 60.0, 10 * 60.0, 0.0]
+    assert scheduler.skipped_ticks == 0
+    assert scheduler.lateness_summary() == {'ticks': 4, 'mean_s': 525.0, 'max_s': 1500.0, 'skipped': 0}
@@ -0,0 +1,442 @@
+import asyncio
+import importlib.util
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+import pandas as pd
+import pytest
+import pytz
+from requests import Response
+from requests.adapters import HTTPAdapter
+import http_session
+from scheduler import WallClockScheduler
+
+pytest.importorskip('googlemaps')
+
+LAGOS = pytz.timezone('Africa/Lagos')
+LOCATIONS = [
+    {'name': 'lagos_ikeja_vi', 'city': 'Lagos', 'origin': 'Ikeja', 'destination': 'Victoria Island'},
+    {'name': 'lagos_ajah_vi', 'city': 'Lagos', 'origin': 'Ajah', 'destination': 'Victoria Island'},
+    {'name': 'lagos_festac_vi', 'city': 'Lagos', 'origin': 'Festac', 'destination': 'Victoria Island'},
+    {'name': 'lagos_oshodi_apapa', 'city': 'Lagos', 'origin': 'Oshodi', 'destination': 'Apapa'},
+    {'name': 'abuja_wuse_cbd', 'city': 'FCT', 'origin': 'Wuse', 'destination': 'Central Business District'},
+    {'name': 'abuja_kubwa_cbd', 'city': 'FCT', 'origin': 'Kubwa', 'destination': 'Central Business District'}
+]
+
+
+@pytest.fixture(scope='module')
+def scraper_class():
+    # The script's file name is not an importable module name
+    path = Path(__file__).resolve().parents[1] / 'nigeria-traffic-weather-scraper-enhanced.py'
+    spec = importlib.util.spec_from_file_location('traffic_scraper', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.NigeriaTrafficScraper
+
+
+class InFlight:
+    """Counts concurrent calls and remembers the peak"""
+
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc):
+        with self._lock:
+            self.current -= 1
+
+
+def _place(name):
+    return name.split(',')[0]
+
+
+class FakeMaps:
+    """googlemaps.Client stand-in; durations are derived from the origin name"""
+
+    def __init__(self, delay=0.0, truncate=()):
+        self.delay = delay
+        self.truncate = set(truncate)
+        self.in_flight = InFlight()
+        self.directions_calls = []
+        self.matrix_calls = []
+        self._lock = threading.Lock()
+
+    def directions(self, origin, destination, **kwargs):
+        with self.in_flight:
+            with self._lock:
+                self.directions_calls.append((_place(origin), _place(destination)))
+            # Later routes answer first, so completion order differs from route order
+            time.sleep(self.delay / (1 + len(self.directions_calls)))
+            leg = {
+                'distance': {'text': '12.0 km', 'value': 12000},
+                'duration': {'value': 1800},
+                'duration_in_traffic': {'value': 1800 + 60 * len(_place(origin))},
+                'steps': [{'html_instructions': 'Head east', 'polyline': {'points': _place(origin)}}]
+            }
+            return [{'summary': 'Third Mainland Bridge', 'legs': [leg]}]
+
+    def distance_matrix(self, origins, destinations, **kwargs):
+        origins = [_place(origin) for origin in origins]
+        destination = _place(destinations[0])
+        self.matrix_calls.append((origins, destination))
+        rows = [{'elements': [{
+            'status': 'OK',
+            'distance': {'text': '9.5 km', 'value': 9500},
+            'duration': {'value': 1500},
+            'duration_in_traffic': {'value': 1500 + 60 * len(origin)}
+        }]} for origin in origins]
+        # Destinations in truncate lose their last row
+        return {'rows': rows[:-1] if destination in self.truncate else rows}
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class FakeWeatherSession:
+    """requests.Session stand-in answering OpenWeather calls"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.in_flight = InFlight()
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, timeout=None):
+        with self.in_flight:
+            with self._lock:
+                self.calls += 1
+            time.sleep(self.delay)
+            return FakeResponse({
+                'main': {'temp': 28.0 + self.calls, 'feels_like': 31.0, 'humidity': 80, 'pressure': 1010},
+                'weather': [{'main': 'Clouds', 'description': 'broken clouds'}],
+                'wind': {'speed': 3.1, 'deg': 200}, 'clouds': {'all': 75}, 'visibility': 10000
+            })
+
+
+@pytest.fixture
+def make_scraper(scraper_class, tmp_path, monkeypatch):
+    """Scraper writing CSVs under tmp_path, with stubbed Google Maps and weather calls"""
+    monkeypatch.chdir(tmp_path)
+
+    def make(maps=None, session=None, locations=LOCATIONS, **kwargs):
+        kwargs = {'record_alternatives': False, 'track_outliers': False, **kwargs}
+        scraper = scraper_class('AIza-test-key', 'weather-key', locations, data_dir=tmp_path, **kwargs)
+        scraper.gmaps = maps or FakeMaps()
+        scraper.session = session or FakeWeatherSession()
+        return scraper
+
+    return make
+
+
+def test_async_cycle_respects_concurrency_limits(make_scraper):
+    maps, session = FakeMaps(delay=0.05), FakeWeatherSession(delay=0.02)
+    scraper = make_scraper(maps, session, max_google_concurrency=2, max_weather_concurrency=1,
+                           weather_cache_ttl=0)
+    asyncio.run(scraper.collect_cycle_async())
+    scraper.close()
+
+    assert maps.in_flight.peak == 2
+    assert session.in_flight.peak == 1
+    assert len(maps.directions_calls) == session.calls == len(LOCATIONS)
+
+
+def test_async_cycle_saves_rows_in_route_order(make_scraper):
+    scraper = make_scraper(FakeMaps(delay=0.05), max_google_concurrency=len(LOCATIONS))
+    asyncio.run(scraper.collect_cycle_async())
+    scraper.close()
+
+    for city in ('Lagos', 'FCT'):
+        saved = pd.read_csv(scraper.writer.path_for(city))
+        expected = [(loc['origin'], loc['destination']) for loc in LOCATIONS if loc['city'] == city]
+        assert list(zip(saved['origin'], saved['destination'])) == expected
+
+
+def test_async_cycle_spreads_fetches_over_the_interval(make_scraper):
+    maps = FakeMaps()
+    scraper = make_scraper(maps, max_google_concurrency=len(LOCATIONS))
+    scraper.scheduler = WallClockScheduler(15, LAGOS, spread_seconds=300)
+    tick = LAGOS.localize(datetime(2025, 1, 20, 8, 15))
+    offsets = {loc['origin']: scraper.scheduler.offset_for(loc['name']) for loc in LOCATIONS}
+    waits = []
+
+    # Sleep 1/300 of each offset instead of the real one
+    async def sleep_until_async(when):
+        waits.append((when - tick).total_seconds())
+        await asyncio.sleep(waits[-1] / 300)
+
+    scraper.scheduler.sleep_until_async = sleep_until_async
+    asyncio.run(scraper.collect_cycle_async(tick))
+    scraper.close()
+
+    assert sorted(waits) == pytest.approx(sorted(offsets.values()))
+    assert all(0 <= offset < 300 for offset in waits) and len(set(waits)) == len(LOCATIONS)
+    # Routes reach Google in offset order, not all at the boundary
+    assert [origin for origin, _ in maps.directions_calls] == sorted(offsets, key=offsets.get)
+
+
+class FakeMonotonic:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def monotonic(monkeypatch):
+    clock = FakeMonotonic()
+    monkeypatch.setattr(time, 'monotonic', clock)
+    return clock
+
+
+def test_weather_cache_serves_hits_within_ttl(make_scraper, monotonic):
+    session = FakeWeatherSession()
+    scraper = make_scraper(session=session, weather_cache_ttl=600)
+
+    first = scraper.get_weather_data('Lagos')
+    monotonic.now += 599
+    assert scraper.get_weather_data('Lagos') is first
+    assert session.calls == 1
+    assert (scraper.weather_cache_hits, scraper.weather_cache_misses) == (1, 1)
+
+
+def test_weather_cache_refetches_after_expiry(make_scraper, monotonic):
+    session = FakeWeatherSession()
+    scraper = make_scraper(session=session, weather_cache_ttl=600)
+
+    first = scraper.get_weather_data('Lagos')
+    monotonic.now += 600
+    second = scraper.get_weather_data('Lagos')
+    assert session.calls == 2 and second['temperature_c'] != first['temperature_c']
+    # The refreshed payload is served from then on
+    assert scraper.get_weather_data('Lagos') is second
+    assert (scraper.weather_cache_hits, scraper.weather_cache_misses) == (1, 2)
+
+
+@pytest.mark.parametrize('ttl', [None, 0])
+def test_weather_cache_can_be_disabled(make_scraper, monotonic, ttl):
+    session = FakeWeatherSession()
+    scraper = make_scraper(session=session, weather_cache_ttl=ttl)
+
+    for _ in range(3):
+        scraper.get_weather_data('Lagos')
+    assert session.calls == 3
+    assert scraper.weather_cache == {}
+    assert (scraper.weather_cache_hits, scraper.weather_cache_misses) == (0, 0)
+
+
+def test_weather_cache_counters_under_concurrency(make_scraper):
+    session = FakeWeatherSession(delay=0.01)
+    scraper = make_scraper(session=session, weather_cache_ttl=600)
+    cities = ['Lagos', 'FCT', 'Port Harcourt'] * 20
+
+    threads = [threading.Thread(target=scraper.get_weather_data, args=(city,)) for city in cities]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # One fetch per city; every other call waited on the city lock and hit the cache
+    assert session.calls == scraper.weather_cache_misses == 3
+    assert scraper.weather_cache_hits == len(cities) - 3
+
+
+def test_matrix_cycle_groups_routes_by_city_and_destination(make_scraper):
+    maps = FakeMaps()
+    scraper = make_scraper(maps, use_distance_matrix=True)
+    scraper.collect_cycle()
+    scraper.close()
+
+    assert sorted(maps.matrix_calls) == sorted([
+        (['Ikeja', 'Ajah', 'Festac'], 'Victoria Island'), (['Oshodi'], 'Apapa'),
+        (['Wuse', 'Kubwa'], 'Central Business District')
+    ])
+    saved = pd.read_csv(scraper.writer.path_for('Lagos'))
+    assert list(saved['origin']) == ['Ikeja', 'Ajah', 'Festac', 'Oshodi']
+    # Timings come from the matrix element, steps from the Directions result
+    assert (saved['distance_meters'] == 9500).all() and (saved['steps_count'] == 1).all()
+    assert list(saved['duration_in_traffic_mins']) == [(1500 + 60 * len(o)) // 60 for o in saved['origin']]
+
+
+def test_distance_matrix_batches_25_origins_per_call(make_scraper):
+    maps = FakeMaps()
+    scraper = make_scraper(maps)
+    origins = [f"Stop {i}" for i in range(60)]
+    elements = scraper.get_distance_matrix(origins, 'Victoria Island', 'Lagos', datetime.now(LAGOS))
+
+    assert [len(batch) for batch, _ in maps.matrix_calls] == [25, 25, 10]
+    assert [o for batch, _ in maps.matrix_calls for o in batch] == origins
+    assert [e['duration_in_traffic']['value'] for e in elements] == [1500 + 60 * len(o) for o in origins]
+
+
+def test_matrix_cycle_refreshes_directions_every_n_cycles(make_scraper):
+    maps = FakeMaps()
+    scraper = make_scraper(maps, use_distance_matrix=True, directions_every=3)
+    calls = []
+    for _ in range(7):
+        scraper.collect_cycle()
+        calls.append(len(maps.directions_calls))
+    scraper.close()
+
+    # Directions on cycles 0, 3 and 6; the cached results are reused in between
+    n = len(LOCATIONS)
+    assert calls == [n, n, n, 2 * n, 2 * n, 2 * n, 3 * n]
+    assert len(maps.matrix_calls) == 7 * 3
+
+
+def test_matrix_cycle_skips_groups_with_missing_rows(make_scraper):
+    maps = FakeMaps(truncate={'Victoria Island'})
+    scraper = make_scraper(maps, use_distance_matrix=True)
+    with pytest.raises(Exception, match='returned 2 rows for 3 origins'):
+        scraper.get_distance_matrix(['Ikeja', 'Ajah', 'Festac'], 'Victoria Island', 'Lagos', datetime.now(LAGOS))
+
+    scraper.collect_cycle()
+    scraper.close()
+    # The truncated group saves nothing rather than misattributing timings
+    assert list(pd.read_csv(scraper.writer.path_for('Lagos'))['origin']) == ['Oshodi']
+    assert list(pd.read_csv(scraper.writer.path_for('FCT'))['origin']) == ['Wuse', 'Kubwa']
+
+
+@pytest.mark.parametrize('history', [True, False])
+def test_outlier_filter_is_warmed_from_the_city_csv(make_scraper, traffic_frame, city_csv, tmp_path, caplog,
+                                                    history):
+    route = ('Lagos', 'Ikeja', 'Victoria Island')
+    if history:
+        city_csv(traffic_frame(100, routes=[route]).assign(has_tolls=False), tmp_path)
+    scraper = make_scraper(track_outliers=True)
+
+    bounds = scraper.outlier_filter.bounds(route, 'traffic_ratio')
+    assert (bounds is not None) == history
+
+    # The first row after a restart is already checked against the stored history
+    data = {'city': route[0], 'origin': route[1], 'destination': route[2], 'traffic_ratio': 10.0,
+            'duration_in_traffic_mins': 40}
+    with caplog.at_level('WARNING'):
+        scraper.save_data(data, 'Lagos')
+    scraper.close()
+    assert ("Outlier ['traffic_ratio']" in caplog.text) == history
+
+
+def _leg(minutes, steps, traffic_minutes=None):
+    leg = {
+        'distance': {'text': '14.2 km', 'value': 14200},
+        'duration': {'value': minutes * 60},
+        'steps': [{'html_instructions': text, 'polyline': {'points': points}} for text, points in steps]
+    }
+    if traffic_minutes is not None:
+        leg['duration_in_traffic'] = {'value': traffic_minutes * 60}
+    return leg
+
+
+class ReorderingMaps(FakeMaps):
+    """Answers Directions with two alternatives, in the order of self.routes"""
+
+    def __init__(self):
+        super().__init__()
+        self.routes = [
+            {'summary': 'Lekki-Epe Expy', 'legs': [_leg(30, [('Pass the <b>Toll</b> Gate', 'a1'),
+                                                                ('Keep left', 'a2')], traffic_minutes=48)]},
+            # No duration_in_traffic: the free-flow duration stands in
+            {'summary': 'Admiralty Way', 'legs': [_leg(35, [('Head west', 'b1'), ('Turn right', 'b2'),
+                                                               ('Turn left', 'b3')])]}
+        ]
+
+    def directions(self, origin, destination, **kwargs):
+        self.directions_calls.append((_place(origin), _place(destination)))
+        return list(self.routes)
+
+
+def test_alternatives_are_recorded_with_stable_path_ids(make_scraper):
+    from recommend import load_alternatives
+    from schema import ALTERNATIVE_COLUMNS
+
+    maps = ReorderingMaps()
+    location = {'city': 'Lagos', 'origin': 'Ajah', 'destination': 'Victoria Island'}
+    scraper = make_scraper(maps, locations=[location], record_alternatives=True)
+    scraper.collect_cycle()
+    maps.routes.reverse()
+    scraper.collect_cycle()
+    scraper.close()
+
+    path = scraper.alternatives_writer.path_for('Lagos')
+    assert path.name == 'route_alternatives_lagos.csv'
+    assert pd.read_csv(path, nrows=0).columns.tolist() == ALTERNATIVE_COLUMNS
+
+    rows = load_alternatives(str(path))
+    assert rows['alternative'].tolist() == [0, 1, 0, 1]
+    assert rows['summary'].tolist() == ['Lekki-Epe Expy', 'Admiralty Way', 'Admiralty Way', 'Lekki-Epe Expy']
+    assert (rows[['city', 'origin', 'destination']].to_numpy() == ['Lagos', 'Ajah', 'Victoria Island']).all()
+
+    # The same physical path keeps its id whatever position Google returns it in
+    by_summary = rows.groupby('summary')
+    assert (by_summary['path_id'].nunique() == 1).all()
+    assert rows['path_id'].nunique() == 2
+
+    paths = by_summary.first()
+    assert paths.loc['Lekki-Epe Expy', 'has_tolls'] and not paths.loc['Admiralty Way', 'has_tolls']
+    assert paths.loc['Lekki-Epe Expy', 'duration_in_traffic_seconds'] == 48 * 60
+    assert paths.loc['Admiralty Way', 'duration_in_traffic_seconds'] == paths.loc['Admiralty Way', 'duration_seconds']
+    assert paths['steps_count'].to_dict() == {'Admiralty Way': 3, 'Lekki-Epe Expy': 2}
+    assert paths['distance_meters'].tolist() == [14200, 14200]
+    step_hashes = pd.read_csv(path, dtype={'step_hashes': str})['step_hashes']
+    assert step_hashes[1] == step_hashes[2] and step_hashes[1].count(';') == 2
+
+    # The main row describes alternative 0. With no traffic timing for it the
+    # second cycle saves no row, but its alternatives are still recorded
+    saved = pd.read_csv(scraper.writer.path_for('Lagos'))
+    assert saved['num_alternative_routes'].tolist() == [1]
+    assert saved['has_tolls'].tolist() == [True]
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Transport adapter answering every request with a canned OpenWeather payload"""
+
+    def __init__(self):
+        super().__init__()
+        self.timeouts = []
+
+    def send(self, request, timeout=None, **kwargs):
+        self.timeouts.append(timeout)
+        response = Response()
+        response.status_code = 200
+        response._content = (b'{"main": {"temp": 29, "feels_like": 32, "humidity": 78, "pressure": 1011},'
+                             b' "weather": [{"main": "Rain", "description": "light rain"}], "wind": {"speed": 2}}')
+        response.request = request
+        return response
+
+
+def test_scrapers_share_one_session_with_timeouts(scraper_class, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(http_session, '_shared_session', None)
+    first = scraper_class('AIza-test-key', 'weather-key', LOCATIONS, data_dir=tmp_path, record_alternatives=False,
+                          track_outliers=False, connect_timeout=3, read_timeout=20, weather_cache_ttl=0)
+    second = scraper_class('AIza-test-key', 'weather-key', LOCATIONS, data_dir=tmp_path, record_alternatives=False,
+                           track_outliers=False, connect_timeout=3, read_timeout=20)
+
+    # One session, and so one set of keep-alive pools, for the process and both APIs
+    assert first.session is second.session is http_session.get_shared_session()
+    assert first.gmaps.session is first.session
+    assert first.gmaps.timeout == (3, 20)
+
+    adapter = RecordingAdapter()
+    first.session.mount('http://', adapter)
+    for _ in range(2):
+        assert first.get_weather_data('Lagos')['weather_condition'] == 'Rain'
+    assert adapter.timeouts == [(3, 20), (3, 20)]
+    first.close()
+    second.close()
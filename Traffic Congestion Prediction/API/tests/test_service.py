@@ -0,0 +1,99 @@
+import http.client
+import json
+import threading
+from concurrent.futures import Future
+import pandas as pd
+import pytest
+from feature_store import OnlineFeatureStore
+from service import PredictionHandler, PredictionServer, PredictionService
+
+ROUTE = ('Lagos', 'Ikeja', 'Victoria Island')
+SLOW = ('Lagos', 'Ajah', 'Victoria Island')
+
+
+class FakeRegistry:
+    routes = [ROUTE, SLOW]
+
+
+class FakeService:
+    registry = FakeRegistry()
+
+    def submit(self, route, at=None):
+        if route not in self.registry.routes:
+            raise KeyError(f"No model for route {route}")
+        future = Future()
+        # The slow route's batch never completes
+        if route != SLOW:
+            future.set_result({'origin': route[1], 'traffic_ratio': 1.2})
+        return future
+
+
+@pytest.fixture(scope='module')
+def server():
+    handler = type('Handler', (PredictionHandler,), {'service': FakeService(), 'timeout': 0.05})
+    server = PredictionServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address
+    server.shutdown()
+    server.server_close()
+
+
+def _request(address, method, path, body=None):
+    connection = http.client.HTTPConnection(*address, timeout=5)
+    payload = None if body is None else json.dumps(body).encode()
+    connection.request(method, path, body=payload, headers={'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    result = response.status, json.loads(response.read())
+    connection.close()
+    return result
+
+
+def test_predict(server):
+    status, body = _request(server, 'GET', '/predict?origin=Ikeja&destination=Victoria%20Island')
+    assert status == 200
+    assert body['traffic_ratio'] == 1.2
+
+
+def test_missing_parameter_is_a_bad_request(server):
+    status, body = _request(server, 'GET', '/predict?origin=Ikeja')
+    assert status == 400
+    assert 'destination' in body['error']
+
+
+@pytest.mark.parametrize('payload', [['x'], [], [{'origin': 'Ikeja', 'destination': 3}], 'x'])
+def test_malformed_post_is_a_bad_request(server, payload):
+    status, body = _request(server, 'POST', '/predict', payload)
+    assert status == 400
+    assert body['error']
+
+
+def test_unknown_route(server):
+    status, body = _request(server, 'POST', '/predict', {'origin': 'Nowhere', 'destination': 'Victoria Island'})
+    assert status == 404
+    assert body['error'].startswith('No model for route')
+
+
+def test_batch_timeout(server):
+    status, body = _request(server, 'POST', '/predict', [
+        {'origin': 'Ikeja', 'destination': 'Victoria Island'},
+        {'origin': 'Ajah', 'destination': 'Victoria Island'}
+    ])
+    assert status == 504
+    assert body == {'error': 'prediction timed out'}
+
+
+def test_shared_store_feeds_lag_features(trained_registry):
+    registry, df = trained_registry
+    store = OnlineFeatureStore().warm(df)
+    service = PredictionService(registry, store=store)
+    latest = pd.Timestamp(store.latest(ROUTE), unit='us', tz='Africa/Lagos')
+    lag = service.registry.features.index('traffic_ratio_lag_15min')
+
+    # A row the scraper adds to its feature_store reaches the service's next prediction
+    store.update({'city': ROUTE[0], 'origin': ROUTE[1], 'destination': ROUTE[2],
+                  'timestamp': latest + pd.Timedelta('15min'), 'traffic_ratio': 2.5,
+                  'duration_in_traffic_mins': 80.0})
+    _, row = service.feature_vector(ROUTE, latest + pd.Timedelta('45min'))
+    assert service.store is store
+    assert row[lag] == 2.5
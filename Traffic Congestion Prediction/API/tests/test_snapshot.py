@@ -0,0 +1,72 @@
+import os
+import pandas as pd
+import pytest
+import snapshot
+from snapshot import load_cleaned, snapshot_key
+
+pytest.importorskip('pyarrow')
+
+ROUTES = [('Lagos', 'Ikeja', 'Victoria Island'), ('Lagos', 'Ajah', 'Victoria Island')]
+
+
+@pytest.fixture
+def source(traffic_frame, city_csv, tmp_path):
+    return city_csv(traffic_frame(200, routes=ROUTES), tmp_path)['Lagos']
+
+
+def _snapshots(cache_dir):
+    return sorted(path.name for path in cache_dir.glob('*.feather'))
+
+
+def test_cache_hit_returns_the_same_frame(source, tmp_path, monkeypatch):
+    cache_dir = tmp_path / 'snapshots'
+    cleaned = load_cleaned(source, cache_dir)
+    assert len(_snapshots(cache_dir)) == 1
+
+    # A hit reads the snapshot back instead of cleaning again
+    monkeypatch.setattr(snapshot, 'clean_traffic_data', None)
+    cached = load_cleaned(source, cache_dir)
+    pd.testing.assert_frame_equal(cached, cleaned)
+    assert 'distance_km' not in cached and cached['temperature_c'].notna().all()
+
+
+def test_changed_source_gets_a_new_key(source, tmp_path):
+    params = {'iqr_k': 1.5}
+    key = snapshot_key(source, params)
+    stat = source.stat()
+
+    # A touch alone keeps the key: snapshots are addressed by content
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert snapshot_key(source, params) == key
+
+    # Same size, new mtime and contents
+    text = source.read_text()
+    source.write_text(text.replace('Ikeja', 'Ikeje'))
+    assert source.stat().st_size == stat.st_size
+    same_size = snapshot_key(source, params)
+    assert same_size != key
+
+    # New size
+    source.write_text(text + text.splitlines()[-1] + '\n')
+    assert source.stat().st_size != stat.st_size
+    assert snapshot_key(source, params) not in (key, same_size)
+
+    cache_dir = tmp_path / 'snapshots'
+    grown = load_cleaned(source, cache_dir)
+    source.write_text(text)
+    assert len(load_cleaned(source, cache_dir)) < len(grown)
+    assert len(_snapshots(cache_dir)) == 2
+
+
+def test_changed_params_get_a_new_key(source, tmp_path):
+    cache_dir = tmp_path / 'snapshots'
+    default = load_cleaned(source, cache_dir)
+    loose = load_cleaned(source, cache_dir, iqr_k=3.0)
+    kept = load_cleaned(source, cache_dir, drop_columns=())
+    assert len(_snapshots(cache_dir)) == 3
+
+    assert len(loose) > len(default)
+    assert 'distance_km' in kept and 'distance_km' not in default
+    # Each parameter set reads back its own snapshot
+    pd.testing.assert_frame_equal(load_cleaned(source, cache_dir, iqr_k=3.0), loose)
+    assert len(_snapshots(cache_dir)) == 3
@@ -0,0 +1,90 @@
+from datetime import date
+import numpy as np
+import pandas as pd
+import pytest
+from loader import load_traffic_csv
+from conftest import scraped_rows
+from schema import COLUMNS, TRAFFIC_COLUMNS
+from storage import CSVAppendWriter, ParquetPartitionWriter, csv_to_parquet, load_parquet
+
+
+def _row(weather=True):
+    row = {name: 1 for name in TRAFFIC_COLUMNS}
+    row.update(city='Lagos', origin='Ikeja', destination='Victoria Island', distance_km='28.8 km',
+               timestamp='2024-01-01T08:00:00.000000+01:00')
+    if weather:
+        row.update(temperature_c=27.5, weather_condition='Clear')
+    return row
+
+
+def test_header_does_not_depend_on_first_row(tmp_path):
+    # The first row of a new file has no weather keys (the weather call failed)
+    with CSVAppendWriter(tmp_path) as writer:
+        writer.write(_row(weather=False), 'Lagos')
+        writer.write(_row(), 'Lagos')
+
+    df = pd.read_csv(tmp_path / 'traffic_weather_data_lagos.csv')
+    assert list(df.columns) == COLUMNS
+    assert df['temperature_c'].isna().tolist() == [True, False]
+    assert df.loc[1, 'temperature_c'] == 27.5
+
+
+def test_existing_header_is_reused(tmp_path):
+    columns = ['city', 'origin', 'value']
+    (tmp_path / 'traffic_weather_data_lagos.csv').write_text(','.join(columns) + '\n')
+    with CSVAppendWriter(tmp_path) as writer:
+        writer.write({'city': 'Lagos', 'origin': 'Ikeja', 'value': 2}, 'Lagos')
+
+    df = pd.read_csv(tmp_path / 'traffic_weather_data_lagos.csv')
+    assert list(df.columns) == columns
+    assert df['value'].tolist() == [2]
+
+
+ROUTES = [('Lagos', 'Ikeja', 'Victoria Island'), ('Lagos', 'Ajah', 'Victoria Island'), ('Abuja', 'Wuse', 'Garki')]
+
+
+def test_parquet_round_trip_prunes_partitions_and_columns(traffic_frame, tmp_path):
+    pytest.importorskip('pyarrow')
+    df = traffic_frame(400, routes=ROUTES)
+    with ParquetPartitionWriter(tmp_path, flush_every=50, fsync=True) as writer:
+        for row in scraped_rows(df):
+            writer.write(row, row['city'])
+    writer.compact('Lagos')
+    assert len(list((tmp_path / 'city=Lagos' / 'date=2024-01-02').glob('*.parquet'))) == 1
+
+    loaded = load_parquet(tmp_path)
+    assert list(loaded.columns) == COLUMNS[1:] + ['city', 'date']
+    # One cycle's routes share a timestamp
+    order = ['timestamp', 'city', 'origin', 'destination']
+    columns = order + ['distance_km', 'traffic_ratio', 'temperature_c', 'weather_condition']
+    actual = loaded[columns].astype({c: str for c in order[1:]}).sort_values(order, ignore_index=True)
+    expected = df[columns].sort_values(order, ignore_index=True)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False, check_categorical=False)
+
+    # A partition outside the filters is never opened, so a corrupt part there goes unnoticed
+    corrupt = list((tmp_path / 'city=Abuja').glob('date=2024-01-0[3-9]/*.parquet'))
+    assert corrupt
+    for part in corrupt:
+        part.write_bytes(b'not parquet')
+    pruned = load_parquet(tmp_path, columns=['timestamp', 'origin', 'traffic_ratio'], start='2024-01-02',
+                          end='2024-01-02', routes=[('Ikeja', 'Victoria Island')], cities=['Lagos'])
+    expected = df[(df['origin'] == 'Ikeja') & (df['destination'] == 'Victoria Island')
+                  & (df['timestamp'].dt.date == date(2024, 1, 2))]
+    assert list(pruned.columns) == ['timestamp', 'origin', 'traffic_ratio']
+    np.testing.assert_array_equal(pruned['timestamp'], expected['timestamp'])
+    np.testing.assert_array_equal(pruned['traffic_ratio'], expected['traffic_ratio'])
+    with pytest.raises(Exception):
+        load_parquet(tmp_path, cities=['Abuja'])
+
+
+def test_csv_to_parquet(traffic_frame, tmp_path):
+    pytest.importorskip('pyarrow')
+    df = traffic_frame(100, routes=ROUTES[:1])
+    with CSVAppendWriter(tmp_path) as writer:
+        for row in scraped_rows(df):
+            writer.write(row, row['city'])
+    csv_path = tmp_path / 'traffic_weather_data_lagos.csv'
+    csv_to_parquet(csv_path, tmp_path / 'parquet')
+
+    converted = load_parquet(tmp_path / 'parquet').drop(columns='date')
+    pd.testing.assert_frame_equal(converted, load_traffic_csv(csv_path)[converted.columns], check_categorical=False)
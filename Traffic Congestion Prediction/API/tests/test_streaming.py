@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+from streaming import KLLSketch, StreamingIQRFilter
+
+QUANTILES = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+
+def test_small_stream_is_exact():
+    # Below the sketch capacity nothing is compacted and quantiles match pandas
+    values = np.random.default_rng(0).normal(size=150)
+    sketch = KLLSketch(k=200)
+    for value in values:
+        sketch.update(value)
+    np.testing.assert_allclose(sketch.quantiles(QUANTILES), pd.Series(values).quantile(QUANTILES), rtol=1e-12)
+
+
+def test_rank_error_is_bounded():
+    values = np.random.default_rng(1).lognormal(size=50_000)
+    sketch = KLLSketch(k=200)
+    for value in values:
+        sketch.update(float(value))
+    ordered = np.sort(values)
+    ranks = np.searchsorted(ordered, sketch.quantiles(QUANTILES)) / len(values)
+    assert np.abs(ranks - QUANTILES).max() < 0.02
+    # Memory stays bounded whatever the stream length
+    assert sum(len(c) for c in sketch._compactors) < 4 * 200
+
+
+def test_iqr_fences_match_batch_quantiles():
+    rng = np.random.default_rng(2)
+    n = 3000
+    df = pd.DataFrame({
+        'city': 'Lagos', 'origin': rng.choice(['Ikeja', 'Ajah', 'Festac'], n), 'destination': 'Victoria Island',
+        'traffic_ratio': rng.gamma(9, 0.12, n), 'duration_in_traffic_mins': rng.integers(20, 120, n).astype(float)
+    })
+    iqr = StreamingIQRFilter(refresh_every=1).fit(df)
+
+    grouped = df.groupby(['city', 'origin', 'destination'])
+    for metric in iqr.metrics:
+        q1 = grouped[metric].quantile(0.25)
+        q3 = grouped[metric].quantile(0.75)
+        for route in q1.index:
+            lower, upper = iqr.bounds(route, metric)
+            spread = q3[route] - q1[route]
+            expected = (q1[route] - 1.5 * spread, q3[route] + 1.5 * spread)
+            # About 1% rank error on each quartile, scaled by the IQR
+            np.testing.assert_allclose([lower, upper], expected, atol=0.05 * spread)
+
+
+def test_flags_rows_outside_the_fences():
+    rng = np.random.default_rng(3)
+    iqr = StreamingIQRFilter(min_count=50)
+    row = {'city': 'Lagos', 'origin': 'Ikeja', 'destination': 'Victoria Island'}
+    for value in rng.normal(1.0, 0.05, 200):
+        iqr.update({**row, 'traffic_ratio': value, 'duration_in_traffic_mins': 40.0})
+    flags = iqr.update({**row, 'traffic_ratio': 3.0, 'duration_in_traffic_mins': 40.0})
+    assert flags == {'traffic_ratio': True, 'duration_in_traffic_mins': False}
@@ -0,0 +1,90 @@
+from datetime import date
+import numpy as np
+import pandas as pd
+from time_features import nigerian_holidays, time_features
+
+
+def test_sunday_christmas_is_observed_after_boxing_day():
+    # 2022: Christmas on Sunday, Boxing Day on Monday
+    holidays = set(nigerian_holidays([2022]))
+    assert {date(2022, 12, 25), date(2022, 12, 26), date(2022, 12, 27)} <= holidays
+    assert date(2022, 12, 28) not in holidays
+    # New Year's Day 2022 was a Saturday
+    assert date(2022, 1, 3) in holidays
+
+
+def test_weekend_christmas_and_boxing_day():
+    # 2021: Christmas on Saturday, Boxing Day on Sunday
+    holidays = set(nigerian_holidays([2021]))
+    assert {date(2021, 12, 27), date(2021, 12, 28)} <= holidays
+    assert date(2021, 12, 29) not in holidays
+
+
+def test_easter_and_weekday_holidays():
+    holidays = set(nigerian_holidays([2024]))
+    assert {date(2024, 3, 29), date(2024, 4, 1), date(2024, 12, 25), date(2024, 12, 26)} <= holidays
+    # Christmas 2024 was a Wednesday: no extra observed day
+    assert date(2024, 12, 27) not in holidays
+
+
+def test_time_features_flags_observed_days():
+    stamps = pd.Series(pd.to_datetime(['2022-12-27 09:00', '2022-12-28 09:00']).tz_localize('Africa/Lagos'))
+    assert time_features(stamps)['is_holiday'].tolist() == [True, False]
+
+
+def _scalar_peak_hour(hour):
+    """NigeriaTrafficScraper.is_peak_hour before the lookup tables"""
+    morning_peak = 6 <= hour <= 10
+    evening_peak = 16 <= hour <= 20
+    return morning_peak or evening_peak
+
+
+def _scalar_time_period(hour):
+    """NigeriaTrafficScraper.get_time_period before the lookup tables"""
+    if 5 <= hour < 12:
+        return 'Morning'
+    elif 12 <= hour < 16:
+        return 'Afternoon'
+    elif 16 <= hour < 20:
+        return 'Evening'
+    else:
+        return 'Night'
+
+
+def test_time_features_match_scalar_functions():
+    # Friday 20:00 to Monday 12:00 every 7 minutes: crosses midnight, a weekend and
+    # every peak and period boundary, at minutes either side of the hour
+    stamps = pd.Series(pd.date_range('2024-01-05 20:00', '2024-01-08 12:00', freq='7min', tz='Africa/Lagos'))
+    features = time_features(stamps)
+
+    local = list(stamps)
+    hours = [ts.hour for ts in local]
+    assert features['hour'].tolist() == hours
+    assert features['weekday'].tolist() == [ts.weekday() for ts in local]
+    assert features['day_of_week'].astype(str).tolist() == [ts.strftime('%A') for ts in local]
+    assert features['is_weekend'].tolist() == [ts.weekday() >= 5 for ts in local]
+    assert features['peak_hour'].tolist() == [_scalar_peak_hour(h) for h in hours]
+    assert features['time_period'].astype(str).tolist() == [_scalar_time_period(h) for h in hours]
+    assert features['hour_of_week'].tolist() == [ts.weekday() * 24 + ts.hour for ts in local]
+    assert set(hours) == set(range(24)) and set(features['weekday']) == {0, 4, 5, 6}
+    np.testing.assert_array_equal(features.index, stamps.index)
+
+    # Aware timestamps in another zone are converted to Lagos time first
+    pd.testing.assert_frame_equal(time_features(stamps.dt.tz_convert('UTC')), features)
+
+
+def test_time_features_leave_nat_rows_missing():
+    stamps = pd.Series([pd.Timestamp('2022-12-27 09:00', tz='Africa/Lagos'), pd.NaT,
+                        pd.Timestamp('2022-12-31 18:00', tz='Africa/Lagos')], index=[10, 11, 12])
+    features = time_features(stamps)
+    valid = time_features(stamps.dropna())
+
+    assert features.loc[11].isna().all()
+    assert features['hour'].dtype == 'Int8' and features['year'].dtype == 'Int16'
+    assert features['is_holiday'].dtype == 'boolean' and features['peak_hour'].dtype == 'boolean'
+    # Valid rows are unchanged by the NaT, and the NaT does not stretch the holiday table back to 1677
+    pd.testing.assert_frame_equal(features.drop(index=11), valid, check_dtype=False)
+    assert features['year'].min() == 2022
+    assert features.loc[10, 'is_holiday'] and features.loc[12, 'time_period'] == 'Evening'
+
+    assert time_features(pd.Series([pd.NaT], dtype='datetime64[ns, Africa/Lagos]')).isna().all().all()
@@ -0,0 +1,63 @@
+import json
+import os
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('sklearn')
+import joblib  # noqa: E402
+from service import ModelRegistry  # noqa: E402
+from train import build_feature_matrix, route_slug, train_routes  # noqa: E402
+
+ROUTES = [('Lagos', 'Ikeja', 'Victoria Island'), ('Lagos', 'Ajah', 'Victoria Island')]
+
+
+def test_trains_routes_in_the_pool_and_releases_shared_memory(traffic_frame, tmp_path, monkeypatch):
+    created = []
+
+    class RecordingSharedMemory(shared_memory.SharedMemory):
+        def __init__(self, name=None, create=False, size=0):
+            super().__init__(name, create, size)
+            if create:
+                created.append(self.name)
+
+    monkeypatch.setattr(shared_memory, 'SharedMemory', RecordingSharedMemory)
+    # Under three days: the 7-day lag columns are all NaN
+    df = traffic_frame(200, routes=ROUTES)
+    registry = tmp_path / 'registry'
+    metrics = train_routes(df, str(registry), models=['linear', 'gradient_boosting'], horizons=('15min', '1h'),
+                           workers=2)
+
+    assert len(created) == 1
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=created[0])
+
+    assert len(metrics) == 2 * 2 * 2 and metrics['path'].notna().all()
+    # Rows without a target scrape within tolerance are left out
+    assert (metrics['train_rows'] + metrics['test_rows']).between(100, 200).all()
+    manifest = json.loads((registry / 'manifest.json').read_text())
+    assert manifest['horizons'] == ['15min', '1h'] and manifest['models'] == ['linear', 'gradient_boosting']
+
+    features, targets, names, routes, bounds = build_feature_matrix(df, horizons=('15min', '1h'))
+    assert names == manifest['features'] and routes == sorted(ROUTES)
+    assert np.isnan(features[:, names.index('traffic_ratio_lag_7D')]).all()
+    for model in ['linear', 'gradient_boosting']:
+        loaded = ModelRegistry(str(registry), model)
+        assert loaded.routes == sorted(ROUTES)
+        for route, (start, stop) in zip(routes, bounds):
+            path = registry / route_slug(route) / f"{model}_1h.joblib"
+            assert os.path.exists(path)
+            X = features[start:stop]
+            expected = joblib.load(path).predict(X)
+            np.testing.assert_allclose(loaded.predict('1h', [route] * len(X), X), expected, rtol=1e-9)
+
+
+def test_metrics_hold_out_the_latest_rows(traffic_frame, tmp_path):
+    df = traffic_frame(200, routes=ROUTES[:1])
+    metrics = train_routes(df, str(tmp_path), models=['linear'], test_fraction=0.25, workers=1)
+    row = metrics.iloc[0]
+    assert (row['city'], row['origin'], row['destination']) == ROUTES[0]
+    assert row['test_rows'] == pytest.approx((row['train_rows'] + row['test_rows']) * 0.25, abs=1)
+    assert np.isfinite([row['mae'], row['rmse'], row['r2']]).all()
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / 'metrics.csv'), metrics, check_dtype=False)
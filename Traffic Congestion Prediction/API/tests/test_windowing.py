@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+from resample import resample_routes
+from windowing import iter_batches, window_index, window_views
+
+FEATURES = ['traffic_ratio', 'duration_in_traffic_mins']
+ROUTES = [('Lagos', 'Ikeja', 'Victoria Island'), ('Lagos', 'Ajah', 'Victoria Island'), ('Lagos', 'Festac', 'Ikoyi')]
+
+
+@pytest.fixture
+def grid(traffic_frame):
+    """15-minute grid of three routes; missed cycles are linearly imputed"""
+    grid = resample_routes(traffic_frame(48, routes=ROUTES), FEATURES, fill='linear')
+    grid.values[1, 20] = np.nan
+    return grid
+
+
+def test_window_views_share_memory(grid):
+    inputs, labels = window_views(grid.values, 8, 2, 4)
+    assert np.shares_memory(inputs, grid.values) and np.shares_memory(labels, grid.values)
+    np.testing.assert_array_equal(inputs[1, 5], grid.values[1, 5:13])
+    np.testing.assert_array_equal(labels[1, 5], grid.values[1, 15:17])
+
+
+def test_window_index_drops_missing_and_imputed_windows(grid):
+    index = window_index(grid, 8, 2, 4, max_imputed=0.0)
+    for route, start in index:
+        window = slice(start, start + 12)
+        assert not np.isnan(grid.values[route, window]).any()
+        assert not grid.mask[route, start + 10:start + 12].any()
+    n_routes, n_times, _ = grid.shape
+    assert grid.mask.any() and len(index) < n_routes * (n_times - 12 + 1)
+
+
+def test_iter_batches_match_direct_slicing(grid):
+    index = window_index(grid, 8, 2, 4)
+    batches = list(iter_batches(grid, index, 8, 2, 4, label_features=['traffic_ratio'], batch_size=16))
+    inputs = np.concatenate([b[0] for b in batches])
+    labels = np.concatenate([b[1] for b in batches])
+    assert inputs.dtype == labels.dtype == np.float32
+    np.testing.assert_array_equal(inputs, np.stack([grid.values[r, s:s + 8] for r, s in index]).astype(np.float32))
+    np.testing.assert_array_equal(labels, np.stack([grid.values[r, s + 10:s + 12, :1] for r, s in index])
+                                  .astype(np.float32))
+
+    shuffled = list(iter_batches(grid, index, 8, 2, 4, batch_size=16, shuffle=True, rng=np.random.default_rng(0)))
+    shuffled_inputs = np.concatenate([b[0] for b in shuffled])
+    assert not np.array_equal(shuffled_inputs, inputs)
+    np.testing.assert_array_equal(np.sort(shuffled_inputs, axis=0), np.sort(inputs, axis=0))
+
+
+def test_make_dataset(grid):
+    tf = pytest.importorskip('tensorflow')
+    from windowing import make_dataset
+
+    dataset = make_dataset(grid, 8, 2, 4, label_features=['traffic_ratio'], batch_size=16)
+    batches = list(dataset.as_numpy_iterator())
+    assert sum(len(inputs) for inputs, _ in batches) == len(window_index(grid, 8, 2, 4))
+    assert batches[0][0].shape[1:] == (8, 2) and batches[0][1].shape[1:] == (2, 1)
+    assert isinstance(dataset, tf.data.Dataset)
+
+    # The in-graph gather matches the NumPy one batch for batch
+    unshuffled = make_dataset(grid, 8, 2, 4, label_features=['traffic_ratio'], batch_size=16, shuffle=False)
+    expected = iter_batches(grid, window_index(grid, 8, 2, 4), 8, 2, 4, label_features=['traffic_ratio'],
+                            batch_size=16)
+    for (inputs, labels), (want_inputs, want_labels) in zip(unshuffled.as_numpy_iterator(), expected,
+                                                            strict=True):
+        np.testing.assert_array_equal(inputs, want_inputs)
+        np.testing.assert_array_equal(labels, want_labels)
+
+
+@pytest.mark.parametrize('widths', [(0, 2, 4), (8, 0, 4), (8, 2, 0), (8, -1, 4), (8, 4, 2)])
+def test_window_widths_are_validated(grid, widths):
+    with pytest.raises(ValueError):
+        window_index(grid, *widths)
+    with pytest.raises(ValueError):
+        window_views(grid.values, *widths)
+
+
+def test_iter_batches_cover_every_window_once(grid):
+    # shift == label_width: labels follow the inputs directly
+    index = window_index(grid, 4, 3, 3, split=(0.0, 0.5))
+    n_times = grid.shape[1]
+    assert len(index) and (index[:, 1] + 7 <= round(0.5 * n_times)).all()
+
+    batches = list(iter_batches(grid, index, 4, 3, 3, batch_size=5))
+    assert [len(inputs) for inputs, _ in batches[:-1]] == [5] * (len(batches) - 1)
+    assert sum(len(inputs) for inputs, _ in batches) == len(index)
+    (route, start), (inputs, labels) = index[-1], batches[-1]
+    np.testing.assert_array_equal(inputs[-1], grid.values[route, start:start + 4].astype(np.float32))
+    np.testing.assert_array_equal(labels[-1], grid.values[route, start + 4:start + 7].astype(np.float32))
@@ -0,0 +1,202 @@
+import time
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+from schema import TIMEZONE, DAY_ORDER, TIME_PERIOD_ORDER
+
+# Lookup tables indexed by local hour of day. The scraper reads the same
+# tables, so online rows and offline features can never disagree.
+PEAK_HOURS = np.array([6 <= h <= 10 or 16 <= h <= 20 for h in range(24)])
+TIME_PERIOD_CODES = np.array([
+    0 if 5 <= h < 12 else 1 if 12 <= h < 16 else 2 if 16 <= h < 20 else 3
+    for h in range(24)
+], dtype=np.int8)
+
+# Fixed-date federal public holidays as (month, day)
+FIXED_HOLIDAYS = [(1, 1), (5, 1), (6, 12), (10, 1), (12, 25), (12, 26)]
+
+# Moon-sighting holidays as declared by the Federal Government (Eid el-Fitr,
+# Eid el-Kabir, Eid el-Maulud, including declared extra days). Extend yearly;
+# the 2026 dates are projections until declared.
+DECLARED_HOLIDAYS = [
+    '2024-04-10', '2024-04-11', '2024-06-17', '2024-06-18', '2024-09-16',
+    '2025-03-31', '2025-04-01', '2025-06-06', '2025-06-09', '2025-09-05',
+    '2026-03-20', '2026-03-23', '2026-05-27', '2026-05-28', '2026-08-26'
+]
+
+_EPOCH = date(1970, 1, 1)
+_NS_PER_HOUR = 3_600_000_000_000
+_NS_PER_DAY = 24 * _NS_PER_HOUR
+# asi8 value of NaT
+_NAT = np.iinfo(np.int64).min
+
+
+def easter_sunday(year):
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    weekday_offset = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * weekday_offset) // 451
+    month, day = divmod(h + weekday_offset - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def nigerian_holidays(years):
+    """
+    Public holiday dates for the given years. A fixed holiday on a weekend
+    is also observed on the next weekday that is not already a holiday, so
+    a Sunday Christmas is observed on Tuesday, after Boxing Day.
+    """
+    fixed = sorted(date(year, month, day) for year in years for month, day in FIXED_HOLIDAYS)
+    holidays = set(fixed)
+    for year in years:
+        easter = easter_sunday(year)
+        holidays.update([easter - timedelta(days=2), easter + timedelta(days=1)])
+    holidays.update(date.fromisoformat(d) for d in DECLARED_HOLIDAYS if int(d[:4]) in years)
+
+    # Every holiday is known before any observed day is placed
+    for holiday in fixed:
+        if holiday.weekday() >= 5:
+            observed = holiday + timedelta(days=1)
+            while observed.weekday() >= 5 or observed in holidays:
+                observed += timedelta(days=1)
+            holidays.add(observed)
+    return sorted(holidays)
+
+
+def _holiday_days(first_day, last_day):
+    """Holiday dates between two epoch day numbers, as a sorted epoch-day array"""
+    years = range((_EPOCH + timedelta(days=int(first_day))).year,
+                  (_EPOCH + timedelta(days=int(last_day))).year + 1)
+    return np.array([(d - _EPOCH).days for d in nigerian_holidays(years)], dtype=np.int64)
+
+
+def _civil_from_days(days):
+    """Vectorized (year, month, day) from epoch day numbers (H. Hinnant's algorithm)"""
+    z = days + 719468
+    era = np.floor_divide(z, 146097)
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    day = doy - (153 * mp + 2) // 5 + 1
+    month = np.where(mp < 10, mp + 3, mp - 9)
+    year = yoe + era * 400 + (month <= 2)
+    return year, month, day
+
+
+def local_nanoseconds(timestamps):
+    """Africa/Lagos wall-clock time as int64 nanoseconds since the epoch"""
+    index = pd.DatetimeIndex(timestamps)
+    if index.tz is None:
+        index = index.tz_localize(TIMEZONE)
+    return index.tz_convert(TIMEZONE).tz_localize(None).as_unit('ns').asi8
+
+
+def time_features(timestamps):
+    """
+    Calendar features for a whole array of timestamps in one NumPy pass.
+
+    Naive timestamps are taken as Africa/Lagos local time. Returns a
+    DataFrame with hour, day, month, year, weekday (Monday=0), day_of_week,
+    is_weekend, hour_of_week (0-167 from Monday 00:00), peak_hour,
+    time_period and is_holiday, indexed like the input when it is a Series.
+
+    NaT rows get missing values: when there are any, the integer and boolean
+    columns come back as nullable Int8/Int16/boolean and the categoricals
+    hold NaN.
+    """
+    local = local_nanoseconds(timestamps)
+    missing = local == _NAT
+    valid = local[~missing]
+    days = np.floor_divide(valid, _NS_PER_DAY)
+    hour = (np.floor_divide(valid, _NS_PER_HOUR) % 24).astype(np.int8)
+    # 1970-01-01 was a Thursday
+    weekday = ((days + 3) % 7).astype(np.int8)
+
+    # Dates and holiday flags come from per-day tables over the covered span,
+    # so the per-row work is a single gather
+    first = days.min() if len(days) else 0
+    span = np.arange(first, days.max() + 1 if len(days) else 0)
+    offset = days - first
+    year_t, month_t, day_t = _civil_from_days(span)
+    holiday_t = np.isin(span, _holiday_days(first, span[-1])) if len(span) else span.astype(bool)
+    year, month, day, is_holiday = year_t[offset], month_t[offset], day_t[offset], holiday_t[offset]
+
+    def column(values, dtype):
+        values = values.astype(dtype)
+        if not missing.any():
+            return values
+        full = np.zeros(len(local), dtype=dtype)
+        full[~missing] = values
+        array_type = pd.arrays.BooleanArray if dtype == np.bool_ else pd.arrays.IntegerArray
+        return array_type(full, missing)
+
+    def categorical(codes, categories):
+        full = np.full(len(local), -1, dtype=np.int8)
+        full[~missing] = codes
+        return pd.Categorical.from_codes(full, categories=categories, ordered=True)
+
+    return pd.DataFrame({
+        'hour': column(hour, np.int8),
+        'day': column(day, np.int8),
+        'month': column(month, np.int8),
+        'year': column(year, np.int16),
+        'weekday': column(weekday, np.int8),
+        'day_of_week': categorical(weekday, DAY_ORDER),
+        'is_weekend': column(weekday >= 5, np.bool_),
+        'hour_of_week': column(weekday.astype(np.int16) * 24 + hour, np.int16),
+        'peak_hour': column(PEAK_HOURS[hour], np.bool_),
+        'time_period': categorical(TIME_PERIOD_CODES[hour], TIME_PERIOD_ORDER),
+        'is_holiday': column(is_holiday, np.bool_)
+    }, index=timestamps.index if isinstance(timestamps, pd.Series) else None)
+
+
+def is_peak_hour(hour):
+    return bool(PEAK_HOURS[hour])
+
+
+def time_period(hour):
+    return TIME_PERIOD_ORDER[TIME_PERIOD_CODES[hour]]
+
+
+def benchmark(path, scale=1000):
+    """
+    Compare per-row scalar feature derivation (the scraper methods plus the
+    notebooks' .dt accessors) with time_features on the file's timestamps
+    repeated scale times. The scalar path is timed on one copy and
+    extrapolated linearly.
+    """
+    from loader import load_traffic_csv
+
+    base = load_traffic_csv(path, columns=['timestamp'])['timestamp']
+    utc = np.tile(base.dt.tz_convert('UTC').dt.tz_localize(None).to_numpy(), scale)
+    scaled = pd.Series(pd.DatetimeIndex(utc).tz_localize('UTC').tz_convert(TIMEZONE))
+
+    start = time.perf_counter()
+    for ts in base:
+        hour = ts.hour
+        (is_peak_hour(hour), time_period(hour), ts.strftime('%A'), ts.weekday() >= 5)
+    (base.dt.hour, base.dt.day, base.dt.month, base.dt.year)
+    scalar = (time.perf_counter() - start) * scale
+
+    start = time.perf_counter()
+    time_features(scaled)
+    vectorized = time.perf_counter() - start
+    return {'rows': len(scaled), 'scalar_s': scalar, 'vectorized_s': vectorized}
+
+
+if __name__ == "__main__":
+    import sys
+
+    path = sys.argv[1] if len(sys.argv) > 1 else '../Data/traffic_weather_data_lagos.csv'
+    results = benchmark(path)
+    print(f"rows: {results['rows']:,}")
+    print(f"scalar (extrapolated): {results['scalar_s']:.1f} s")
+    print(f"vectorized: {results['vectorized_s']:.2f} s "
+          f"({results['scalar_s'] / results['vectorized_s']:.0f}x)")
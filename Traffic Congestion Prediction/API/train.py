@@ -0,0 +1,239 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from lag_features import ROUTE_COLUMNS, route_codes, lag_indices, build_lag_features
+from time_features import time_features
+
+TARGET = 'traffic_ratio'
+MODEL_NAMES = ['linear', 'random_forest', 'gradient_boosting']
+TIME_FEATURES = ['hour', 'weekday', 'is_weekend', 'hour_of_week', 'peak_hour', 'is_holiday']
+WEATHER_FEATURES = [
+    'temperature_c', 'humidity_percent', 'wind_speed_ms', 'cloud_coverage_percent',
+    'visibility_meters', 'rain_1h_mm'
+]
+# Model artifacts live outside the repository; set TRAFFIC_MODEL_REGISTRY (or
+# pass --registry) to use another directory
+DEFAULT_REGISTRY = os.environ.get(
+    'TRAFFIC_MODEL_REGISTRY', os.path.join(os.path.expanduser('~'), '.cache', 'traffic-congestion', 'models')
+)
+
+# Set in each worker by _attach: the shared feature block and its layout
+_worker = {}
+
+
+def make_model(name, random_state=0):
+    """Untrained estimator for a model name, imputing missing lags/weather first"""
+    from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+    from sklearn.impute import SimpleImputer
+    from sklearn.linear_model import Ridge
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    # Keep all-NaN columns (e.g. 7-day lags of a route with less history) so every
+    # pipeline has one coefficient per manifest feature, as service.LinearStack expects
+    def imputer():
+        return SimpleImputer(strategy='median', keep_empty_features=True)
+
+    if name == 'linear':
+        return make_pipeline(imputer(), StandardScaler(), Ridge(alpha=1.0))
+    if name == 'random_forest':
+        # One thread per model; parallelism comes from the process pool
+        return make_pipeline(imputer(),
+                             RandomForestRegressor(n_estimators=200, min_samples_leaf=2, n_jobs=1,
+                                                   random_state=random_state))
+    if name == 'gradient_boosting':
+        return make_pipeline(imputer(), GradientBoostingRegressor(random_state=random_state))
+    raise ValueError(f"Unknown model: {name}")
+
+
+def route_slug(route):
+    """Registry directory of a (city, origin, destination) route, relative to the registry root"""
+    city, origin, destination = (str(part).lower().replace(' ', '_') for part in route)
+    return os.path.join(city, f"{origin}__{destination}")
+
+
+def build_feature_matrix(df, target=TARGET, horizons=('15min',), tolerance='7min30s'):
+    """
+    Feature and target matrix for per-route training.
+
+    Rows are sorted by route then timestamp, so each route is one
+    contiguous block. Features are the time features, weather and the
+    lag/rolling features of lag_features.build_lag_features; targets hold
+    the route's `target` nearest to timestamp + horizon (NaN if no scrape
+    lies within tolerance).
+
+    Returns (features, targets, feature_names, routes, bounds) where bounds
+    holds each route's (start, stop) rows.
+    """
+    tolerance_us = pd.Timedelta(tolerance) // pd.Timedelta(microseconds=1)
+    codes = route_codes(df)
+    times = pd.DatetimeIndex(df['timestamp']).as_unit('us').asi8
+    order = np.lexsort((times, codes))
+    df = df.iloc[order].reset_index(drop=True)
+    codes, times = codes[order], times[order]
+
+    lagged = build_lag_features(df)
+    lag_columns = [c for c in lagged.columns if c not in df.columns]
+    calendar = time_features(df['timestamp'])
+    weather = [c for c in WEATHER_FEATURES if c in df.columns]
+
+    feature_names = TIME_FEATURES + weather + lag_columns
+    features = np.column_stack([
+        calendar[TIME_FEATURES].to_numpy(dtype=np.float64, na_value=np.nan),
+        df[weather].to_numpy(dtype=np.float64),
+        lagged[lag_columns].to_numpy(dtype=np.float64)
+    ])
+
+    values = df[target].to_numpy(dtype=np.float64)
+    targets = np.empty((len(df), len(horizons)))
+    for i, horizon in enumerate(horizons):
+        # A negative lag looks ahead
+        horizon_us = pd.Timedelta(horizon) // pd.Timedelta(microseconds=1)
+        index = lag_indices(codes, times, -horizon_us, tolerance_us)
+        targets[:, i] = np.where(index >= 0, values[np.where(index >= 0, index, 0)], np.nan)
+
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    stops = np.r_[starts[1:], len(codes)]
+    route_columns = [c for c in ROUTE_COLUMNS if c in df.columns]
+    routes = [tuple(df.loc[start, route_columns]) for start in starts]
+    return features, targets, feature_names, routes, list(zip(starts, stops))
+
+
+def _attach(name, shape, n_features):
+    """Worker initializer: map the shared block once per process"""
+    shm = shared_memory.SharedMemory(name=name)
+    block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    _worker.update(shm=shm, features=block[:, :n_features], targets=block[:, n_features:])
+
+
+def _train_task(task):
+    """Fit one (route, model, horizon) on the shared block and save it to the registry"""
+    import joblib
+
+    start_time = time.perf_counter()
+    start, stop = task['bounds']
+    # The route's rows are one contiguous slice of the shared block, so these are views;
+    # dropping rows without a target copies the route's rows once
+    X = _worker['features'][start:stop]
+    y = _worker['targets'][start:stop, task['horizon_index']]
+    usable = ~np.isnan(y)
+    if not usable.all():
+        X, y = X[usable], y[usable]
+
+    # Hold out the most recent rows; shuffling would leak the future into training
+    split = int(len(y) * (1 - task['test_fraction']))
+    metrics = {
+        'route': task['route'], 'model': task['model'], 'horizon': task['horizon'],
+        'train_rows': split, 'test_rows': len(y) - split
+    }
+    if split < 10 or len(y) - split < 1:
+        metrics['error'] = 'not enough rows'
+        return metrics
+
+    model = make_model(task['model'])
+    model.fit(X[:split], y[:split])
+    error = model.predict(X[split:]) - y[split:]
+    variance = np.var(y[split:])
+    metrics.update(
+        mae=float(np.mean(np.abs(error))),
+        rmse=float(np.sqrt(np.mean(error ** 2))),
+        r2=float(1 - np.mean(error ** 2) / variance) if variance > 0 else float('nan')
+    )
+
+    os.makedirs(os.path.dirname(task['path']), exist_ok=True)
+    joblib.dump(model, task['path'])
+    metrics['path'] = task['path']
+    metrics['fit_seconds'] = time.perf_counter() - start_time
+    return metrics
+
+
+def train_routes(df, registry=DEFAULT_REGISTRY, models=MODEL_NAMES, horizons=('15min',), target=TARGET,
+                 test_fraction=0.2, workers=None):
+    """
+    Fit one model per route x model x horizon across a process pool.
+
+    The feature matrix is built once and copied into a shared memory block;
+    workers map it at start-up and train on row slices of it, so tasks
+    carry only a few indices instead of a pickled matrix. Each worker
+    writes its fitted model to
+    registry/<city>/<origin>__<destination>/<model>_<horizon>.joblib, and
+    the driver writes registry/metrics.csv and registry/manifest.json.
+
+    Returns the metrics DataFrame.
+    """
+    features, targets, feature_names, routes, bounds = build_feature_matrix(df, target, horizons)
+    n_features = features.shape[1]
+    shape = (len(features), n_features + targets.shape[1])
+
+    tasks = [
+        {
+            'route': route, 'bounds': (int(start), int(stop)), 'model': model, 'horizon': horizon,
+            'horizon_index': h, 'test_fraction': test_fraction,
+            'path': os.path.join(registry, route_slug(route), f"{model}_{horizon}.joblib")
+        }
+        for route, (start, stop) in zip(routes, bounds)
+        for model in models
+        for h, horizon in enumerate(horizons)
+    ]
+    # Largest routes first so the pool does not finish on one long straggler
+    tasks.sort(key=lambda t: (t['model'] != 'random_forest', -(t['bounds'][1] - t['bounds'][0])))
+
+    shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * 8)
+    try:
+        block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        block[:, :n_features] = features
+        block[:, n_features:] = targets
+        del features, targets
+
+        results = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                 initargs=(shm.name, shape, n_features)) as pool:
+            futures = [pool.submit(_train_task, task) for task in tasks]
+            for future in as_completed(futures):
+                results.append(future.result())
+        del block
+    finally:
+        shm.close()
+        shm.unlink()
+
+    os.makedirs(registry, exist_ok=True)
+    metrics = pd.DataFrame(results)
+    metrics[['city', 'origin', 'destination']] = pd.DataFrame(metrics.pop('route').tolist(), index=metrics.index)
+    metrics = metrics.sort_values(['city', 'origin', 'destination', 'model', 'horizon']).reset_index(drop=True)
+    metrics.to_csv(os.path.join(registry, 'metrics.csv'), index=False)
+    with open(os.path.join(registry, 'manifest.json'), 'w') as f:
+        json.dump({
+            'target': target,
+            'horizons': list(horizons),
+            'models': list(models),
+            'features': feature_names,
+            'trained_at': datetime.now().isoformat()
+        }, f, indent=2)
+    return metrics
+
+
+if __name__ == "__main__":
+    import argparse
+    from snapshot import load_cleaned
+
+    parser = argparse.ArgumentParser(description='Train one model per route and save them to the registry')
+    parser.add_argument('sources', nargs='*', default=['../Data/traffic_weather_data_lagos.csv'],
+                        help='city CSV files')
+    parser.add_argument('--registry', default=DEFAULT_REGISTRY,
+                        help='model registry directory (default: $TRAFFIC_MODEL_REGISTRY or '
+                             '~/.cache/traffic-congestion/models)')
+    parser.add_argument('--models', nargs='+', default=MODEL_NAMES, choices=MODEL_NAMES)
+    parser.add_argument('--horizons', nargs='+', default=['15min'])
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    frame = pd.concat([load_cleaned(source) for source in args.sources], ignore_index=True)
+    start = time.perf_counter()
+    results = train_routes(frame, args.registry, args.models, args.horizons, workers=args.workers)
+    print(results[['city', 'origin', 'destination', 'model', 'horizon', 'mae', 'rmse', 'r2']].to_string())
+    print(f"trained {len(results)} models in {time.perf_counter() - start:.1f} s")
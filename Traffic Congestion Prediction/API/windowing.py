@@ -0,0 +1,126 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _check_widths(input_width, label_width, shift):
+    for name, width in (('input_width', input_width), ('label_width', label_width), ('shift', shift)):
+        if width <= 0:
+            raise ValueError(f"{name} must be positive, got {width}")
+    if label_width > shift:
+        raise ValueError("label_width cannot exceed shift")
+
+
+def window_views(values, input_width, label_width, shift):
+    """
+    Every (input, label) window of a (route, time, feature) array as views,
+    without copying.
+
+    A window spans input_width + shift steps: the first input_width steps
+    are the inputs and the last label_width steps the labels. Returns two
+    arrays of shape (route, n_windows, width, feature) sharing memory with
+    values.
+    """
+    _check_widths(input_width, label_width, shift)
+    total = input_width + shift
+    # (route, n_windows, feature, total) -> (route, n_windows, total, feature)
+    windows = sliding_window_view(values, total, axis=1).swapaxes(2, 3)
+    return windows[:, :, :input_width], windows[:, :, total - label_width:]
+
+
+def window_index(grid, input_width, label_width, shift, max_imputed=1.0, split=(0.0, 1.0)):
+    """
+    (route, start) pairs of the windows to train on.
+
+    max_imputed: largest fraction of imputed label cells a window may have;
+    windows touching NaN cells are always dropped
+    split: (start, end) fractions of the time axis the windows must lie
+    within, so train and validation sets do not overlap in time
+    """
+    _check_widths(input_width, label_width, shift)
+    total = input_width + shift
+    n_routes, n_times, _ = grid.values.shape
+    n_windows = max(0, n_times - total + 1)
+
+    first = int(round(split[0] * n_times))
+    last = int(round(split[1] * n_times)) - total
+    starts = np.arange(max(first, 0), min(last, n_windows - 1) + 1)
+
+    # Prefix sums per route turn every window's imputed/NaN count into two lookups
+    imputed = grid.mask.any(axis=2)
+    missing = np.isnan(grid.values).any(axis=2)
+    imputed_sum = np.concatenate([np.zeros((n_routes, 1)), imputed.cumsum(axis=1)], axis=1)
+    missing_sum = np.concatenate([np.zeros((n_routes, 1)), missing.cumsum(axis=1)], axis=1)
+
+    label_start = starts + total - label_width
+    label_imputed = (imputed_sum[:, starts + total] - imputed_sum[:, label_start]) / label_width
+    window_missing = missing_sum[:, starts + total] - missing_sum[:, starts]
+    keep = (label_imputed <= max_imputed) & (window_missing == 0)
+
+    routes, positions = np.nonzero(keep)
+    return np.column_stack([routes, starts[positions]]).astype(np.int32)
+
+
+def iter_batches(grid, index, input_width, label_width, shift, label_features=None, batch_size=256,
+                 shuffle=False, rng=None):
+    """
+    (inputs, labels) float32 batches for the (route, start) rows of index
+    (see window_index).
+
+    Windows are gathered from window_views, so only each batch is copied
+    out of the grid. This is the NumPy counterpart of the in-graph gather
+    in make_dataset, for use without TensorFlow.
+    """
+    inputs, labels = window_views(grid.values, input_width, label_width, shift)
+    features = list(grid.features)
+    label_columns = [features.index(f) for f in (label_features or features)]
+    order = (rng or np.random.default_rng()).permutation(len(index)) if shuffle else np.arange(len(index))
+    for lo in range(0, len(order), batch_size):
+        rows = index[order[lo:lo + batch_size]]
+        routes, starts = rows[:, 0], rows[:, 1]
+        yield (inputs[routes, starts].astype(np.float32),
+               labels[routes, starts][..., label_columns].astype(np.float32))
+
+
+def make_dataset(grid, input_width=16, label_width=4, shift=4, label_features=None, batch_size=256,
+                 shuffle=True, cache=None, max_imputed=1.0, split=(0.0, 1.0), seed=0):
+    """
+    tf.data pipeline of (inputs, labels) batches from a RouteGrid
+    (see resample.resample_routes).
+
+    The grid is handed to TensorFlow once and each batch is assembled
+    in-graph by a single gather over precomputed (route, start) indices, so
+    batches are built in parallel off the Python thread and no window is
+    ever sliced out on the Python side. Batches are prefetched, and
+    reshuffled every epoch when shuffle is set.
+
+    inputs: (batch, input_width, n_features)
+    labels: (batch, label_width, len(label_features)), default all features
+    cache: optional file path; gathered batches are cached there on the
+    first epoch and later epochs read them back (only batch order is then
+    reshuffled)
+    """
+    import tensorflow as tf
+
+    index = window_index(grid, input_width, label_width, shift, max_imputed, split)
+    total = input_width + shift
+    features = list(grid.features)
+    label_columns = [features.index(f) for f in (label_features or features)]
+    values = tf.constant(np.ascontiguousarray(grid.values, dtype=np.float32))
+    offsets = tf.range(total, dtype=tf.int32)
+
+    def gather(batch):
+        routes = tf.repeat(batch[:, :1], total, axis=1)
+        times = batch[:, 1:] + offsets
+        windows = tf.gather_nd(values, tf.stack([routes, times], axis=-1))
+        labels = tf.gather(windows[:, total - label_width:], label_columns, axis=2)
+        return windows[:, :input_width], labels
+
+    dataset = tf.data.Dataset.from_tensor_slices(index)
+    if shuffle and cache is None:
+        dataset = dataset.shuffle(max(1, len(index)), seed=seed, reshuffle_each_iteration=True)
+    dataset = dataset.batch(batch_size).map(gather, num_parallel_calls=tf.data.AUTOTUNE)
+    if cache is not None:
+        dataset = dataset.cache(cache)
+        if shuffle:
+            dataset = dataset.shuffle(max(1, len(index) // batch_size + 1), seed=seed)
+    return dataset.prefetch(tf.data.AUTOTUNE)